@@ -0,0 +1,202 @@
+"""
+Change data capture for candidates: one LISTEN connection per instance fans row
+changes out to in-process subscribers (term index, in-memory vector index, the
+embedding job queue, caches).
+
+Statement-level triggers (see TRIGGER_STATEMENTS in app.db_init) NOTIFY
+`candidates_changed` once per statement with {"op": "INSERT" | "UPDATE" | "DELETE",
+"ids": [...]}, split into chunks that fit the 8000-byte payload limit. Notifications
+are coalesced for _COALESCE_S and delivered as one ChangeBatch to every subscriber in
+turn; a failing subscriber is logged and does not affect the others.
+
+Switching the active embedding version (app.services.embedding_versions) sends
+{"op": "VERSION", "version": ...} on the same channel: every vector changed at once, and
+the batch carries the new version instead of ids.
+
+When the LISTEN connection drops, changes can be missed: is_listening() turns False
+until a reconnect succeeds, after which subscribers get a ChangeBatch with resync=True
+and should reload instead of trusting their state.
+"""
+import asyncio
+import json
+import logging
+from collections.abc import Awaitable, Callable
+
+from app.adapters import pg
+
+logger = logging.getLogger(__name__)
+
+CHANGE_CHANNEL = "candidates_changed"
+
+# Notifications arriving within this window are delivered as one batch
+_COALESCE_S = 0.05
+_RECONNECT_DELAYS_S = (1.0, 2.0, 5.0, 10.0, 30.0)
+
+
+class ChangeBatch:
+    """Candidate ids changed since the previous batch, by operation."""
+
+    def __init__(self, resync: bool = False, version: str | None = None):
+        self.inserted: set[int] = set()
+        self.updated: set[int] = set()
+        self.deleted: set[int] = set()
+        # Changes may have been missed (LISTEN connection was lost)
+        self.resync = resync
+        # Embedding version activated in the meantime: every stored vector changed
+        self.version = version
+
+    @property
+    def ids(self) -> set[int]:
+        return self.inserted | self.updated | self.deleted
+
+    def add(self, op: str, ids: list[int]) -> None:
+        {"INSERT": self.inserted, "UPDATE": self.updated, "DELETE": self.deleted}[op].update(ids)
+
+    def __bool__(self) -> bool:
+        return self.resync or self.version is not None or bool(self.inserted or self.updated or self.deleted)
+
+    def __repr__(self) -> str:
+        return (
+            f"ChangeBatch(inserted={len(self.inserted)}, updated={len(self.updated)}, "
+            f"deleted={len(self.deleted)}, resync={self.resync}, version={self.version})"
+        )
+
+
+Subscriber = Callable[[ChangeBatch], Awaitable[None]]
+
+_subscribers: list[Subscriber] = []
+_listener = None
+_pending = ChangeBatch()
+_flush_task: asyncio.Task | None = None
+_reconnect_task: asyncio.Task | None = None
+_deliver_lock = asyncio.Lock()
+_stopping = False
+
+
+def subscribe(callback: Subscriber) -> None:
+    """Registers `callback` to be awaited with every ChangeBatch."""
+    if callback not in _subscribers:
+        _subscribers.append(callback)
+
+
+def unsubscribe(callback: Subscriber) -> None:
+    if callback in _subscribers:
+        _subscribers.remove(callback)
+
+
+def is_listening() -> bool:
+    """True while change notifications are being received."""
+    return _listener is not None and not _listener.is_closed()
+
+
+def _parse(payload: str) -> tuple[str, list[int] | str]:
+    message = json.loads(payload)
+    op = message["op"]
+    if op == "VERSION":
+        return op, str(message["version"])
+    if op not in ("INSERT", "UPDATE", "DELETE"):
+        raise ValueError(op)
+    # {"id": ...} is the payload of the former row-level trigger
+    ids = message["ids"] if "ids" in message else [message["id"]]
+    return op, [int(candidate_id) for candidate_id in ids]
+
+
+async def _deliver(batch: ChangeBatch) -> None:
+    async with _deliver_lock:
+        for callback in list(_subscribers):
+            try:
+                await callback(batch)
+            except Exception as e:
+                logger.error(f"Change subscriber {getattr(callback, '__qualname__', callback)} failed on {batch}: {e}")
+
+
+async def _flush(delay_s: float = _COALESCE_S) -> None:
+    global _pending, _flush_task
+    await asyncio.sleep(delay_s)
+    batch, _pending = _pending, ChangeBatch()
+    _flush_task = None
+    if batch:
+        await _deliver(batch)
+
+
+def _on_notify(connection, pid, channel, payload) -> None:
+    global _flush_task
+    try:
+        op, value = _parse(payload)
+    except (ValueError, KeyError, TypeError, json.JSONDecodeError):
+        logger.warning(f"Ignoring malformed {CHANGE_CHANNEL} payload: {payload!r}")
+        return
+    if op == "VERSION":
+        _pending.version = value
+        # Until subscribers switch, queries are embedded for the replaced version: no coalescing
+        if _flush_task is not None:
+            _flush_task.cancel()
+        _flush_task = asyncio.get_running_loop().create_task(_flush(0))
+        return
+    _pending.add(op, value)
+    if _flush_task is None:
+        _flush_task = asyncio.get_running_loop().create_task(_flush())
+
+
+def _on_closed(connection) -> None:
+    global _reconnect_task
+    if _stopping:
+        return
+    logger.warning(f"Lost the {CHANGE_CHANNEL} LISTEN connection, reconnecting")
+    if _reconnect_task is None or _reconnect_task.done():
+        _reconnect_task = asyncio.get_running_loop().create_task(_reconnect())
+
+
+async def _connect() -> None:
+    global _listener
+    connection = await pg.open_connection()
+    try:
+        await connection.add_listener(CHANGE_CHANNEL, _on_notify)
+    except Exception:
+        await connection.close()
+        raise
+    connection.add_termination_listener(_on_closed)
+    _listener = connection
+
+
+async def _reconnect() -> None:
+    attempt = 0
+    while not _stopping:
+        await asyncio.sleep(_RECONNECT_DELAYS_S[min(attempt, len(_RECONNECT_DELAYS_S) - 1)])
+        attempt += 1
+        try:
+            await _connect()
+        except Exception as e:
+            logger.warning(f"{CHANGE_CHANNEL} reconnect attempt {attempt} failed: {e}")
+            continue
+        logger.info(f"{CHANGE_CHANNEL} LISTEN connection restored, asking subscribers to resync")
+        await _deliver(ChangeBatch(resync=True))
+        return
+
+
+async def start() -> None:
+    """
+    Opens the LISTEN connection. Subscribers that load state at startup should
+    subscribe before loading, so no change between the load and the first
+    notification is missed.
+    """
+    global _stopping
+    _stopping = False
+    try:
+        await _connect()
+        logger.info(f"Listening for candidate changes on {CHANGE_CHANNEL}")
+    except Exception as e:
+        logger.error(f"Failed to LISTEN on {CHANGE_CHANNEL}, in-process indexes cannot stay fresh: {e}")
+
+
+async def stop() -> None:
+    global _listener, _stopping, _flush_task, _reconnect_task
+    _stopping = True
+    for task in (_flush_task, _reconnect_task):
+        if task is not None:
+            task.cancel()
+    _flush_task = _reconnect_task = None
+    if _listener is not None:
+        listener, _listener = _listener, None
+        if not listener.is_closed():
+            await listener.close()
@@ -1,25 +1,55 @@
-import google.generativeai as genai
+import asyncio
+import threading
 
 from app.core.config import settings
 
-# Configure the generative AI model
-genai.configure(api_key=settings.GEMINI_API_KEY)
+_genai = None
+_genai_lock = threading.Lock()
 
-async def embed_query(text: str) -> list[float]:
+
+def _client():
+    """
+    google.generativeai, imported and configured on first use. The SDK and its gRPC /
+    protobuf stack take about half a second to import, so startup warms it in a thread
+    (warm_up) while the DB pool connects instead of paying it at module import.
+    """
+    global _genai
+    if _genai is None:
+        with _genai_lock:
+            if _genai is None:
+                import google.generativeai as genai
+                genai.configure(api_key=settings.GEMINI_API_KEY)
+                _genai = genai
+    return _genai
+
+
+def is_loaded() -> bool:
+    return _genai is not None
+
+
+async def warm_up() -> None:
+    await asyncio.to_thread(_client)
+
+
+async def embed_query(text: str, model: str | None = None, dim: int | None = None) -> list[float]:
     """
-    Generates an embedding for the given text using the 'text-embedding-004' model.
-    The result is padded to 1536 dimensions to match the database schema.
+    Generates an embedding for the given text. The model and dimension default to the
+    active embedding version (settings.EMBEDDING_MODEL / VECTOR_DIM, see
+    app.services.embedding_versions), so queries match the stored vectors.
+    The result is zero-padded to the dimension of the vector column.
     """
-    result = await genai.embed_content_async(
-        model="models/text-embedding-004",
+    dim = dim or settings.VECTOR_DIM
+    result = await _client().embed_content_async(
+        model=model or settings.EMBEDDING_MODEL,
         content=text,
         task_type="retrieval_query"
     )
     embedding = result['embedding']
-    # Pad the embedding with zeros to 1536 dimensions
-    if len(embedding) < 1536:
-        padding = [0.0] * (1536 - len(embedding))
-        embedding.extend(padding)
+    if len(embedding) > dim:
+        raise ValueError(f"{model or settings.EMBEDDING_MODEL} returned {len(embedding)} dimensions, more than {dim}")
+    # Pad the embedding with zeros to the column dimension
+    if len(embedding) < dim:
+        embedding.extend([0.0] * (dim - len(embedding)))
     return embedding
 
 async def gemini_flash_json(prompt: str) -> str:
@@ -32,7 +62,7 @@ async def gemini_flash_json(prompt: str) -> str:
     1. Using "gemini-2.5-flash" (non-reasoning version)
     2. Adding generation_config parameters if available in the SDK
     """
-    model = genai.GenerativeModel("gemini-2.5-flash-lite")
+    model = _client().GenerativeModel("gemini-2.5-flash-lite")
     
     # Try to disable reasoning if the parameter exists
     # Common parameters: reasoning_threshold, use_reasoning, reasoning_mode
@@ -1,10 +1,177 @@
 import asyncpg
+import numpy as np
+import orjson
+import struct
+from collections import OrderedDict
+from pyroaring import BitMap
+from app.adapters import term_index
 from app.core.config import settings
 import logging
 import ssl
 
 _pool = None
 
+# asyncpg's default per-connection prepared statement cache size
+STATEMENT_CACHE_SIZE = 100
+
+class StatementCacheStats:
+    """
+    Mirrors asyncpg's per-connection LRU statement cache to report how often a
+    query text is already prepared on the connection that runs it.
+    asyncpg does not expose its cache counters, so this tracks query texts per
+    backend pid with the same capacity.
+    """
+
+    def __init__(self, capacity: int = STATEMENT_CACHE_SIZE):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._seen: dict[int, OrderedDict] = {}
+        self._statements: set[str] = set()
+
+    def record(self, connection, query: str) -> None:
+        seen = self._seen.setdefault(connection.get_server_pid(), OrderedDict())
+        self._statements.add(query)
+        if query in seen:
+            seen.move_to_end(query)
+            self.hits += 1
+            return
+        self.misses += 1
+        seen[query] = None
+        if len(seen) > self.capacity:
+            seen.popitem(last=False)
+
+    def snapshot(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+            "distinct_statements": len(self._statements),
+            "connections": len(self._seen),
+        }
+
+statement_stats = StatementCacheStats()
+
+def _ssl_context() -> ssl.SSLContext:
+    # Supabase requires SSL connection
+    # Create SSL context for Supabase (verify mode is CERT_NONE for Supabase's self-signed certs)
+    ssl_context = ssl.create_default_context()
+    ssl_context.check_hostname = False
+    ssl_context.verify_mode = ssl.CERT_NONE
+    return ssl_context
+
+def _connect_kwargs() -> dict:
+    return dict(
+        user=settings.DB_USER,
+        password=settings.DB_PASSWORD,
+        host=settings.DB_HOST,
+        port=settings.DB_PORT,
+        database=settings.DB_NAME,
+        ssl=_ssl_context(),  # Supabase requires SSL
+        # Startup parameters become the session defaults, so they survive the pool's RESET ALL
+        server_settings={'jit': 'on' if settings.DB_JIT else 'off'},
+    )
+
+# Session-level planner knobs (ivfflat.probes / hnsw.ef_search) kept on every pooled connection.
+# They can change at runtime (e.g. after an index rebuild), so each connection remembers
+# which version it has applied.
+_session_settings: dict[str, str] = {}
+_session_version = 0
+_applied_versions: dict[int, int] = {}
+
+def _session_settings_sql() -> str:
+    if not _session_settings:
+        return ''
+    values = ", ".join(
+        f"set_config('{name}', '{value}', false)" for name, value in _session_settings.items()
+    )
+    return f"\nSELECT {values};"
+
+def set_session_settings(values: dict[str, str]) -> None:
+    """
+    Sets the planner knobs applied to pooled connections at creation and on every release.
+    Connections still on the previous version fall back to per-transaction settings.
+    """
+    global _session_version
+    values = {name: str(int(value)) for name, value in values.items()}
+    if values == _session_settings:
+        return
+    _session_settings.clear()
+    _session_settings.update(values)
+    _session_version += 1
+
+def session_settings(connection) -> dict[str, str]:
+    """The session-level knobs in effect on `connection` ({} if it has not applied the current version)."""
+    if _applied_versions.get(connection.get_server_pid()) != _session_version:
+        return {}
+    return dict(_session_settings)
+
+class _PoolConnection(asyncpg.Connection):
+    # Relies on the pool calling get_reset_query() on release (asyncpg >= 0.30, pinned in requirements.txt)
+    def get_reset_query(self):
+        # RESET ALL on release would drop the session knobs: re-apply them in the same round trip
+        _applied_versions[self.get_server_pid()] = _session_version
+        return super().get_reset_query() + _session_settings_sql()
+
+# Callbacks run on every new pooled connection after the codecs are registered
+# (e.g. app.adapters.repository prepares its hot statements)
+_connection_initializers = []
+
+def add_connection_initializer(callback) -> None:
+    if callback not in _connection_initializers:
+        _connection_initializers.append(callback)
+
+_VECTOR_HEADER = struct.Struct('>HH')
+# pgvector's binary format: uint16 dim, uint16 unused, then big-endian float4 values
+_VECTOR_DTYPE = np.dtype('>f4')
+
+def _encode_vector(value) -> bytes:
+    data = np.asarray(value, dtype=_VECTOR_DTYPE)
+    return _VECTOR_HEADER.pack(data.shape[0], 0) + data.tobytes()
+
+def _decode_vector(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype=_VECTOR_DTYPE, offset=_VECTOR_HEADER.size).astype(np.float32)
+
+def _encode_jsonb(value) -> bytes:
+    # jsonb binary format: version byte 1, then the JSON text
+    return b'\x01' + orjson.dumps(value)
+
+def _decode_jsonb(data: bytes):
+    return orjson.loads(data[1:])
+
+async def _init_connection(connection: asyncpg.Connection) -> None:
+    """
+    Registers type codecs on every new connection:
+    - jsonb / json <-> Python objects via orjson (no json.loads on read paths)
+    - vector <-> float32 NumPy arrays in pgvector's binary format (no ::float[]::vector casts)
+    The vector codec is skipped while the extension is not installed yet (e.g. first db_init run).
+    """
+    await connection.set_type_codec(
+        'jsonb', schema='pg_catalog', encoder=_encode_jsonb, decoder=_decode_jsonb, format='binary'
+    )
+    await connection.set_type_codec(
+        'json', schema='pg_catalog', encoder=lambda v: orjson.dumps(v).decode(), decoder=orjson.loads, format='text'
+    )
+    # Supabase installs extensions into the "extensions" schema, plain PostgreSQL into "public"
+    vector_schema = await connection.fetchval(
+        "SELECT n.nspname FROM pg_type t JOIN pg_namespace n ON n.oid = t.typnamespace WHERE t.typname = 'vector'"
+    )
+    if vector_schema:
+        await connection.set_type_codec(
+            'vector', schema=vector_schema, encoder=_encode_vector, decoder=_decode_vector, format='binary'
+        )
+
+async def _init_pool_connection(connection: asyncpg.Connection) -> None:
+    await _init_connection(connection)
+    pid = connection.get_server_pid()
+    if _session_settings:
+        await connection.execute(_session_settings_sql())
+    _applied_versions[pid] = _session_version
+    connection.add_termination_listener(lambda _: _applied_versions.pop(pid, None))
+    for callback in _connection_initializers:
+        await callback(connection)
+
 async def connect_db():
     """
     Initializes the PostgreSQL connection pool.
@@ -16,22 +183,16 @@ async def connect_db():
 
     # If pool is None or closed, create a new one
     try:
-        # Supabase requires SSL connection
-        # Create SSL context for Supabase (verify mode is CERT_NONE for Supabase's self-signed certs)
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-        
+        connect_kwargs = _connect_kwargs()
+        # Request-serving connections only; standalone ones (LISTEN, bulk loads) have no timeout
+        connect_kwargs['server_settings']['statement_timeout'] = str(settings.DB_STATEMENT_TIMEOUT_MS)
         _pool = await asyncpg.create_pool(
-            user=settings.DB_USER,
-            password=settings.DB_PASSWORD,
-            host=settings.DB_HOST,
-            port=settings.DB_PORT,
-            database=settings.DB_NAME,
-            ssl=ssl_context,  # Supabase requires SSL
+            **connect_kwargs,
             min_size=1,
             max_size=10,
-            command_timeout=60
+            command_timeout=60,
+            init=_init_pool_connection,
+            connection_class=_PoolConnection,
         )
         logging.info(f"PostgreSQL connection pool created successfully. Connected to {settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}")
     except Exception as e:
@@ -39,6 +200,18 @@ async def connect_db():
         logging.error(f"Connection details: host={settings.DB_HOST}, port={settings.DB_PORT}, database={settings.DB_NAME}, user={settings.DB_USER}")
         raise
 
+async def open_connection() -> asyncpg.Connection:
+    """
+    Opens a standalone connection outside the pool.
+    Used for long-lived sessions such as LISTEN, which must not hold a pool slot, and for
+    long statements (index builds, bulk loads, corpus scans): unlike pooled connections it
+    has neither a statement_timeout nor a client-side command_timeout.
+    The connection has the same type codecs as pooled ones. Callers close it.
+    """
+    connection = await asyncpg.connect(**_connect_kwargs())
+    await _init_connection(connection)
+    return connection
+
 async def close_db():
     """
     Closes the PostgreSQL connection pool.
@@ -48,6 +221,16 @@ async def close_db():
         await _pool.close()
         logging.info("PostgreSQL connection pool closed.")
 
+async def reset_statement_caches():
+    """
+    Replaces every pooled connection on its next acquire, dropping the prepared
+    statements cached on it. Needed after candidates.vector is swapped for a column of
+    another dimension (see app.services.embedding_versions): statements returning vectors
+    would fail with "cached plan must not change result type".
+    """
+    if _pool is not None and not _pool.is_closing():
+        await _pool.expire_connections()
+
 async def execute_query(query: str, *args):
     """
     Executes a SQL query and returns the results.
@@ -56,6 +239,7 @@ async def execute_query(query: str, *args):
         raise ConnectionError("Database pool not initialized. Call connect_db() first.")
     
     async with _pool.acquire() as connection:
+        statement_stats.record(connection, query)
         try:
             return await connection.fetch(query, *args)
         except Exception as e:
@@ -72,9 +256,184 @@ async def fetch_val(query: str, *args):
         raise ConnectionError("Database pool not initialized. Call connect_db() first.")
     
     async with _pool.acquire() as connection:
+        statement_stats.record(connection, query)
         return await connection.fetchval(query, *args)
 
-async def structured_search(search_filters: dict, k: int = 30) -> list[dict]:
+_TEXT_FILTERS = (
+    ('name_contains', 'name'),
+    ('introduce_contains', 'introduce'),
+    ('cards_contains', 'cards::text'),
+)
+
+def _text_condition_groups(search_filters: dict, param_idx: int) -> tuple[list[str], list, int]:
+    """
+    Builds the ILIKE conditions for name_contains / introduce_contains / cards_contains.
+    The text is the same for any number of terms (`ILIKE ANY($n)`), so the statement
+    stays reusable from the prepared statement cache. The cardinality guard lets the
+    planner drop unused groups, which would otherwise force a sequential scan.
+    Returns (groups, params, next_param_idx).
+    """
+    field_groups = []
+    params = []
+    for filter_key, column in _TEXT_FILTERS:
+        field_groups.append(f"(cardinality(${param_idx}::text[]) > 0 AND {column} ILIKE ANY(${param_idx}::text[]))")
+        params.append([f"%{term}%" for term in search_filters.get(filter_key) or []])
+        param_idx += 1
+    return field_groups, params, param_idx
+
+def has_text_filters(search_filters: dict) -> bool:
+    return any(search_filters.get(filter_key) for filter_key, _ in _TEXT_FILTERS)
+
+def has_structured_filters(search_filters: dict) -> bool:
+    return has_text_filters(search_filters) or any(
+        search_filters.get(key) for key in ('keywords_any', 'keywords_all', 'skills_any', 'skills_all')
+    )
+
+def _normalized_terms(values) -> list[str]:
+    return sorted({value.strip().lower() for value in values or [] if value and value.strip()})
+
+def has_hard_constraints(hard_constraints: dict | None) -> bool:
+    return bool(hard_constraints) and bool(
+        _normalized_terms(hard_constraints.get('location_any_of')) or _normalized_terms(hard_constraints.get('must_have'))
+    )
+
+def build_hard_constraints(hard_constraints: dict | None, param_idx: int) -> tuple[str, list, int]:
+    """
+    Compiles Persona.constraints_hard into one AND-able predicate:
+    - location_any_of: location is unknown (NULL) or one of the given places (idx_candidates_location)
+    - must_have: every term is among the candidate's lower-cased keywords/skills
+      (search_terms, idx_candidates_search_terms_gin)
+    The text is fixed (empty arrays disable a part), so callers get one statement shape.
+    Returns (predicate, params, next_param_idx).
+    """
+    hard_constraints = hard_constraints or {}
+    predicate = (
+        f"(cardinality(${param_idx}::text[]) = 0 OR location IS NULL OR lower(location) = ANY(${param_idx}::text[]))"
+        f" AND search_terms @> ${param_idx + 1}::text[]"
+    )
+    params = [
+        _normalized_terms(hard_constraints.get('location_any_of')),
+        _normalized_terms(hard_constraints.get('must_have')),
+    ]
+    return predicate, params, param_idx + 2
+
+def build_structured_conditions(search_filters: dict, param_idx: int = 1) -> tuple[list[str], list, int]:
+    """
+    Builds the structured_search WHERE condition groups, one per field.
+    `_any` / `_all` are OR'd within a field; callers OR the groups together.
+    
+    Every filter is always present as an array parameter, with empty arrays
+    disabling it (`cardinality($n) > 0 AND ...`), so all filter combinations
+    compile to the same canonical statement text.
+    Returns (groups, params, next_param_idx) so the conditions can be embedded in larger queries.
+    """
+    field_groups = []
+    params = []
+    
+    for field in ('keywords', 'skills'):
+        # JSONB array filtering - OR within field
+        # `?&` with an empty array is true, hence the cardinality guards
+        field_groups.append(
+            f"(cardinality(${param_idx}::text[]) > 0 AND {field} ?| ${param_idx}::text[]"
+            f" OR cardinality(${param_idx + 1}::text[]) > 0 AND {field} ?& ${param_idx + 1}::text[])"
+        )
+        params.append(list(search_filters.get(f'{field}_any') or []))
+        params.append(list(search_filters.get(f'{field}_all') or []))
+        param_idx += 2
+    
+    # name / introduce / cards filtering (TEXT)
+    text_groups, text_params, param_idx = _text_condition_groups(search_filters, param_idx)
+    field_groups.extend(text_groups)
+    params.extend(text_params)
+    return field_groups, params, param_idx
+
+def _any_terms(search_filters: dict, field: str) -> list[str]:
+    return list(dict.fromkeys(search_filters.get(f'{field}_any') or []))
+
+def _term_weight(term_weights: dict | None, field: str, term: str) -> float:
+    return float(((term_weights or {}).get(field) or {}).get(term, 1.0))
+
+def max_match_count(search_filters: dict, term_weights: dict | None = None) -> float:
+    """The match_count of a row containing every keywords_any / skills_any term (score normalizer)."""
+    total = sum(
+        _term_weight(term_weights, field, term) for field in ('keywords', 'skills') for term in _any_terms(search_filters, field)
+    )
+    return total if total > 0 else 1
+
+def build_match_count_expr(search_filters: dict, param_idx: int, term_weights: dict | None = None) -> tuple[str, list, int]:
+    """
+    Builds the match_count expression: the summed weight of the keywords_any / skills_any
+    terms a row contains. `term_weights` ({field: {term: weight}}, e.g. IDF from
+    app.services.filter_planner) default to 1, which makes it a plain count.
+    Returns (expression, params, next_param_idx); the text does not depend on the filters.
+    """
+    parts = []
+    params = []
+    for field in ('keywords', 'skills'):
+        parts.append(
+            f"(SELECT COALESCE(SUM(w.weight), 0) FROM unnest(${param_idx}::text[], ${param_idx + 1}::float8[]) AS w(term, weight)"
+            f" WHERE {field} ? w.term)"
+        )
+        terms = _any_terms(search_filters, field)
+        params.append(terms)
+        params.append([_term_weight(term_weights, field, term) for term in terms])
+        param_idx += 2
+    return " + ".join(parts), params, param_idx
+
+async def _indexed_structured_search(
+    search_filters: dict, k: int, ids_only: bool = False, term_weights: dict | None = None
+) -> list[dict]:
+    """
+    structured_search evaluated on the in-memory term index.
+    Keyword/skill set algebra and match_count come from Roaring bitmaps; only the
+    ILIKE groups (if any) and the final top-k rows are fetched from PostgreSQL.
+    """
+    index = term_index.get_index()
+    matched = index.match(search_filters)
+
+    if has_text_filters(search_filters):
+        text_groups, text_params, _ = _text_condition_groups(search_filters, 1)
+        text_rows = await execute_query(
+            f"SELECT id FROM candidates WHERE {' OR '.join(text_groups)}", *text_params
+        )
+        matched |= BitMap(row['id'] for row in text_rows)
+    elif not has_structured_filters(search_filters):
+        logging.warning("No search filters provided, returning empty results")
+        return []
+
+    counts = index.overlap_counts(matched, search_filters, term_weights)
+    top = index.top(matched, counts, k)
+    if not top:
+        return []
+
+    max_score = max_match_count(search_filters, term_weights)
+    if ids_only:
+        return [{'id': str(candidate_id), 'score': float(match_count) / max_score} for candidate_id, match_count in top]
+
+    rows = await execute_query(
+        "SELECT id, name, email, introduce, keywords, skills, cards, created_at FROM candidates WHERE id = ANY($1::int[])",
+        [candidate_id for candidate_id, _ in top],
+    )
+    rows_by_id = {row['id']: row for row in rows}
+
+    results = []
+    for candidate_id, match_count in top:
+        row = rows_by_id.get(candidate_id)
+        if row is None:
+            continue
+        result = dict(row)
+        result['id'] = str(result['id'])
+        result['score'] = float(match_count) / max_score
+        results.append(result)
+    return results
+
+async def structured_search(
+    search_filters: dict,
+    k: int = 30,
+    ids_only: bool = False,
+    hard_constraints: dict | None = None,
+    term_weights: dict | None = None,
+) -> list[dict]:
     """
     Performs structured search using field-specific WHERE conditions.
     Uses JSONB operators for precise matching.
@@ -82,9 +441,15 @@ async def structured_search(search_filters: dict, k: int = 30) -> list[dict]:
     Conditions are connected with OR to maximize candidate pool.
     Each field's conditions are grouped, and all field groups are OR'd together.
     
+    When the in-memory term index is warm and there are no hard constraints, the
+    keyword/skill algebra is evaluated there instead (see _indexed_structured_search).
+    
     Args:
         search_filters: Dictionary with field-specific filters
         k: Maximum number of results to return
+        ids_only: Return only 'id' and 'score' (rows are hydrated later, once per request)
+        hard_constraints: Persona.constraints_hard, AND-ed with the OR'd filter groups
+        term_weights: Per-term match_count weights ({field: {term: weight}}, see build_match_count_expr)
     
     Returns:
         List of candidate dictionaries with 'score' field
@@ -92,125 +457,38 @@ async def structured_search(search_filters: dict, k: int = 30) -> list[dict]:
     if _pool is None:
         raise ConnectionError("Database pool not initialized. Call connect_db() first.")
     
-    # Calculate total number of terms for normalization
-    total_terms = 0
-    if search_filters.get('keywords_any'):
-        total_terms += len(search_filters['keywords_any'])
-    if search_filters.get('skills_any'):
-        total_terms += len(search_filters['skills_any'])
-    
-    # Build field-specific condition groups (each group uses OR internally)
-    field_groups = []
-    params = []
-    param_idx = 1
+    if term_index.is_warm() and not has_hard_constraints(hard_constraints):
+        return await _indexed_structured_search(search_filters, k, ids_only, term_weights)
     
-    # keywords filtering (JSONB array) - OR within field
-    keyword_conditions = []
-    if search_filters.get('keywords_any'):
-        keywords_list = search_filters['keywords_any']
-        keyword_conditions.append(f"keywords ?| ${param_idx}::text[]")
-        params.append(keywords_list)
-        param_idx += 1
+    # Normalizer: the score of a row matching every _any term
+    max_score = max_match_count(search_filters, term_weights)
     
-    if search_filters.get('keywords_all'):
-        keywords_all = search_filters['keywords_all']
-        keyword_conditions.append(f"keywords ?& ${param_idx}::text[]")
-        params.append(keywords_all)
-        param_idx += 1
-    
-    if keyword_conditions:
-        field_groups.append(f"({' OR '.join(keyword_conditions)})")
-    
-    # skills filtering (JSONB array) - OR within field
-    skill_conditions = []
-    if search_filters.get('skills_any'):
-        skills_list = search_filters['skills_any']
-        skill_conditions.append(f"skills ?| ${param_idx}::text[]")
-        params.append(skills_list)
-        param_idx += 1
-    
-    if search_filters.get('skills_all'):
-        skills_all = search_filters['skills_all']
-        skill_conditions.append(f"skills ?& ${param_idx}::text[]")
-        params.append(skills_all)
-        param_idx += 1
-    
-    if skill_conditions:
-        field_groups.append(f"({' OR '.join(skill_conditions)})")
-    
-    # name filtering (TEXT) - already OR'd internally
-    if search_filters.get('name_contains'):
-        name_terms = search_filters['name_contains']
-        name_conditions = []
-        for term in name_terms:
-            name_conditions.append(f"name ILIKE ${param_idx}")
-            params.append(f"%{term}%")
-            param_idx += 1
-        if name_conditions:
-            field_groups.append(f"({' OR '.join(name_conditions)})")
-    
-    # introduce filtering (TEXT) - already OR'd internally
-    if search_filters.get('introduce_contains'):
-        intro_terms = search_filters['introduce_contains']
-        intro_conditions = []
-        for term in intro_terms:
-            intro_conditions.append(f"introduce ILIKE ${param_idx}")
-            params.append(f"%{term}%")
-            param_idx += 1
-        if intro_conditions:
-            field_groups.append(f"({' OR '.join(intro_conditions)})")
-    
-    # cards filtering (JSONB) - already OR'd internally
-    if search_filters.get('cards_contains'):
-        cards_terms = search_filters['cards_contains']
-        cards_conditions = []
-        for term in cards_terms:
-            cards_conditions.append(f"cards::text ILIKE ${param_idx}")
-            params.append(f"%{term}%")
-            param_idx += 1
-        if cards_conditions:
-            field_groups.append(f"({' OR '.join(cards_conditions)})")
-    
-    # Build final query - all field groups connected with OR
-    if not field_groups:
+    if not has_structured_filters(search_filters):
         # No filters provided, return empty or use a default search
         logging.warning("No search filters provided, returning empty results")
         return []
     
-    # Build score calculation: count matching keywords and skills for relevance scoring
-    score_select_parts = []
-    score_joins = []
-    
-    # Calculate match score based on overlapping keywords/skills
-    if search_filters.get('keywords_any'):
-        keywords_list = search_filters['keywords_any']
-        score_select_parts.append(
-            f"(SELECT COUNT(*) FROM jsonb_array_elements_text(keywords) AS kw WHERE kw.value = ANY(${param_idx}::text[]))"
-        )
-        params.append(keywords_list)
-        param_idx += 1
-    
-    if search_filters.get('skills_any'):
-        skills_list = search_filters['skills_any']
-        if score_select_parts:
-            score_select_parts.append(" + ")
-        score_select_parts.append(
-            f"(SELECT COUNT(*) FROM jsonb_array_elements_text(skills) AS sk WHERE sk.value = ANY(${param_idx}::text[]))"
-        )
-        params.append(skills_list)
-        param_idx += 1
+    # Canonical statement: the text only varies with ids_only, never with the filters
+    field_groups, params, param_idx = build_structured_conditions(search_filters, 1)
     
-    match_score_expr = "".join(score_select_parts) if score_select_parts else "0"
+    match_score_expr, score_params, param_idx = build_match_count_expr(search_filters, param_idx, term_weights)
+    params.extend(score_params)
     
     # Connect all field groups with OR to maximize candidate pool
-    where_clause = " OR ".join(field_groups) if len(field_groups) > 1 else field_groups[0] if field_groups else "TRUE"
+    where_clause = " OR ".join(field_groups)
+    if has_hard_constraints(hard_constraints):
+        # Hard constraints narrow the pool before scoring
+        hard_predicate, hard_params, param_idx = build_hard_constraints(hard_constraints, param_idx)
+        where_clause = f"({where_clause}) AND {hard_predicate}"
+        params.extend(hard_params)
     
+    columns = "id" if ids_only else "id, name, email, introduce, keywords, skills, cards"
     query_parts = [
-        "SELECT id, name, email, introduce, keywords, skills, cards, created_at,",
+        f"SELECT {columns}, created_at,",
         f"{match_score_expr} as match_count",
         "FROM candidates",
         f"WHERE {where_clause}",
-        f"ORDER BY match_count DESC, created_at DESC",
+        f"ORDER BY match_count DESC, created_at DESC NULLS LAST",
         f"LIMIT ${param_idx}"
     ]
     
@@ -219,6 +497,7 @@ async def structured_search(search_filters: dict, k: int = 30) -> list[dict]:
     final_query = " ".join(query_parts)
     
     async with _pool.acquire() as connection:
+        statement_stats.record(connection, final_query)
         try:
             rows = await connection.fetch(final_query, *params)
         except Exception as e:
@@ -229,14 +508,14 @@ async def structured_search(search_filters: dict, k: int = 30) -> list[dict]:
     
     # Normalize match_count to score (0.0 to 1.0)
     results = []
-    # Use total_terms for normalization, which was calculated at the beginning
-    max_score = total_terms if total_terms > 0 else 1
     for row in rows:
         result = dict(row)
         result['id'] = str(result['id'])
         # Convert match_count to normalized score
         match_count = result.pop('match_count', 0)
         result['score'] = float(match_count) / max_score if max_score > 0 else 0.0
+        if ids_only:
+            result.pop('created_at', None)
         results.append(result)
     
     return results
@@ -300,6 +579,7 @@ async def db_keyword_topk(persona: dict, k: int) -> list[dict]:
     final_query = " ".join(query_parts)
 
     async with _pool.acquire() as connection:
+        statement_stats.record(connection, final_query)
         try:
             rows = await connection.fetch(final_query, *params)
         except Exception as e:
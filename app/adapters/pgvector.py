@@ -1,5 +1,11 @@
 
 import logging
+import math
+
+import numpy as np
+
+from app.adapters import pg, repository, term_index, vector_index
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -11,61 +17,44 @@ def is_pgvector_available() -> bool:
     return True
 
 
-async def vector_topk(vector: list[float], k: int) -> list[dict]:
+async def vector_topk(
+    vector: list[float],
+    k: int,
+    probes: int | None = None,
+    ef_search: int | None = None,
+    ids_only: bool = False,
+    hard_constraints: dict | None = None,
+) -> list[dict]:
     """
     Performs a vector search using pgvector to find the top-k most similar items.
     Uses cosine similarity search in PostgreSQL.
-    """
-    # Import pool dynamically to ensure it's initialized
-    from app.adapters.pg import _pool, connect_db
     
-    if _pool is None:
-        logger.error("Database pool not initialized. Attempting to connect...")
-        try:
-            await connect_db()
-            # Re-import after connection
-            from app.adapters.pg import _pool as _pool_after
-            if _pool_after is None:
-                logger.error("Failed to initialize database pool after retry.")
-                return []
-            logger.info("Database pool initialized successfully.")
-        except Exception as e:
-            logger.error(f"Failed to connect to database: {e}")
-            return []
+    With `ids_only`, only id and score are selected (no payload); candidate rows
+    are then hydrated once per request by app.services.hydration.
     
-    # Use the pool
-    from app.adapters.pg import _pool
+    `probes` (ivfflat) and `ef_search` (hnsw) trade recall for latency for this
+    search only; unset values fall back to vector_index.search_settings().
     
-    if not vector or len(vector) == 0:
+    `hard_constraints` (Persona.constraints_hard) are applied as a WHERE filter
+    before ranking.
+    """
+    if vector is None or len(vector) == 0:
         logger.warning("Empty query vector provided")
         return []
     
     try:
-        # Convert vector to PostgreSQL array format
-        # pgvector accepts vectors as PostgreSQL arrays which can be cast to vector type
-        vector_list = [float(v) for v in vector]
+        # Sent in pgvector's binary format by the pool's vector codec (see pg._init_connection)
+        query_vector = np.asarray(vector, dtype=np.float32)
+        
+        gucs = vector_index.search_settings(probes, ef_search)
+        if "hnsw.ef_search" in gucs and ef_search is None:
+            # ef_search bounds how many candidates HNSW returns, so it must be at least k
+            gucs["hnsw.ef_search"] = str(max(int(gucs["hnsw.ef_search"]), k))
         
-        query = """
-            SELECT 
-                id,
-                name,
-                email,
-                introduce,
-                keywords,
-                skills,
-                cards,
-                created_at,
-                1 - (vector <=> $1::float[]::vector) as score
-            FROM candidates
-            WHERE vector IS NOT NULL
-            ORDER BY vector <=> $1::float[]::vector
-            LIMIT $2
-        """
+        rows = await repository.vector_topk(query_vector, k, gucs, ids_only=ids_only, hard_constraints=hard_constraints)
         
-        async with _pool.acquire() as connection:
-            # Pass Python list as PostgreSQL array, then cast to vector type
-            # asyncpg handles the array parameter binding automatically
-            rows = await connection.fetch(query, vector_list, k)
+        if ids_only:
+            return [{"id": str(row['id']), "score": float(row['score'] or 0.0)} for row in rows]
         
         # Convert results to list of dictionaries matching actual DB schema
         results = []
@@ -93,82 +82,259 @@ async def vector_topk(vector: list[float], k: int) -> list[dict]:
         return []
 
 
-async def retrieve_vectors(ids: list[str]) -> dict[str, list[float]]:
+# Upper bound pgvector accepts for hnsw.ef_search; also used to cap ivfflat.probes
+_MAX_SCAN_KNOB = 1000
+
+
+async def _estimate_selectivity(search_filters: dict, hard_constraints: dict | None) -> tuple[int, int]:
     """
-    Retrieves vectors for a list of document IDs from PostgreSQL.
+    (matching rows, total rows) for the filters: exact from the term index when it
+    can evaluate them on its own, otherwise the planner's estimate.
     """
-    # Import pool dynamically to ensure it's initialized
-    from app.adapters.pg import _pool, connect_db
-    
-    if _pool is None:
-        logger.error("Database pool not initialized. Attempting to connect...")
+    index = term_index.get_index()
+    if term_index.is_warm() and not pg.has_text_filters(search_filters) and not pg.has_hard_constraints(hard_constraints):
+        return len(index.match(search_filters)), len(index)
+    return await repository.estimate_filtered_rows(search_filters, hard_constraints)
+
+
+def _widened_settings(gucs: dict[str, str], k: int, selectivity: float) -> dict[str, str] | None:
+    """
+    ANN knobs scaled by 1 / selectivity, so the index returns enough rows for k to
+    survive the filter. None when that would exceed what the index can scan, or when
+    there are no knobs to widen (no ANN index: the post-filter query is already exact).
+    """
+    if not gucs:
+        return None
+    widened = {}
+    for name, value in gucs.items():
+        base = max(int(value), k) if name == "hnsw.ef_search" else int(value)
+        scaled = math.ceil(base / selectivity)
+        if scaled > _MAX_SCAN_KNOB:
+            return None
+        widened[name] = str(scaled)
+    return widened
+
+
+async def filtered_vector_topk(
+    vector: list[float],
+    k: int,
+    search_filters: dict,
+    hard_constraints: dict | None = None,
+    probes: int | None = None,
+    ef_search: int | None = None,
+) -> list[dict]:
+    """
+    Vector top-k among the candidates matching SearchFilters (field groups OR'd,
+    as in structured_search) and the hard constraints. Returns [{"id", "score"}].
+
+    The plan is chosen from the estimated selectivity:
+    - few matches (<= VECTOR_PREFILTER_MAX_ROWS): exact scan over the filtered rows
+    - otherwise: ANN scan with the filter applied to its output, probes / ef_search
+      widened by 1 / selectivity; if fewer than k rows survive, the knobs are widened
+      again, and the exact scan is the last resort
+    Either way a full k is returned whenever k rows match, and no extra rows are fetched.
+    """
+    if vector is None or len(vector) == 0:
+        logger.warning("Empty query vector provided")
+        return []
+    if not pg.has_structured_filters(search_filters) and not pg.has_hard_constraints(hard_constraints):
+        return await vector_topk(vector, k, probes, ef_search, ids_only=True)
+
+    query_vector = np.asarray(vector, dtype=np.float32)
+    try:
+        matching, total = await _estimate_selectivity(search_filters, hard_constraints)
+        if matching == 0:
+            return []
+        gucs = None
+        if matching > settings.VECTOR_PREFILTER_MAX_ROWS:
+            gucs = _widened_settings(vector_index.search_settings(probes, ef_search), k, matching / total)
+
+        rows = []
+        expansions = 0
+        while gucs is not None:
+            rows = await repository.filtered_vector_topk(
+                query_vector, k, search_filters, hard_constraints, gucs, exact=False
+            )
+            if len(rows) >= k or expansions >= settings.VECTOR_POSTFILTER_MAX_EXPANSIONS:
+                break
+            # The estimate was optimistic: widen by the observed shortfall
+            expansions += 1
+            gucs = _widened_settings(gucs, k, max(len(rows), 1) / k)
+
+        strategy = "postfilter"
+        if len(rows) < k:
+            strategy = "prefilter"
+            rows = await repository.filtered_vector_topk(
+                query_vector, k, search_filters, hard_constraints, {}, exact=True
+            )
+        logger.info(
+            f"Filtered vector search ({strategy}, ~{matching}/{total} rows match, "
+            f"{expansions} expansions) returned {len(rows)} results"
+        )
+        return [{"id": str(row['id']), "score": float(row['score'] or 0.0)} for row in rows]
+
+    except Exception as e:
+        logger.error(f"Filtered vector search (pgvector) failed: {e}", exc_info=True)
+        return []
+
+
+# Same document text db_keyword_topk ranks with ts_rank_cd
+_FULLTEXT_DOCUMENT = (
+    "to_tsvector('english', COALESCE(name, '') || ' ' || COALESCE(introduce, '') || ' ' || "
+    "COALESCE(keywords::text, '') || ' ' || COALESCE(skills::text, '') || ' ' || COALESCE(cards::text, ''))"
+)
+
+
+async def hybrid_topk(
+    search_filters: dict,
+    vector: list[float] | None = None,
+    fulltext_query: str | None = None,
+    k: int = 12,
+    structured_k: int = 30,
+    vector_k: int = 20,
+    fulltext_k: int = 20,
+    rrf_k: int = 60,
+    hard_constraints: dict | None = None,
+    term_weights: dict | None = None,
+) -> list[dict]:
+    """
+    Structured matching, vector ranking and (optionally) full-text ranking fused
+    with Reciprocal Rank Fusion in a single SQL statement.
+
+    Each ranker is a CTE producing (id, rank); the final SELECT sums 1 / (rrf_k + rank)
+    per id, so only the fused top-k ids and scores cross the network instead of
+    full rows for every ranked list. As in the staged path, the vector and full-text
+    lists only contribute when the structured filters matched something.
+    Hard constraints (Persona.constraints_hard) are AND-ed into every ranker;
+    `term_weights` weight the structured match_count (see pg.build_match_count_expr).
+
+    Returns [{"id": str, "score": float, "structured_rank", "vector_rank", "fulltext_rank"}].
+    """
+    if not pg.has_structured_filters(search_filters):
+        logger.warning("No search filters provided, returning empty results")
+        return []
+    field_groups, params, param_idx = pg.build_structured_conditions(search_filters, 1)
+    match_count_expr, score_params, param_idx = pg.build_match_count_expr(search_filters, param_idx, term_weights)
+    params.extend(score_params)
+    hard = ""
+    if pg.has_hard_constraints(hard_constraints):
+        hard_predicate, hard_params, param_idx = pg.build_hard_constraints(hard_constraints, param_idx)
+        hard = f" AND {hard_predicate}"
+        params.extend(hard_params)
+
+    ctes = [
+        f"""structured AS (
+            SELECT id, row_number() OVER (ORDER BY match_count DESC, created_at DESC NULLS LAST) AS rank
+            FROM (
+                SELECT id, created_at, {match_count_expr} AS match_count
+                FROM candidates
+                WHERE ({' OR '.join(field_groups)}){hard}
+                ORDER BY match_count DESC, created_at DESC NULLS LAST
+                LIMIT ${param_idx}
+            ) s
+        )"""
+    ]
+    params.append(structured_k)
+    param_idx += 1
+    sources = ["SELECT id, rank, 'structured' AS source FROM structured"]
+
+    use_vector = vector is not None and len(vector) > 0
+    if use_vector:
+        ctes.append(
+            f"""vector_ranked AS (
+            SELECT id, row_number() OVER (ORDER BY distance) AS rank
+            FROM (
+                SELECT id, vector <=> ${param_idx}::vector AS distance
+                FROM candidates
+                WHERE vector IS NOT NULL AND EXISTS (SELECT 1 FROM structured){hard}
+                ORDER BY distance
+                LIMIT ${param_idx + 1}
+            ) v
+        )"""
+        )
+        params.extend([np.asarray(vector, dtype=np.float32), vector_k])
+        param_idx += 2
+        sources.append("SELECT id, rank, 'vector' AS source FROM vector_ranked")
+
+    if fulltext_query:
+        ctes.append(
+            f"""fulltext AS (
+            SELECT id, row_number() OVER (ORDER BY rank DESC) AS rank
+            FROM (
+                SELECT id, ts_rank_cd({_FULLTEXT_DOCUMENT}, query) AS rank
+                FROM candidates, plainto_tsquery('english', ${param_idx}) query
+                WHERE query @@ {_FULLTEXT_DOCUMENT} AND EXISTS (SELECT 1 FROM structured){hard}
+                ORDER BY rank DESC
+                LIMIT ${param_idx + 1}
+            ) f
+        )"""
+        )
+        params.extend([fulltext_query, fulltext_k])
+        param_idx += 2
+        sources.append("SELECT id, rank, 'fulltext' AS source FROM fulltext")
+
+    query = f"""
+        WITH {', '.join(ctes)}
+        SELECT
+            id,
+            sum(1.0 / (${param_idx} + rank))::float8 AS score,
+            min(rank) FILTER (WHERE source = 'structured') AS structured_rank,
+            min(rank) FILTER (WHERE source = 'vector') AS vector_rank,
+            min(rank) FILTER (WHERE source = 'fulltext') AS fulltext_rank
+        FROM ({' UNION ALL '.join(sources)}) ranked
+        GROUP BY id
+        ORDER BY score DESC, id
+        LIMIT ${param_idx + 1}
+    """
+    params.extend([rrf_k, k])
+
+    gucs = vector_index.search_settings() if use_vector else {}
+    if "hnsw.ef_search" in gucs:
+        gucs["hnsw.ef_search"] = str(max(int(gucs["hnsw.ef_search"]), vector_k))
+
+    async with pg._pool.acquire() as connection:
+        pg.statement_stats.record(connection, query)
         try:
-            await connect_db()
-            # Re-import after connection
-            from app.adapters.pg import _pool as _pool_after
-            if _pool_after is None:
-                logger.error("Failed to initialize database pool after retry.")
-                return {}
-            logger.info("Database pool initialized successfully.")
-        except Exception as e:
-            logger.error(f"Failed to connect to database: {e}")
-            return {}
-    
-    # Use the pool
-    from app.adapters.pg import _pool
-    
+            if repository.needs_local_settings(connection, gucs):
+                async with connection.transaction():
+                    await repository.set_local_settings(connection, gucs)
+                    rows = await connection.fetch(query, *params)
+            else:
+                rows = await connection.fetch(query, *params)
+        except Exception:
+            logger.error(f"Hybrid SQL retrieval failed: {query}")
+            logger.error(f"Search filters: {search_filters}")
+            raise
+
+    return [
+        {
+            "id": str(row['id']),
+            "score": row['score'],
+            "structured_rank": row['structured_rank'],
+            "vector_rank": row['vector_rank'],
+            "fulltext_rank": row['fulltext_rank'],
+        }
+        for row in rows
+    ]
+
+
+async def retrieve_vectors(ids: list[str]) -> dict[str, np.ndarray]:
+    """
+    Retrieves vectors for a list of document IDs from PostgreSQL.
+    """
     if not ids:
         return {}
+    try:
+        id_list = [int(id_str) for id_str in ids]
+    except (ValueError, TypeError):
+        logger.warning(f"Non-integer candidate ids: {ids}")
+        return {}
     
     try:
-        # Convert IDs to appropriate type (they might be integers or strings)
-        # PostgreSQL candidates.id is SERIAL (integer), so we'll try integer first
-        # Try to convert to integers
-        id_list = []
-        query = None
-        
-        try:
-            id_list = [int(id_str) for id_str in ids]
-            query = """
-                SELECT id, vector
-                FROM candidates
-                WHERE id = ANY($1::int[])
-                AND vector IS NOT NULL
-            """
-        except (ValueError, TypeError):
-            # If conversion fails, try as text (might be TEXT ids in some schemas)
-            id_list = [str(id_str) for id_str in ids]
-            query = """
-                SELECT id, vector
-                FROM candidates
-                WHERE id::text = ANY($1::text[])
-                AND vector IS NOT NULL
-            """
-        
-        async with _pool.acquire() as connection:
-            rows = await connection.fetch(query, id_list)
-        
-        # Parse vector data from PostgreSQL
-        # pgvector stores vectors as PostgreSQL arrays, which asyncpg returns as lists
-        result_dict = {}
-        for row in rows:
-            vector_data = row['vector']
-            if vector_data is not None:
-                # asyncpg should return vector as a list of floats
-                if isinstance(vector_data, list):
-                    result_dict[str(row['id'])] = vector_data
-                elif isinstance(vector_data, str):
-                    # If it's a string, parse it
-                    # Format: "[0.1, 0.2, ...]" or "{0.1, 0.2, ...}"
-                    vector_str = vector_data.strip('[]{}')
-                    result_dict[str(row['id'])] = [float(x.strip()) for x in vector_str.split(',')]
-                else:
-                    logger.warning(f"Unexpected vector type: {type(vector_data)}")
-        
-        logger.debug(f"Retrieved {len(result_dict)} vectors from PostgreSQL")
-        return result_dict
-        
+        # The pool's vector codec decodes straight into float32 NumPy arrays
+        vectors = await repository.vectors_by_ids(id_list)
+        logger.debug(f"Retrieved {len(vectors)} vectors from PostgreSQL")
+        return {str(candidate_id): vector for candidate_id, vector in vectors.items()}
     except Exception as e:
         logger.error(f"Vector retrieve (pgvector) failed: {e}", exc_info=True)
         return {}
-
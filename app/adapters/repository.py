@@ -0,0 +1,269 @@
+"""
+Typed data access for the hot search paths.
+
+Each statement is prepared once per pooled connection by the pool's init callback,
+which runs it with empty arguments so it lands in asyncpg's per-connection
+statement cache. Later calls go straight to the cached statement, without
+re-checking the pool or re-parsing SQL.
+ANN knobs are applied at session level by app.adapters.pg; a per-transaction
+override is only issued when a search asks for different values.
+"""
+import logging
+
+import asyncpg
+import numpy as np
+
+from app.adapters import pg
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CANDIDATE_COLUMNS = "id, name, email, introduce, keywords, skills, cards, created_at"
+
+STATEMENTS = {
+    "candidates_by_ids": f"SELECT {CANDIDATE_COLUMNS} FROM candidates WHERE id = ANY($1::int[])",
+    "vector_topk": f"""
+        SELECT {CANDIDATE_COLUMNS}, 1 - (vector <=> $1::vector) AS score
+        FROM candidates
+        WHERE vector IS NOT NULL
+        ORDER BY vector <=> $1::vector
+        LIMIT $2
+    """,
+    "vector_topk_ids": """
+        SELECT id, 1 - (vector <=> $1::vector) AS score
+        FROM candidates
+        WHERE vector IS NOT NULL
+        ORDER BY vector <=> $1::vector
+        LIMIT $2
+    """,
+    "vectors_by_ids": "SELECT id, vector FROM candidates WHERE id = ANY($1::int[]) AND vector IS NOT NULL",
+    "qualifying_ids": f"SELECT id FROM candidates WHERE {pg.build_hard_constraints(None, 1)[0]}",
+}
+# Vector top-k restricted by hard constraints ($3 / $4, see pg.build_hard_constraints)
+for _name in ("vector_topk", "vector_topk_ids"):
+    STATEMENTS[f"{_name}_constrained"] = STATEMENTS[_name].replace(
+        "WHERE vector IS NOT NULL", f"WHERE vector IS NOT NULL AND {pg.build_hard_constraints(None, 3)[0]}"
+    )
+
+
+def _filter_predicate(param_idx: int) -> tuple[str, int]:
+    """SearchFilters groups (OR'd) AND hard constraints, in the canonical array-parameter form."""
+    groups, _, param_idx = pg.build_structured_conditions({}, param_idx)
+    hard, _, param_idx = pg.build_hard_constraints(None, param_idx)
+    return f"({' OR '.join(groups)}) AND {hard}", param_idx
+
+
+def _filter_params(search_filters: dict, hard_constraints: dict | None) -> list:
+    return pg.build_structured_conditions(search_filters, 1)[1] + pg.build_hard_constraints(hard_constraints, 1)[1]
+
+
+_FILTER_AT_1, _ = _filter_predicate(1)
+_FILTER_AT_2, _LIMIT_IDX = _filter_predicate(2)
+STATEMENTS.update({
+    "filtered_ids": f"SELECT id FROM candidates WHERE {_FILTER_AT_1}",
+    # EXPLAIN is planned with the bound values, so the estimate follows the actual filters
+    "filtered_rows_estimate": f"EXPLAIN (FORMAT JSON) SELECT id FROM candidates WHERE vector IS NOT NULL AND {_FILTER_AT_1}",
+    # Pre-filter: the materialized CTE keeps the planner off the ANN index, so this is an
+    # exact scan over the (small) filtered set found through the GIN indexes
+    "filtered_vector_exact": f"""
+        WITH filtered AS MATERIALIZED (
+            SELECT id, vector FROM candidates WHERE vector IS NOT NULL AND {_FILTER_AT_2}
+        )
+        SELECT id, 1 - (vector <=> $1::vector) AS score
+        FROM filtered
+        ORDER BY vector <=> $1::vector
+        LIMIT ${_LIMIT_IDX}
+    """,
+    # Post-filter: ANN scan with the filter applied to what the index returns
+    "filtered_vector_ann": f"""
+        SELECT id, 1 - (vector <=> $1::vector) AS score
+        FROM candidates
+        WHERE vector IS NOT NULL AND {_FILTER_AT_2}
+        ORDER BY vector <=> $1::vector
+        LIMIT ${_LIMIT_IDX}
+    """,
+})
+STATEMENTS.update({
+    # Document frequencies for (field, term) pairs plus the ('', '') candidate count row
+    "term_stats": """
+        SELECT field, term, df FROM term_stats
+        WHERE (field, term) IN (SELECT * FROM unnest($1::text[], $2::text[])) OR (field = '' AND term = '')
+    """,
+    # Substring filters have no exact statistics: count matches on a page sample instead
+    "text_term_sample": """
+        WITH sample AS MATERIALIZED (
+            SELECT name, introduce, cards::text AS cards FROM candidates TABLESAMPLE SYSTEM ($1)
+        )
+        SELECT q.field, q.term, (SELECT count(*) FROM sample) AS sampled, (
+            SELECT count(*) FROM sample s
+            WHERE CASE q.field WHEN 'name' THEN s.name WHEN 'introduce' THEN s.introduce ELSE s.cards END
+                ILIKE '%' || q.term || '%'
+        ) AS hits
+        FROM unnest($2::text[], $3::text[]) AS q(field, term)
+    """,
+})
+
+
+def _warmup_args(name: str) -> tuple:
+    # Arguments that make each statement return no rows
+    if name.startswith("vector_topk"):
+        vector_args = (np.zeros(settings.VECTOR_DIM, dtype=np.float32), 0)
+        return vector_args + ([], []) if name.endswith("_constrained") else vector_args
+    if name.startswith("filtered_"):
+        # Empty filter arrays match nothing
+        filter_args = tuple(_filter_params({}, None))
+        if name.startswith("filtered_vector"):
+            return (np.zeros(settings.VECTOR_DIM, dtype=np.float32),) + filter_args + (0,)
+        return filter_args
+    if name == "term_stats":
+        return ([], [])
+    if name == "text_term_sample":
+        return (0.0, [], [])
+    if name == "qualifying_ids":
+        # No candidate has an empty search term, so the GIN lookup returns nothing
+        return ([], [""])
+    return ([],)
+
+
+async def prepare_statements(connection: asyncpg.Connection) -> None:
+    """Pool init callback: prepares every hot statement on a new connection."""
+    for name, query in STATEMENTS.items():
+        try:
+            await connection.fetch(query, *_warmup_args(name))
+            pg.statement_stats.record(connection, query)
+        except asyncpg.PostgresError as e:
+            # Schema not created yet (first db_init run); prepared on first use instead
+            logger.debug(f"Could not prepare {name}: {e}")
+
+
+pg.add_connection_initializer(prepare_statements)
+
+
+def needs_local_settings(connection, gucs: dict[str, str]) -> bool:
+    """True when `gucs` differ from the session-level knobs already in effect on `connection`."""
+    return not gucs.items() <= pg.session_settings(connection).items()
+
+
+async def set_local_settings(connection, gucs: dict[str, str]) -> None:
+    """Applies `gucs` for the current transaction only, in one statement."""
+    await connection.execute(
+        "SELECT " + ", ".join(f"set_config(${2 * i + 1}, ${2 * i + 2}, true)" for i in range(len(gucs))),
+        *[part for item in gucs.items() for part in item],
+    )
+
+
+async def candidates_by_ids(ids: list[int]) -> list[asyncpg.Record]:
+    """Candidate rows (CANDIDATE_COLUMNS) for the given ids, in no particular order."""
+    query = STATEMENTS["candidates_by_ids"]
+    async with pg._pool.acquire() as connection:
+        pg.statement_stats.record(connection, query)
+        return await connection.fetch(query, ids)
+
+
+async def vector_topk(
+    vector: np.ndarray, k: int, gucs: dict[str, str], ids_only: bool = False, hard_constraints: dict | None = None
+) -> list[asyncpg.Record]:
+    """
+    Cosine top-k rows with a `score` column (id and score only with `ids_only`).
+    `gucs` are the ANN knobs this search needs; they are set for one transaction
+    only when the connection's session values differ.
+    `hard_constraints` (Persona.constraints_hard) restrict the rows that are ranked.
+    """
+    name = "vector_topk_ids" if ids_only else "vector_topk"
+    args = (vector, k)
+    if pg.has_hard_constraints(hard_constraints):
+        name += "_constrained"
+        args += tuple(pg.build_hard_constraints(hard_constraints, 3)[1])
+    query = STATEMENTS[name]
+    async with pg._pool.acquire() as connection:
+        pg.statement_stats.record(connection, query)
+        if not needs_local_settings(connection, gucs):
+            return await connection.fetch(query, *args)
+        async with connection.transaction():
+            await set_local_settings(connection, gucs)
+            return await connection.fetch(query, *args)
+
+
+async def vectors_by_ids(ids: list[int]) -> dict[int, np.ndarray]:
+    """Stored float32 vectors for the given ids (ids without a vector are omitted)."""
+    query = STATEMENTS["vectors_by_ids"]
+    async with pg._pool.acquire() as connection:
+        pg.statement_stats.record(connection, query)
+        return {row['id']: row['vector'] for row in await connection.fetch(query, ids)}
+
+
+async def qualifying_ids(hard_constraints: dict) -> list[int]:
+    """Ids of the candidates that satisfy the hard constraints."""
+    query = STATEMENTS["qualifying_ids"]
+    async with pg._pool.acquire() as connection:
+        pg.statement_stats.record(connection, query)
+        rows = await connection.fetch(query, *pg.build_hard_constraints(hard_constraints, 1)[1])
+    return [row['id'] for row in rows]
+
+
+async def filtered_ids(search_filters: dict, hard_constraints: dict | None = None) -> list[int]:
+    """Ids matching SearchFilters (field groups OR'd) and the hard constraints."""
+    query = STATEMENTS["filtered_ids"]
+    async with pg._pool.acquire() as connection:
+        pg.statement_stats.record(connection, query)
+        rows = await connection.fetch(query, *_filter_params(search_filters, hard_constraints))
+    return [row['id'] for row in rows]
+
+
+async def estimate_filtered_rows(search_filters: dict, hard_constraints: dict | None = None) -> tuple[int, int]:
+    """
+    Planner estimates of (rows with a vector matching the filters, rows in candidates).
+    Costs one planning round trip; nothing is scanned.
+    """
+    query = STATEMENTS["filtered_rows_estimate"]
+    async with pg._pool.acquire() as connection:
+        pg.statement_stats.record(connection, query)
+        plan = await connection.fetchval(query, *_filter_params(search_filters, hard_constraints))
+        total = await connection.fetchval("SELECT reltuples::bigint FROM pg_class WHERE oid = 'candidates'::regclass")
+    # EXPLAIN output is json, decoded by the pool's codec
+    matching = int(plan[0]["Plan"]["Plan Rows"])
+    # reltuples is -1 until the table has been analyzed
+    return matching, max(int(total or 0), matching)
+
+
+async def filtered_vector_topk(
+    vector: np.ndarray,
+    k: int,
+    search_filters: dict,
+    hard_constraints: dict | None,
+    gucs: dict[str, str],
+    exact: bool,
+) -> list[asyncpg.Record]:
+    """
+    Cosine top-k (id, score) among the rows matching the filters.
+    `exact` scans the filtered set directly; otherwise the ANN index is scanned
+    with the filter applied to its output, under the given `gucs`.
+    """
+    query = STATEMENTS["filtered_vector_exact" if exact else "filtered_vector_ann"]
+    args = (vector, *_filter_params(search_filters, hard_constraints), k)
+    async with pg._pool.acquire() as connection:
+        pg.statement_stats.record(connection, query)
+        if exact or not needs_local_settings(connection, gucs):
+            return await connection.fetch(query, *args)
+        async with connection.transaction():
+            await set_local_settings(connection, gucs)
+            return await connection.fetch(query, *args)
+
+
+async def term_stats(pairs: list[tuple[str, str]]) -> tuple[dict[tuple[str, str], int], int]:
+    """Document frequency per (field, term) from term_stats, and the candidate count."""
+    query = STATEMENTS["term_stats"]
+    async with pg._pool.acquire() as connection:
+        pg.statement_stats.record(connection, query)
+        rows = await connection.fetch(query, [field for field, _ in pairs], [term for _, term in pairs])
+    frequencies = {(row['field'], row['term']): row['df'] for row in rows}
+    return frequencies, frequencies.pop(('', ''), 0)
+
+
+async def sample_text_terms(pairs: list[tuple[str, str]], percent: float) -> dict[tuple[str, str], tuple[int, int]]:
+    """(matching rows, sampled rows) per (text column, term) on a `percent` page sample."""
+    query = STATEMENTS["text_term_sample"]
+    async with pg._pool.acquire() as connection:
+        pg.statement_stats.record(connection, query)
+        rows = await connection.fetch(query, percent, [field for field, _ in pairs], [term for _, term in pairs])
+    return {(row['field'], row['term']): (row['hits'], row['sampled']) for row in rows}
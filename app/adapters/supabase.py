@@ -1,12 +1,31 @@
-from supabase import create_client, Client
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
 from app.core.config import settings
 
-_supabase_client: Client | None = None
+if TYPE_CHECKING:
+    from supabase import Client
+
+logger = logging.getLogger(__name__)
 
-def get_supabase_client() -> Client:
-    """Supabase 클라이언트 싱글톤 인스턴스 반환"""
+_supabase_client: "Client | None" = None
+
+def get_supabase_client() -> "Client":
+    """Supabase 클라이언트 싱글톤 인스턴스 반환 (SDK는 첫 사용 시 import)"""
     global _supabase_client
     if _supabase_client is None:
+        from supabase import create_client
         _supabase_client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
     return _supabase_client
 
+def is_loaded() -> bool:
+    return _supabase_client is not None
+
+async def warm_up() -> None:
+    """Imports the SDK and creates the client in a thread, off the first request's path."""
+    try:
+        await asyncio.to_thread(get_supabase_client)
+    except Exception as e:
+        # Auth requests retry (and report) the client creation
+        logger.warning(f"Supabase client warm-up failed: {e}")
@@ -0,0 +1,312 @@
+"""
+In-memory posting-list index over candidates.keywords / candidates.skills.
+
+Each exact term maps to a compressed Roaring bitmap of candidate ids, so the
+SearchFilters set algebra (keywords_any / keywords_all / skills_any / skills_all)
+and the match_count overlap score are evaluated without a DB round trip.
+
+The index is kept consistent with PostgreSQL by subscribing to the candidate
+change feed (app.adapters.changes). It only reports itself as warm while the
+feed's LISTEN connection is alive; otherwise callers use SQL.
+"""
+import heapq
+import json
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Callable
+
+from pyroaring import BitMap
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TERM_FIELDS = ("keywords", "skills")
+
+# Catch-up after a snapshot restore re-reads this window before the snapshot watermark
+_WATERMARK_OVERLAP = timedelta(seconds=5)
+
+
+def _as_terms(value) -> list[str]:
+    """JSONB array of strings (decoded or raw text) -> list of string terms."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            return []
+    if not isinstance(value, list):
+        return []
+    return [term for term in value if isinstance(term, str)]
+
+
+class TermIndex:
+    """Roaring-bitmap postings per (field, term) plus the per-candidate data needed to rank."""
+
+    def __init__(self):
+        self._postings: dict[str, dict[str, BitMap]] = {field: {} for field in TERM_FIELDS}
+        self._doc_terms: dict[int, dict[str, frozenset[str]]] = {}
+        self._created_at: dict[int, float] = {}
+        # Resolves a candidate's terms on demand for indexes restored from a snapshot
+        self._doc_loader: Callable[[int], dict[str, frozenset[str]]] | None = None
+
+    def __len__(self) -> int:
+        return len(self._created_at)
+
+    @classmethod
+    def from_postings(
+        cls,
+        postings: dict[str, dict[str, BitMap]],
+        created_at: dict[int, float],
+        doc_loader: Callable[[int], dict[str, frozenset[str]]],
+    ) -> "TermIndex":
+        """Rebuilds an index from serialized postings without re-reading every candidate."""
+        index = cls()
+        index._postings = {field: dict(postings.get(field, {})) for field in TERM_FIELDS}
+        index._created_at = created_at
+        index._doc_loader = doc_loader
+        return index
+
+    def postings(self) -> dict[str, dict[str, BitMap]]:
+        return self._postings
+
+    def created_at(self) -> dict[int, float]:
+        return self._created_at
+
+    def doc_terms(self, candidate_id: int) -> dict[str, frozenset[str]] | None:
+        terms = self._doc_terms.get(candidate_id)
+        if terms is None and candidate_id in self._created_at and self._doc_loader is not None:
+            terms = self._doc_loader(candidate_id)
+        return terms
+
+    def add(self, candidate_id: int, keywords, skills, created_at) -> None:
+        """Indexes a candidate, replacing any previous entry for the same id."""
+        self.remove(candidate_id)
+        terms = {"keywords": frozenset(_as_terms(keywords)), "skills": frozenset(_as_terms(skills))}
+        for field, field_terms in terms.items():
+            postings = self._postings[field]
+            for term in field_terms:
+                bitmap = postings.get(term)
+                if bitmap is None:
+                    bitmap = postings[term] = BitMap()
+                bitmap.add(candidate_id)
+        self._doc_terms[candidate_id] = terms
+        # NULL ranks last, like `created_at DESC NULLS LAST` in the SQL path
+        self._created_at[candidate_id] = created_at.timestamp() if created_at else 0.0
+
+    def remove(self, candidate_id: int) -> None:
+        terms = self.doc_terms(candidate_id)
+        self._doc_terms.pop(candidate_id, None)
+        if self._created_at.pop(candidate_id, None) is None or terms is None:
+            return
+        for field, field_terms in terms.items():
+            postings = self._postings[field]
+            for term in field_terms:
+                bitmap = postings.get(term)
+                if bitmap is None:
+                    continue
+                bitmap.discard(candidate_id)
+                if not bitmap:
+                    del postings[term]
+
+    def any_of(self, field: str, terms: list[str]) -> BitMap:
+        """Equivalent of `field ?| terms`."""
+        postings = self._postings[field]
+        bitmaps = [postings[term] for term in set(terms) if term in postings]
+        return BitMap.union(*bitmaps) if bitmaps else BitMap()
+
+    def all_of(self, field: str, terms: list[str]) -> BitMap:
+        """Equivalent of `field ?& terms`."""
+        postings = self._postings[field]
+        bitmaps = []
+        for term in set(terms):
+            bitmap = postings.get(term)
+            if bitmap is None:
+                return BitMap()
+            bitmaps.append(bitmap)
+        if not bitmaps:
+            return BitMap(self._created_at.keys())
+        return BitMap.intersection(*bitmaps)
+
+    def match(self, search_filters: dict) -> BitMap:
+        """
+        Evaluates the keyword/skill groups of SearchFilters exactly as
+        pg.structured_search does: `_any` and `_all` are OR'd within a field,
+        and field groups are OR'd together.
+        """
+        matched = BitMap()
+        for field in TERM_FIELDS:
+            if search_filters.get(f"{field}_any"):
+                matched |= self.any_of(field, search_filters[f"{field}_any"])
+            if search_filters.get(f"{field}_all"):
+                matched |= self.all_of(field, search_filters[f"{field}_all"])
+        return matched
+
+    def overlap_counts(self, candidates: BitMap, search_filters: dict, term_weights: dict | None = None) -> Counter:
+        """
+        Counts how many `keywords_any` / `skills_any` terms each candidate has (match_count),
+        each term counting its weight from `term_weights` ({field: {term: weight}}, default 1).
+        """
+        counts = Counter()
+        for field in TERM_FIELDS:
+            postings = self._postings[field]
+            weights = (term_weights or {}).get(field) or {}
+            for term in set(search_filters.get(f"{field}_any") or []):
+                bitmap = postings.get(term)
+                if bitmap is None:
+                    continue
+                weight = weights.get(term, 1.0)
+                if weight == 1.0:
+                    counts.update(bitmap & candidates)
+                else:
+                    for candidate_id in bitmap & candidates:
+                        counts[candidate_id] += weight
+        return counts
+
+    def document_frequency(self, field: str, term: str) -> int:
+        bitmap = self._postings[field].get(term)
+        return len(bitmap) if bitmap is not None else 0
+
+    def top(self, candidates: BitMap, counts: Counter, k: int) -> list[tuple[int, int]]:
+        """Top-k (id, match_count) ordered by match_count DESC, created_at DESC NULLS LAST."""
+        created_at = self._created_at
+        best = heapq.nlargest(k, candidates, key=lambda cid: (counts.get(cid, 0), created_at.get(cid, 0.0)))
+        return [(cid, counts.get(cid, 0)) for cid in best]
+
+
+_index: TermIndex | None = None
+_restored: tuple[TermIndex, datetime | None] | None = None
+# Changed ids received before the index finished loading
+_pending: set[int] = set()
+
+
+def get_index() -> TermIndex | None:
+    return _index
+
+
+def is_warm() -> bool:
+    """True when the index is loaded and still receiving change notifications."""
+    from app.adapters import changes
+    return _index is not None and changes.is_listening()
+
+
+_SELECT_ROWS = "SELECT id, keywords, skills, created_at FROM candidates"
+
+
+async def _scan(*queries: tuple) -> list:
+    """
+    Runs whole-table reads, each a (query, *args) tuple, on a standalone connection:
+    a corpus scan outlives the timeouts of pooled connections. Returns their rows.
+    """
+    from app.adapters import pg
+    connection = await pg.open_connection()
+    try:
+        return [await connection.fetch(*query) for query in queries]
+    finally:
+        await connection.close()
+
+
+async def _fetch_rows(ids: list[int]):
+    from app.adapters import pg
+    return await pg.execute_query(f"{_SELECT_ROWS} WHERE id = ANY($1::int[])", ids)
+
+
+async def _load() -> TermIndex:
+    index = TermIndex()
+    (rows,) = await _scan((_SELECT_ROWS,))
+    for row in rows:
+        index.add(row['id'], row['keywords'], row['skills'], row['created_at'])
+    return index
+
+
+async def _catch_up(index: TermIndex, watermark: datetime | None) -> None:
+    """Applies rows changed after a snapshot's watermark and drops rows deleted since."""
+    if watermark is None:
+        changed_query = (_SELECT_ROWS,)
+    else:
+        changed_query = (f"{_SELECT_ROWS} WHERE updated_at > $1", watermark - _WATERMARK_OVERLAP)
+    changed, live_rows = await _scan(changed_query, ("SELECT id FROM candidates",))
+    for row in changed:
+        index.add(row['id'], row['keywords'], row['skills'], row['created_at'])
+    live = {row['id'] for row in live_rows}
+    deleted = set(index.created_at()) - live
+    for candidate_id in deleted:
+        index.remove(candidate_id)
+    logger.info(f"Term index caught up from snapshot: {len(changed)} changed, {len(deleted)} removed")
+
+
+def restore(index: TermIndex, watermark: datetime | None) -> None:
+    """Seeds start() with an index restored from a snapshot instead of a full load."""
+    global _restored
+    _restored = (index, watermark)
+
+
+async def _apply_pending() -> None:
+    if _index is None or not _pending:
+        return
+    ids = list(_pending)
+    _pending.clear()
+    try:
+        rows = await _fetch_rows(ids)
+    except Exception as e:
+        logger.error(f"Term index refresh failed, marking index cold: {e}")
+        await stop()
+        return
+    found = set()
+    for row in rows:
+        _index.add(row['id'], row['keywords'], row['skills'], row['created_at'])
+        found.add(row['id'])
+    for candidate_id in set(ids) - found:
+        _index.remove(candidate_id)
+    logger.debug(f"Term index applied {len(ids)} candidate changes")
+
+
+async def _on_changes(batch) -> None:
+    """app.adapters.changes subscriber: re-reads changed rows, reloads on resync."""
+    global _index
+    if batch.resync:
+        _pending.clear()
+        _index = await _load()
+        logger.info(f"Term index reloaded after a change feed gap: {len(_index)} candidates")
+        return
+    _pending.update(batch.ids)
+    await _apply_pending()
+
+
+async def start() -> None:
+    """
+    Subscribes to the change feed, then builds the index (or catches up a
+    snapshot-restored one) and applies the changes received meanwhile.
+    Subscribing first guarantees no change is missed between the load and
+    the subscription.
+    """
+    global _index, _restored
+    if not settings.TERM_INDEX_ENABLED:
+        return
+    from app.adapters import changes
+    if not changes.is_listening():
+        logger.error("Change feed is not listening, structured search will use SQL")
+        return
+    changes.subscribe(_on_changes)
+    try:
+        if _restored is not None:
+            (index, watermark), _restored = _restored, None
+            await _catch_up(index, watermark)
+        else:
+            index = await _load()
+        _index = index
+        await _apply_pending()
+        logger.info(f"Term index loaded: {len(index)} candidates")
+    except Exception as e:
+        logger.error(f"Failed to start term index, structured search will use SQL: {e}")
+        await stop()
+
+
+async def stop() -> None:
+    global _index
+    from app.adapters import changes
+    changes.unsubscribe(_on_changes)
+    _index = None
+    _pending.clear()
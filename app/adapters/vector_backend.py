@@ -0,0 +1,44 @@
+"""
+Selects the vector search backend configured by settings.VECTOR_BACKEND.
+
+Both backends expose vector_topk(vector, k), filtered_vector_topk(vector, k, search_filters)
+and retrieve_vectors(ids).
+"""
+import logging
+
+from app.adapters import pgvector, vector_index, vector_memory
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def get_vector_backend():
+    """
+    Returns the module implementing the configured vector backend.
+    Falls back to pgvector while the in-memory index is still loading.
+    """
+    if settings.VECTOR_BACKEND == "memory":
+        if vector_memory.is_loaded():
+            return vector_memory
+        logger.warning("In-memory vector index not loaded yet, using pgvector")
+    return pgvector
+
+
+async def start() -> None:
+    """
+    Loads the in-memory index at startup when it is the configured backend.
+    An index already restored from a snapshot is only caught up.
+    """
+    await vector_index.load_search_params()
+    if settings.VECTOR_BACKEND != "memory":
+        return
+    if vector_memory.is_loaded():
+        await vector_memory.refresh_index()
+    else:
+        await vector_memory.load_index()
+    vector_memory.start_refresher()
+
+
+async def stop() -> None:
+    if settings.VECTOR_BACKEND == "memory":
+        await vector_memory.stop_refresher()
@@ -0,0 +1,146 @@
+"""
+Lifecycle management for the ANN index on candidates.vector.
+
+An ivfflat index built on an empty table has meaningless centroids, so the index
+is (re)built here after bulk loads, with parameters sized to the row count:
+
+    ivfflat: lists = rows / 1000 (≤1M rows) or sqrt(rows); probes ≈ sqrt(lists)
+    hnsw:    m / ef_construction grow with the corpus; ef_search ≥ k
+
+Builds use CREATE INDEX CONCURRENTLY under a temporary name and are swapped in,
+so searches keep working during a rebuild. Each build is recorded in
+vector_index_builds with its parameters, duration and on-disk size; the latest
+recommended probes / ef_search become the default search-time knobs.
+"""
+import logging
+import math
+import time
+
+from app.adapters import pg
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "idx_candidates_vector"
+SUPPORTED_METHODS = ("ivfflat", "hnsw")
+
+# Search-time defaults recommended by the most recent build (see load_search_params)
+_search_params: dict = {}
+
+
+def plan_index(row_count: int, method: str) -> dict:
+    """
+    Returns build and search parameters for a corpus of `row_count` vectors,
+    following the pgvector sizing guidance.
+    """
+    if method == "ivfflat":
+        lists = max(1, row_count // 1000) if row_count <= 1_000_000 else int(math.sqrt(row_count))
+        return {
+            "build": {"lists": lists},
+            "search": {"probes": max(1, int(round(math.sqrt(lists))))},
+        }
+    if method == "hnsw":
+        m, ef_construction = (16, 64) if row_count <= 1_000_000 else (24, 128)
+        return {
+            "build": {"m": m, "ef_construction": ef_construction},
+            "search": {"ef_search": 40 if row_count <= 100_000 else 100},
+        }
+    raise ValueError(f"Unsupported vector index method: {method} (expected one of {SUPPORTED_METHODS})")
+
+
+def _with_clause(build_params: dict) -> str:
+    return ", ".join(f"{key} = {int(value)}" for key, value in build_params.items())
+
+
+async def rebuild_vector_index(
+    method: str | None = None, table: str = "candidates", column: str = "vector", record: bool = True,
+) -> dict:
+    """
+    Builds a new ANN index concurrently and swaps it in place of the current one.
+    Returns the build (method, params, row_count, build_ms, size_bytes); it is recorded in
+    vector_index_builds unless record is False (benchmarks on scratch tables).
+    """
+    method = method or settings.VECTOR_INDEX_METHOD
+    index_name = INDEX_NAME if (table, column) == ("candidates", "vector") else f"idx_{table}_{column}"
+    new_name = f"{index_name}_new"
+
+    row_count = await pg.fetch_val(f"SELECT count(*) FROM {table} WHERE {column} IS NOT NULL")
+    plan = plan_index(row_count, method)
+    logger.info(f"Building {method} index on {table}.{column} for {row_count} rows: {plan['build']}")
+
+    # A standalone connection: pooled ones carry the request statement_timeout and a
+    # client-side command_timeout, either of which would cancel a long build
+    connection = await pg.open_connection()
+    try:
+        # A failed CONCURRENTLY build leaves an INVALID index behind
+        await connection.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {new_name}")
+        await connection.execute(f"SET maintenance_work_mem = '{settings.VECTOR_INDEX_MAINTENANCE_WORK_MEM}'")
+        started = time.perf_counter()
+        await connection.execute(
+            f"CREATE INDEX CONCURRENTLY {new_name} ON {table} "
+            f"USING {method} ({column} vector_cosine_ops) WITH ({_with_clause(plan['build'])})"
+        )
+        build_ms = int((time.perf_counter() - started) * 1000)
+
+        await connection.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
+        await connection.execute(f"ALTER INDEX {new_name} RENAME TO {index_name}")
+        size_bytes = await connection.fetchval("SELECT pg_relation_size($1::regclass)", index_name)
+    finally:
+        await connection.close()
+
+    if record:
+        await pg.execute_query(
+            """
+            INSERT INTO vector_index_builds (index_name, method, build_params, search_params, row_count, build_ms, size_bytes)
+            VALUES ($1, $2, $3, $4, $5, $6, $7)
+            """,
+            index_name, method, plan["build"], plan["search"], row_count, build_ms, size_bytes,
+        )
+    if record and index_name == INDEX_NAME:
+        _search_params.clear()
+        _search_params.update(plan["search"])
+        pg.set_session_settings(search_settings())
+
+    logger.info(f"Built {index_name} ({method}) in {build_ms}ms, {size_bytes / 1e6:.1f} MB")
+    return {
+        "index_name": index_name,
+        "method": method,
+        "build_params": plan["build"],
+        "search_params": plan["search"],
+        "row_count": row_count,
+        "build_ms": build_ms,
+        "size_bytes": size_bytes,
+    }
+
+
+async def load_search_params() -> dict:
+    """Loads the search-time defaults recommended by the latest build of the candidates index."""
+    try:
+        value = await pg.fetch_val(
+            "SELECT search_params FROM vector_index_builds WHERE index_name = $1 ORDER BY created_at DESC LIMIT 1",
+            INDEX_NAME,
+        )
+    except Exception as e:
+        logger.warning(f"Could not load vector index build history: {e}")
+        return {}
+    _search_params.clear()
+    if value:
+        _search_params.update(value)
+    # Applied at session level on pooled connections, so searches need no per-query set_config
+    pg.set_session_settings(search_settings())
+    return dict(_search_params)
+
+
+def search_settings(probes: int | None = None, ef_search: int | None = None) -> dict[str, str]:
+    """
+    Resolves the ANN recall/latency knobs for one search.
+    Explicit arguments win, then settings, then the latest build's recommendation.
+    """
+    probes = probes or settings.VECTOR_IVFFLAT_PROBES or _search_params.get("probes")
+    ef_search = ef_search or settings.VECTOR_HNSW_EF_SEARCH or _search_params.get("ef_search")
+    gucs = {}
+    if probes:
+        gucs["ivfflat.probes"] = str(int(probes))
+    if ef_search:
+        gucs["hnsw.ef_search"] = str(int(ef_search))
+    return gucs
@@ -0,0 +1,390 @@
+"""
+In-process vector search backed by a contiguous float32 NumPy matrix.
+
+Exposes the same interface as app.adapters.pgvector (vector_topk / retrieve_vectors),
+so the retriever can switch backends with settings.VECTOR_BACKEND.
+At the PRD's ≤100k candidate scale the whole matrix fits in RAM, and an exact
+matrix-vector product is cheaper than a DB round trip plus ivfflat probing.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.adapters import changes, pg, repository, term_index
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Rows committed slightly out of updated_at order are picked up by re-reading this window
+_WATERMARK_OVERLAP = timedelta(seconds=5)
+
+
+def to_float32(vector_data) -> np.ndarray | None:
+    """
+    Converts a pgvector value (ndarray from the connection's binary codec, or a list) to a
+    float32 array. Text means the codec was not registered (see pg._init_connection).
+    """
+    if vector_data is None:
+        return None
+    if isinstance(vector_data, str):
+        raise TypeError("pgvector value arrived as text: the vector codec is not registered on this connection")
+    return np.asarray(vector_data, dtype=np.float32)
+
+
+class VectorMatrix:
+    """
+    Row-normalized float32 matrix with an id <-> row mapping.
+
+    Rows are stored contiguously in the first `size` rows of a pre-allocated buffer
+    that grows geometrically. Deletes swap the last row into the freed slot, so
+    the live rows always stay contiguous for a single matmul.
+    """
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self._data = np.zeros((0, dim), dtype=np.float32)
+        self._ids: list[int] = []          # row -> candidate id
+        self._rows: dict[int, int] = {}    # candidate id -> row
+
+    @property
+    def size(self) -> int:
+        return len(self._ids)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return self._data[:self.size]
+
+    @classmethod
+    def from_arrays(cls, ids: np.ndarray, matrix: np.ndarray) -> "VectorMatrix":
+        """
+        Wraps an already row-normalized matrix (e.g. a memory-mapped snapshot) without copying.
+        The buffer is only copied when it has to grow.
+        """
+        index = cls(matrix.shape[1])
+        index._data = matrix
+        index._ids = [int(candidate_id) for candidate_id in ids]
+        index._rows = {candidate_id: row for row, candidate_id in enumerate(index._ids)}
+        return index
+
+    def id_array(self) -> np.ndarray:
+        return np.asarray(self._ids, dtype=np.int64)
+
+    def __contains__(self, candidate_id: int) -> bool:
+        return candidate_id in self._rows
+
+    def ids(self) -> set[int]:
+        return set(self._rows)
+
+    def _normalize(self, vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _reserve(self, capacity: int) -> None:
+        if capacity <= self._data.shape[0]:
+            return
+        new_capacity = max(capacity, 2 * self._data.shape[0], 1024)
+        grown = np.zeros((new_capacity, self.dim), dtype=np.float32)
+        grown[:self.size] = self.matrix
+        self._data = grown
+
+    def upsert(self, ids: list[int], vectors: np.ndarray) -> None:
+        """Inserts or overwrites rows for the given ids."""
+        if not ids:
+            return
+        vectors = self._normalize(np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dim))
+        new_count = sum(1 for candidate_id in ids if candidate_id not in self._rows)
+        self._reserve(self.size + new_count)
+        for candidate_id, vector in zip(ids, vectors):
+            row = self._rows.get(candidate_id)
+            if row is None:
+                row = self.size
+                self._rows[candidate_id] = row
+                self._ids.append(candidate_id)
+            self._data[row] = vector
+
+    def remove(self, ids) -> None:
+        """Removes rows by swapping the last live row into each freed slot."""
+        for candidate_id in ids:
+            row = self._rows.pop(candidate_id, None)
+            if row is None:
+                continue
+            last = self.size - 1
+            last_id = self._ids.pop()
+            if row != last:
+                self._data[row] = self._data[last]
+                self._ids[row] = last_id
+                self._rows[last_id] = row
+
+    def topk(self, query: np.ndarray, k: int, among: list[int] | None = None) -> list[tuple[int, float]]:
+        """
+        Returns (id, cosine similarity) pairs for the k nearest rows, best first.
+        `among` restricts the search to the given candidate ids.
+        """
+        if among is None:
+            rows = None
+            n = self.size
+        else:
+            rows = np.fromiter((self._rows[i] for i in among if i in self._rows), dtype=np.int64)
+            n = len(rows)
+        if n == 0 or k <= 0:
+            return []
+        query = np.asarray(query, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        scores = (self.matrix if rows is None else self._data[rows]) @ (query / norm)
+        if k < n:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(n)
+        top = top[np.argsort(-scores[top], kind="stable")]
+        if rows is not None:
+            return [(self._ids[rows[i]], float(scores[i])) for i in top]
+        return [(self._ids[row], float(scores[row])) for row in top]
+
+    def get(self, ids: list[int]) -> dict[int, np.ndarray]:
+        return {candidate_id: self._data[self._rows[candidate_id]] for candidate_id in ids if candidate_id in self._rows}
+
+
+_index: VectorMatrix | None = None
+_watermark: datetime | None = None
+_lock = asyncio.Lock()
+_refresh_task: asyncio.Task | None = None
+
+
+def is_loaded() -> bool:
+    return _index is not None
+
+
+def get_index() -> VectorMatrix | None:
+    return _index
+
+
+def restore(index: VectorMatrix, watermark: datetime | None) -> None:
+    """Installs an index restored from a snapshot; refresh_index() then catches it up."""
+    global _index, _watermark
+    _index = index
+    _watermark = watermark
+
+
+async def load_index() -> None:
+    """Loads every candidate vector from PostgreSQL into a fresh matrix."""
+    global _index, _watermark
+    async with _lock:
+        # A standalone connection: a corpus scan outlives the timeouts of pooled connections
+        connection = await pg.open_connection()
+        try:
+            rows = await connection.fetch("SELECT id, vector, updated_at FROM candidates WHERE vector IS NOT NULL")
+        finally:
+            await connection.close()
+        index = VectorMatrix(settings.VECTOR_DIM)
+        ids = [row['id'] for row in rows]
+        if ids:
+            index.upsert(ids, np.stack([to_float32(row['vector']) for row in rows]))
+        _index = index
+        _watermark = max((row['updated_at'] for row in rows if row['updated_at']), default=None)
+    logger.info(f"In-memory vector index loaded: {index.size} vectors ({index.matrix.nbytes / 1e6:.1f} MB)")
+
+
+async def refresh_index() -> None:
+    """
+    Applies changes since the last load/refresh.
+    Changed rows are found via the updated_at watermark; deleted rows by diffing ids.
+    """
+    global _watermark
+    if _index is None:
+        await load_index()
+        return
+    async with _lock:
+        # A standalone connection: both scans can cover the whole corpus
+        connection = await pg.open_connection()
+        try:
+            if _watermark is None:
+                changed = await connection.fetch("SELECT id, vector, updated_at FROM candidates")
+            else:
+                changed = await connection.fetch(
+                    "SELECT id, vector, updated_at FROM candidates WHERE updated_at > $1",
+                    _watermark - _WATERMARK_OVERLAP,
+                )
+            live = await connection.fetch("SELECT id FROM candidates WHERE vector IS NOT NULL")
+        finally:
+            await connection.close()
+        reload_ids(_index, changed)
+        newest = max((row['updated_at'] for row in changed if row['updated_at']), default=None)
+        if newest and (_watermark is None or newest > _watermark):
+            _watermark = newest
+
+        deleted = _index.ids() - {row['id'] for row in live}
+        _index.remove(deleted)
+    if changed or deleted:
+        logger.info(f"In-memory vector index refreshed: {len(changed)} changed, {len(deleted)} removed")
+
+
+def reload_ids(index: VectorMatrix, rows) -> None:
+    """Upserts rows that have a vector and drops rows whose vector was cleared."""
+    present = [row for row in rows if row['vector'] is not None]
+    index.remove([row['id'] for row in rows if row['vector'] is None])
+    if present:
+        index.upsert([row['id'] for row in present], np.stack([to_float32(row['vector']) for row in present]))
+
+
+async def apply_changes(batch: changes.ChangeBatch) -> None:
+    """
+    Change feed subscriber: re-reads the changed rows so new and re-embedded vectors are
+    searchable without waiting for the next periodic refresh.
+    """
+    if _index is None:
+        return
+    if batch.version is not None:
+        # Another embedding version was swapped in: every vector (and maybe the dimension) changed
+        await load_index()
+        return
+    if batch.resync:
+        await refresh_index()
+        return
+    ids = list(batch.ids)
+    async with _lock:
+        rows = await pg.execute_query(
+            "SELECT id, vector, updated_at FROM candidates WHERE id = ANY($1::int[])", ids
+        )
+        reload_ids(_index, rows)
+        _index.remove(set(ids) - {row['id'] for row in rows})
+
+
+async def _refresh_loop(interval_s: float) -> None:
+    while True:
+        await asyncio.sleep(interval_s)
+        try:
+            await refresh_index()
+        except Exception as e:
+            logger.error(f"In-memory vector index refresh failed: {e}")
+
+
+def start_refresher(interval_s: float | None = None) -> None:
+    """
+    Subscribes to the change feed and starts the periodic background refresh task,
+    which catches up anything the feed missed.
+    """
+    global _refresh_task
+    changes.subscribe(apply_changes)
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.create_task(_refresh_loop(interval_s or settings.VECTOR_REFRESH_INTERVAL_S))
+
+
+async def stop_refresher() -> None:
+    global _refresh_task
+    changes.unsubscribe(apply_changes)
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        try:
+            await _refresh_task
+        except asyncio.CancelledError:
+            pass
+        _refresh_task = None
+
+
+async def vector_topk(
+    vector: list[float],
+    k: int,
+    probes: int | None = None,
+    ef_search: int | None = None,
+    ids_only: bool = False,
+    hard_constraints: dict | None = None,
+) -> list[dict]:
+    """
+    Exact cosine top-k over the in-memory matrix.
+    Returns the same shape as pgvector.vector_topk; payloads are loaded by primary key
+    unless `ids_only`, in which case no database round trip is made at all.
+    `probes` / `ef_search` are accepted for interface parity and ignored (the search is exact).
+    With `hard_constraints`, the qualifying ids are fetched first and only those rows are scored.
+    """
+    if _index is None:
+        logger.error("In-memory vector index not loaded.")
+        return []
+    if vector is None or len(vector) == 0:
+        logger.warning("Empty query vector provided")
+        return []
+
+    among = None
+    if pg.has_hard_constraints(hard_constraints):
+        among = await repository.qualifying_ids(hard_constraints)
+    top = _index.topk(np.asarray(vector, dtype=np.float32), k, among)
+    if not top:
+        return []
+    if ids_only:
+        return [{"id": str(candidate_id), "score": score} for candidate_id, score in top]
+
+    rows = await repository.candidates_by_ids([candidate_id for candidate_id, _ in top])
+    rows_by_id = {row['id']: row for row in rows}
+
+    results = []
+    for candidate_id, score in top:
+        row = rows_by_id.get(candidate_id)
+        if row is None:
+            continue
+        results.append({
+            "id": str(candidate_id),
+            "score": score,
+            "payload": {
+                "name": row.get('name'),
+                "email": row.get('email'),
+                "introduce": row.get('introduce'),
+                "keywords": row.get('keywords') if row.get('keywords') is not None else [],
+                "skills": row.get('skills') if row.get('skills') is not None else [],
+                "cards": row.get('cards') if row.get('cards') is not None else [],
+                "created_at": row.get('created_at').isoformat() if row.get('created_at') else None,
+            }
+        })
+
+    logger.info(f"Vector search (memory) returned {len(results)} results")
+    return results
+
+
+async def filtered_vector_topk(
+    vector: list[float],
+    k: int,
+    search_filters: dict,
+    hard_constraints: dict | None = None,
+    probes: int | None = None,
+    ef_search: int | None = None,
+) -> list[dict]:
+    """
+    Exact cosine top-k among the candidates matching SearchFilters and the hard constraints.
+    The search is always exact here, so the filter is simply applied first: matching ids
+    come from the term index when it can evaluate the filters alone, otherwise from SQL.
+    Returns [{"id", "score"}] like pgvector.filtered_vector_topk.
+    """
+    if _index is None:
+        logger.error("In-memory vector index not loaded.")
+        return []
+    if vector is None or len(vector) == 0:
+        logger.warning("Empty query vector provided")
+        return []
+    if not pg.has_structured_filters(search_filters) and not pg.has_hard_constraints(hard_constraints):
+        return await vector_topk(vector, k, ids_only=True)
+
+    if term_index.is_warm() and not pg.has_text_filters(search_filters) and not pg.has_hard_constraints(hard_constraints):
+        among = list(term_index.get_index().match(search_filters))
+    else:
+        among = await repository.filtered_ids(search_filters, hard_constraints)
+    top = _index.topk(np.asarray(vector, dtype=np.float32), k, among)
+    logger.info(f"Filtered vector search (memory, {len(among)} rows match) returned {len(top)} results")
+    return [{"id": str(candidate_id), "score": score} for candidate_id, score in top]
+
+
+async def retrieve_vectors(ids: list[str]) -> dict[str, np.ndarray]:
+    """
+    Returns the stored (L2-normalized) vectors for the given ids.
+    Normalization does not change cosine similarity, which is all callers use.
+    """
+    if _index is None or not ids:
+        return {}
+    try:
+        int_ids = [int(id_str) for id_str in ids]
+    except (ValueError, TypeError):
+        return {}
+    # Copies: rows move when other candidates are removed
+    return {str(candidate_id): vector.copy() for candidate_id, vector in _index.get(int_ids).items()}
@@ -13,9 +13,12 @@ from app.schemas.auth import (
 from app.adapters.supabase import get_supabase_client
 from app.adapters.pg import execute_query
 from app.core.config import settings
-from supabase import Client
 import logging
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # Annotations only: the SDK is imported on first use (see app.adapters.supabase)
+    from supabase import Client
 
 router = APIRouter(tags=["Authentication"])
 security = HTTPBearer()
@@ -1,20 +1,22 @@
 
 from fastapi import APIRouter, HTTPException
-from app.services import candidates
+from app.schemas.job import JobResponse
+from app.services import jobs
 import logging
 
 router = APIRouter()
 
-@router.post("/candidates/generate-vectors", tags=["Candidates"])
+@router.post("/candidates/generate-vectors", response_model=JobResponse, status_code=202, tags=["Candidates"])
 async def generate_vectors():
     """
-    Triggers the generation of vector embeddings for candidates who don't have one yet.
-    This is useful after a bulk import of candidate data.
+    Queues a background job that (re-)generates vector embeddings for candidates whose
+    profile or embedding model changed. Inserted candidates are queued automatically
+    (EMBED_ON_INSERT); this is useful after bulk edits or an embedding model change.
+    Returns the job (the waiting one if a vectorization job is already queued);
+    poll GET /v1/jobs/{id} for progress.
     """
     try:
-        result = await candidates.generate_vectors_for_candidates()
-        return result
+        return await jobs.enqueue("vectorize")
     except Exception as e:
-        logging.error(f"Failed to trigger vector generation: {e}")
-        raise HTTPException(status_code=500, detail="An internal error occurred during vector generation.")
-
+        logging.error(f"Failed to queue vector generation: {e}")
+        raise HTTPException(status_code=500, detail="An internal error occurred while queueing vector generation.")
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import List, Optional
+from app.schemas.job import JobResponse
+from app.services import jobs
+
+router = APIRouter()
+
+@router.get("/jobs", response_model=List[JobResponse], tags=["Jobs"])
+async def list_jobs(kind: Optional[str] = None, limit: int = Query(20, ge=1, le=200)):
+    """
+    Lists the most recent background jobs, newest first.
+    """
+    return await jobs.list_jobs(limit=limit, kind=kind)
+
+@router.get("/jobs/{job_id}", response_model=JobResponse, tags=["Jobs"])
+async def get_job(job_id: int):
+    """
+    Returns the status, progress counters, throughput (rows/s) and ETA of a job.
+    """
+    job = await jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
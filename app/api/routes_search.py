@@ -3,93 +3,14 @@ from app.schemas.search import SearchRequest, SearchResponse, CandidateSearchRes
 from app.services.persona import build_persona
 from app.services.retrieve import hybrid_retrieve
 from app.services.judge import judge_parallel
-from app.adapters.pg import _pool
+from app.services.hydration import CandidateMap
+from app.adapters import pg
 import logging
 import time
-import json
-from typing import List, Dict, Any
 
 router = APIRouter()
 
 
-async def load_candidate_details(candidate_ids: List[int]) -> Dict[int, Dict[str, Any]]:
-    """
-    Loads full candidate details from database by IDs.
-    Returns a dictionary mapping candidate ID to candidate data.
-    """
-    from app.adapters.pg import connect_db, _pool
-    
-    # Import pool dynamically to ensure it's current
-    if _pool is None:
-        logging.warning("Database pool not initialized. Attempting to connect...")
-        try:
-            await connect_db()
-            # Re-import after connection
-            from app.adapters.pg import _pool as _pool_after
-            if _pool_after is None:
-                raise ConnectionError("Failed to initialize database pool after retry.")
-            logging.info("Database pool initialized successfully.")
-        except Exception as e:
-            logging.error(f"Failed to connect to database: {e}")
-            raise ConnectionError(f"Database connection failed: {e}")
-    
-    # Use the current pool
-    from app.adapters.pg import _pool as pool
-    
-    if not candidate_ids:
-        return {}
-    
-    try:
-        query = """
-            SELECT 
-                id, name, email, introduce, keywords, skills, cards, created_at
-            FROM candidates
-            WHERE id = ANY($1::int[])
-        """
-        
-        async with pool.acquire() as connection:
-            rows = await connection.fetch(query, candidate_ids)
-        
-        result = {}
-        for row in rows:
-            candidate_id = row['id']
-            
-            # Parse JSONB fields - asyncpg returns JSONB as Python objects, but sometimes as strings
-            # Helper function to safely parse JSONB fields
-            def parse_jsonb_field(value):
-                if value is None:
-                    return []
-                if isinstance(value, str):
-                    try:
-                        parsed = json.loads(value)
-                        return parsed if isinstance(parsed, list) else []
-                    except (json.JSONDecodeError, TypeError):
-                        return []
-                if isinstance(value, list):
-                    return value
-                return []
-            
-            keywords = parse_jsonb_field(row.get('keywords'))
-            skills = parse_jsonb_field(row.get('skills'))
-            cards = parse_jsonb_field(row.get('cards'))
-            
-            result[candidate_id] = {
-                "id": candidate_id,
-                "name": row.get('name', ''),
-                "description": row.get('introduce'),
-                "keywords": keywords,
-                "skills": skills,
-                "cards": cards,
-                "email": row.get('email'),
-                "created_at": row.get('created_at').isoformat() if row.get('created_at') else None,
-            }
-        
-        return result
-    except Exception as e:
-        logging.error(f"Failed to load candidate details: {e}", exc_info=True)
-        return {}
-
-
 @router.post("/search", response_model=SearchResponse)
 async def search(req: SearchRequest) -> SearchResponse:
     """
@@ -111,7 +32,7 @@ async def search(req: SearchRequest) -> SearchResponse:
         
         # 2. Perform Hybrid Retrieval
         logging.info("\n[Phase 2] Hybrid Retrieval 단계")
-        retrieval_results = await hybrid_retrieve(persona_dict, use_vector_search=True)
+        retrieval_results = await hybrid_retrieve(persona_dict, use_vector_search=True, mode=req.mode)
         
         if not retrieval_results:
             logging.warning("⚠️  검색 결과 없음")
@@ -130,14 +51,14 @@ async def search(req: SearchRequest) -> SearchResponse:
         candidate_ids_for_judging = [int(c['id']) for c in candidates_for_judging]
         
         logging.info(f"   → 상위 {len(candidate_ids_for_judging)}명 후보 상세 정보 로드")
-        detailed_candidates_for_judging = await load_candidate_details(candidate_ids_for_judging)
+        # Retrieval returned ids only: each candidate row is fetched exactly once here,
+        # and the judge and the response builder share the same dicts
+        candidate_map = CandidateMap()
+        candidates_list = await candidate_map.load(candidate_ids_for_judging)
 
-        if not detailed_candidates_for_judging:
+        if not candidates_list:
             raise Exception("Could not load details for judging candidates.")
 
-        # Convert dict to list for judge_parallel
-        candidates_list = [detailed_candidates_for_judging[cid] for cid in candidate_ids_for_judging if cid in detailed_candidates_for_judging]
-
         logging.info(f"   → {len(candidates_list)}명 후보에 대한 병렬 평가 시작")
         judged_results = await judge_parallel(candidates_list, persona_dict)
         
@@ -152,7 +73,7 @@ async def search(req: SearchRequest) -> SearchResponse:
         candidates_top4 = []
         for judged_cand in final_candidates:
             cand_id = int(judged_cand['candidate_id'])
-            details = detailed_candidates_for_judging.get(cand_id, {})
+            details = candidate_map.get(cand_id, {})
             
             candidate_result = CandidateSearchResult(
                 id=cand_id,
@@ -185,4 +106,13 @@ async def search(req: SearchRequest) -> SearchResponse:
         raise HTTPException(
             status_code=500,
             detail=f"Search failed: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/search/statement-cache")
+async def statement_cache_stats() -> dict:
+    """
+    Prepared statement reuse for search queries (hits = statement text already
+    prepared on the connection that ran it).
+    """
+    return pg.statement_stats.snapshot()
@@ -4,8 +4,11 @@
 from fastapi import HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.adapters.supabase import get_supabase_client
-from supabase import Client
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # Annotations only: the SDK is imported on first use (see app.adapters.supabase)
+    from supabase import Client
 
 security = HTTPBearer()
 
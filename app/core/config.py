@@ -13,8 +13,73 @@ class Settings(BaseSettings):
     DB_HOST: str
     DB_PORT: int
     DB_NAME: str
+    # Session settings for pooled connections (see app.adapters.pg.connect_db)
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
+    DB_JIT: bool = False  # JIT compilation costs more than it saves on short OLTP-style queries
 
     # pgvector is used via PostgreSQL (no separate service needed)
+    # Vector search backend: "pgvector" (query the DB) or "memory" (in-process NumPy matrix)
+    VECTOR_BACKEND: str = "pgvector"
+    # Dimension of candidates.vector; replaced at startup by the active embedding version's
+    VECTOR_DIM: int = 1536
+    VECTOR_REFRESH_INTERVAL_S: float = 30.0
+    # ANN index on candidates.vector (rebuilt by scripts/build_vector_index.py after bulk loads)
+    VECTOR_INDEX_METHOD: str = "ivfflat"  # "ivfflat" or "hnsw"
+    VECTOR_INDEX_MAINTENANCE_WORK_MEM: str = "512MB"
+    # Search-time recall/latency knobs; None uses the latest index build's recommendation
+    VECTOR_IVFFLAT_PROBES: int | None = None
+    VECTOR_HNSW_EF_SEARCH: int | None = None
+    # Filtered vector search: exact scan over the filtered rows up to this many matches,
+    # ANN scan + filter (with knobs widened by 1 / selectivity) above it
+    VECTOR_PREFILTER_MAX_ROWS: int = 5000
+    VECTOR_POSTFILTER_MAX_EXPANSIONS: int = 2
+    # In-memory Roaring-bitmap index for keyword/skill filters (needs a LISTEN-capable connection)
+    TERM_INDEX_ENABLED: bool = True
+    # Retrieval: "staged" (structured_search, then vector_topk, fused in Python) or
+    # "sql" (one statement with CTEs and in-database RRF, see pgvector.hybrid_topk)
+    RETRIEVAL_MODE: str = "staged"
+    # Adds a ts_rank_cd full-text list to the "sql" mode fusion
+    RETRIEVAL_FULLTEXT: bool = False
+    # Term canonicalization (app.services.canonicalize): keyword/skill filter terms are
+    # rewritten to stored vocabulary via folding, app/data/term_aliases.json and trigrams
+    TERM_CANONICALIZATION_ENABLED: bool = True
+    TERM_FUZZY_THRESHOLD: float = 0.5
+    TERM_VOCABULARY_TTL_S: float = 300.0
+    # Filter planner (app.services.filter_planner): terms matching more than
+    # FILTER_MAX_TERM_SELECTIVITY of the candidates are dropped while more selective terms
+    # remain, and match_count is IDF-weighted. Substring terms are estimated on a sample.
+    FILTER_PLANNER_ENABLED: bool = True
+    FILTER_MAX_TERM_SELECTIVITY: float = 0.2
+    FILTER_SAMPLE_ROWS: int = 2000
+    FILTER_TEXT_STATS_TTL_S: float = 300.0
+    # MMR diversity stage after fusion: relevance weight per SearchRequest.mode
+    # (1.0 skips the stage), applied to the top MMR_POOL_SIZE fused results
+    MMR_LAMBDA: dict[str, float] = {"speed": 1.0, "balanced": 0.7, "quality": 0.5}
+    MMR_POOL_SIZE: int = 30
+    # Keyword/skill co-occurrence graph (build with scripts/build_term_graph.py). When set,
+    # filter terms are expanded locally with up to TERM_EXPANSION_LIMIT neighbours whose
+    # summed weight is at least TERM_EXPANSION_MIN_WEIGHT, and the persona prompt only
+    # asks for core terms. Expanded terms count TERM_EXPANSION_WEIGHT in match_count.
+    TERM_GRAPH_PATH: str | None = None
+    TERM_EXPANSION_LIMIT: int = 8
+    TERM_EXPANSION_MIN_WEIGHT: float = 0.1
+    TERM_EXPANSION_WEIGHT: float = 0.5
+    # Corpus snapshot restored at startup (build with scripts/build_snapshot.py)
+    SNAPSHOT_DIR: str | None = None
+
+    # Embedding model for candidate documents and queries. Once the embedding_versions table
+    # has an active version (app.services.embedding_versions), its model and dimension
+    # replace EMBEDDING_MODEL and VECTOR_DIM; change models with scripts/migrate_embeddings.py.
+    EMBEDDING_MODEL: str = "models/text-embedding-004"
+    # Embedding API calls in flight per vectorization batch
+    EMBEDDING_CONCURRENCY: int = 8
+    # Background job worker (app.services.jobs): polls the jobs table for work other
+    # instances queued; jobs queued on this instance start immediately
+    JOBS_WORKER_ENABLED: bool = True
+    JOBS_POLL_INTERVAL_S: float = 5.0
+    JOBS_MAX_ATTEMPTS: int = 5
+    # Queue a "vectorize" job when candidates are inserted (seen on the change feed)
+    EMBED_ON_INSERT: bool = True
 
     # Supabase settings
     SUPABASE_URL: str
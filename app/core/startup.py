@@ -0,0 +1,77 @@
+"""
+Cold-start budget: how long each import group and initialization step took.
+
+app.main imports this module first, so durations are measured from (close to) the
+moment the ASGI server imports the app. The profile is logged once startup finishes
+and reported by GET /ready.
+"""
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfile:
+    """Durations of startup steps, in the order they finished."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.steps: list[dict] = []
+        self.ready_ms: float | None = None
+
+    def _elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def _record(self, name: str, kind: str, started: float, error: Exception | None = None) -> None:
+        step = {
+            "name": name,
+            "kind": kind,
+            "ms": round((time.perf_counter() - started) * 1000, 1),
+            "at_ms": round(self._elapsed_ms(), 1),
+        }
+        if error is not None:
+            step["error"] = f"{type(error).__name__}: {error}"
+        self.steps.append(step)
+
+    @contextmanager
+    def step(self, name: str, kind: str = "init"):
+        """Times a synchronous block (e.g. a group of imports)."""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self._record(name, kind, started, e)
+            raise
+        self._record(name, kind, started)
+
+    async def run(self, name: str, awaitable):
+        """Times an initialization coroutine; concurrent steps overlap in at_ms."""
+        started = time.perf_counter()
+        try:
+            result = await awaitable
+        except Exception as e:
+            self._record(name, "init", started, e)
+            raise
+        self._record(name, "init", started)
+        return result
+
+    async def gather(self, **steps):
+        """Runs named initialization coroutines concurrently."""
+        return await asyncio.gather(*(self.run(name, awaitable) for name, awaitable in steps.items()))
+
+    def mark_ready(self) -> None:
+        self.ready_ms = round(self._elapsed_ms(), 1)
+        summary = ", ".join(f"{step['name']} {step['ms']:.0f}ms" for step in self.steps)
+        logger.info(f"Ready {self.ready_ms:.0f}ms after import: {summary}")
+
+    @property
+    def is_ready(self) -> bool:
+        return self.ready_ms is not None
+
+    def snapshot(self) -> dict:
+        return {"ready_ms": self.ready_ms, "steps": list(self.steps)}
+
+
+profile = StartupProfile()
@@ -1,11 +1,159 @@
 import asyncio
 import logging
-from app.adapters.pg import connect_db, close_db, execute_query
+from app.adapters.pg import connect_db, close_db, open_connection
 from app.core.config import settings
 from dotenv import load_dotenv
 
 logging.basicConfig(level=logging.INFO)
 
+# updated_at is the change watermark used by in-process indexes (see app.adapters.vector_memory)
+TRIGGER_STATEMENTS = [
+    """
+    CREATE OR REPLACE FUNCTION candidates_touch_updated_at() RETURNS trigger AS $$
+    BEGIN
+      -- Embedding bookkeeping (content_hash, embedding_model, embedded_at and the columns of
+      -- a version being backfilled) is not an edit: writing it must not make rows look stale
+      IF (NEW.name, NEW.email, NEW.introduce, NEW.keywords, NEW.skills, NEW.cards, NEW.location, NEW.vector)
+         IS DISTINCT FROM
+         (OLD.name, OLD.email, OLD.introduce, OLD.keywords, OLD.skills, OLD.cards, OLD.location, OLD.vector) THEN
+        NEW.updated_at = now();
+      END IF;
+      RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS trg_candidates_updated_at ON candidates",
+    """
+    CREATE TRIGGER trg_candidates_updated_at
+      BEFORE UPDATE ON candidates
+      FOR EACH ROW EXECUTE FUNCTION candidates_touch_updated_at()
+    """,
+    # Change feed for in-process subscribers (see app.adapters.changes). Statement-level:
+    # one notification per 500 changed ids, so bulk writes stay under the 8000-byte
+    # payload limit and do not queue a notification per row.
+    """
+    CREATE OR REPLACE FUNCTION candidates_notify_changes() RETURNS trigger AS $$
+    DECLARE
+      chunk INT[];
+    BEGIN
+      IF TG_OP = 'DELETE' THEN
+        FOR chunk IN
+          SELECT array_agg(id) FROM (SELECT id, row_number() OVER (ORDER BY id) AS n FROM old_rows) s
+          GROUP BY (n - 1) / 500
+        LOOP
+          PERFORM pg_notify('candidates_changed', json_build_object('op', TG_OP, 'ids', chunk)::text);
+        END LOOP;
+      ELSE
+        FOR chunk IN
+          SELECT array_agg(id) FROM (SELECT id, row_number() OVER (ORDER BY id) AS n FROM new_rows) s
+          GROUP BY (n - 1) / 500
+        LOOP
+          PERFORM pg_notify('candidates_changed', json_build_object('op', TG_OP, 'ids', chunk)::text);
+        END LOOP;
+      END IF;
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    # Replaced by the statement-level triggers below
+    "DROP TRIGGER IF EXISTS trg_candidates_notify_change ON candidates",
+    "DROP FUNCTION IF EXISTS candidates_notify_change()",
+    "DROP TRIGGER IF EXISTS trg_candidates_notify_insert ON candidates",
+    """
+    CREATE TRIGGER trg_candidates_notify_insert
+      AFTER INSERT ON candidates REFERENCING NEW TABLE AS new_rows
+      FOR EACH STATEMENT EXECUTE FUNCTION candidates_notify_changes()
+    """,
+    "DROP TRIGGER IF EXISTS trg_candidates_notify_update ON candidates",
+    """
+    CREATE TRIGGER trg_candidates_notify_update
+      AFTER UPDATE ON candidates REFERENCING NEW TABLE AS new_rows
+      FOR EACH STATEMENT EXECUTE FUNCTION candidates_notify_changes()
+    """,
+    "DROP TRIGGER IF EXISTS trg_candidates_notify_delete ON candidates",
+    """
+    CREATE TRIGGER trg_candidates_notify_delete
+      AFTER DELETE ON candidates REFERENCING OLD TABLE AS old_rows
+      FOR EACH STATEMENT EXECUTE FUNCTION candidates_notify_changes()
+    """,
+    # Term statistics for the filter planner (see app.services.filter_planner).
+    # Statement-level with transition tables: one aggregated upsert per INSERT/UPDATE/DELETE
+    # statement (or COPY batch) instead of one per row and term.
+    """
+    CREATE OR REPLACE FUNCTION candidate_terms(keywords JSONB, skills JSONB)
+    RETURNS TABLE (field TEXT, term TEXT) LANGUAGE sql IMMUTABLE AS $$
+      SELECT DISTINCT 'keywords', t FROM jsonb_array_elements_text(COALESCE(keywords, '[]'::jsonb)) AS t
+      UNION
+      SELECT DISTINCT 'skills', t FROM jsonb_array_elements_text(COALESCE(skills, '[]'::jsonb)) AS t
+      UNION ALL
+      SELECT '', ''
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION candidates_term_stats() RETURNS trigger AS $$
+    BEGIN
+      IF TG_OP = 'INSERT' THEN
+        INSERT INTO term_stats (field, term, df)
+        SELECT t.field, t.term, count(*) FROM new_rows n, candidate_terms(n.keywords, n.skills) t
+        GROUP BY t.field, t.term
+        ON CONFLICT (field, term) DO UPDATE SET df = term_stats.df + EXCLUDED.df;
+      ELSIF TG_OP = 'DELETE' THEN
+        UPDATE term_stats s SET df = s.df - d.df
+        FROM (
+          SELECT t.field, t.term, count(*) AS df FROM old_rows o, candidate_terms(o.keywords, o.skills) t
+          GROUP BY t.field, t.term
+        ) d
+        WHERE s.field = d.field AND s.term = d.term;
+      ELSE
+        INSERT INTO term_stats (field, term, df)
+        SELECT field, term, sum(delta) FROM (
+          SELECT t.field, t.term, 1 AS delta FROM new_rows n, candidate_terms(n.keywords, n.skills) t
+          UNION ALL
+          SELECT t.field, t.term, -1 FROM old_rows o, candidate_terms(o.keywords, o.skills) t
+        ) d
+        GROUP BY field, term
+        HAVING sum(delta) <> 0
+        ON CONFLICT (field, term) DO UPDATE SET df = term_stats.df + EXCLUDED.df;
+      END IF;
+      RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    # Transition tables allow a single event per trigger
+    "DROP TRIGGER IF EXISTS trg_candidates_term_stats_insert ON candidates",
+    """
+    CREATE TRIGGER trg_candidates_term_stats_insert
+      AFTER INSERT ON candidates REFERENCING NEW TABLE AS new_rows
+      FOR EACH STATEMENT EXECUTE FUNCTION candidates_term_stats()
+    """,
+    "DROP TRIGGER IF EXISTS trg_candidates_term_stats_update ON candidates",
+    """
+    CREATE TRIGGER trg_candidates_term_stats_update
+      AFTER UPDATE ON candidates REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+      FOR EACH STATEMENT EXECUTE FUNCTION candidates_term_stats()
+    """,
+    "DROP TRIGGER IF EXISTS trg_candidates_term_stats_delete ON candidates",
+    """
+    CREATE TRIGGER trg_candidates_term_stats_delete
+      AFTER DELETE ON candidates REFERENCING OLD TABLE AS old_rows
+      FOR EACH STATEMENT EXECUTE FUNCTION candidates_term_stats()
+    """,
+    # Backfill once; afterwards the triggers keep term_stats current. The share lock keeps
+    # writers out while the initial counts are taken.
+    """
+    DO $$
+    BEGIN
+      IF NOT EXISTS (SELECT 1 FROM term_stats) THEN
+        LOCK TABLE candidates IN SHARE MODE;
+        INSERT INTO term_stats (field, term, df)
+        SELECT t.field, t.term, count(*) FROM candidates c, candidate_terms(c.keywords, c.skills) t
+        GROUP BY t.field, t.term;
+      END IF;
+    END;
+    $$
+    """,
+]
+
 async def initialize_db():
     logging.info("Starting database initialization...")
     try:
@@ -30,6 +178,13 @@ async def initialize_db():
           created_at TIMESTAMPTZ DEFAULT now()
         );
 
+        -- Lower-cased keywords and skills, the vocabulary hard constraints (must_have) are checked against
+        CREATE OR REPLACE FUNCTION candidate_search_terms(keywords JSONB, skills JSONB) RETURNS TEXT[]
+        LANGUAGE sql IMMUTABLE AS $$
+          SELECT COALESCE(array_agg(DISTINCT lower(term)), '{}')
+          FROM jsonb_array_elements_text(COALESCE(keywords, '[]'::jsonb) || COALESCE(skills, '[]'::jsonb)) AS term
+        $$;
+
         CREATE TABLE IF NOT EXISTS candidates (
           id SERIAL PRIMARY KEY,
           name TEXT NOT NULL,
@@ -39,14 +194,92 @@ async def initialize_db():
           skills JSONB,
           cards JSONB,
           vector VECTOR(1536),
-          created_at TIMESTAMP DEFAULT now()
+          created_at TIMESTAMP DEFAULT now(),
+          updated_at TIMESTAMPTZ DEFAULT now()
         );
 
+        ALTER TABLE candidates ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT now();
+        -- Hard constraints (Persona.constraints_hard): NULL location means unknown and passes location filters
+        ALTER TABLE candidates ADD COLUMN IF NOT EXISTS location TEXT;
+        ALTER TABLE candidates ADD COLUMN IF NOT EXISTS search_terms TEXT[]
+          GENERATED ALWAYS AS (candidate_search_terms(keywords, skills)) STORED;
+        -- Embedding provenance (see app.services.candidates): sha256 of the embedded document,
+        -- the model that produced the vector, and when it was written
+        ALTER TABLE candidates ADD COLUMN IF NOT EXISTS content_hash TEXT;
+        ALTER TABLE candidates ADD COLUMN IF NOT EXISTS embedding_model TEXT;
+        ALTER TABLE candidates ADD COLUMN IF NOT EXISTS embedded_at TIMESTAMPTZ;
+        -- Vectors written before embedding_model existed all came from text-embedding-004
+        UPDATE candidates SET embedding_model = 'models/text-embedding-004'
+          WHERE vector IS NOT NULL AND embedding_model IS NULL AND embedded_at IS NULL;
+
         CREATE INDEX IF NOT EXISTS idx_candidates_email ON candidates (email);
         CREATE INDEX IF NOT EXISTS idx_candidates_keywords_gin ON candidates USING GIN (keywords);
         CREATE INDEX IF NOT EXISTS idx_candidates_skills_gin ON candidates USING GIN (skills);
         CREATE INDEX IF NOT EXISTS idx_candidates_cards_gin ON candidates USING GIN (cards);
-        CREATE INDEX IF NOT EXISTS idx_candidates_vector ON candidates USING ivfflat (vector vector_cosine_ops);
+        -- The ANN index on candidates.vector is sized to the data and built after loading
+        -- by app.adapters.vector_index (scripts/build_vector_index.py), not on an empty table.
+        CREATE INDEX IF NOT EXISTS idx_candidates_updated_at ON candidates (updated_at);
+        CREATE INDEX IF NOT EXISTS idx_candidates_location ON candidates (lower(location));
+        CREATE INDEX IF NOT EXISTS idx_candidates_search_terms_gin ON candidates USING GIN (search_terms);
+
+        -- Document frequency per (field, term) of candidates.keywords / skills, kept current by
+        -- statement-level triggers (see TRIGGER_STATEMENTS). The ('', '') row holds the candidate count.
+        CREATE TABLE IF NOT EXISTS term_stats (
+          field TEXT NOT NULL,
+          term TEXT NOT NULL,
+          df BIGINT NOT NULL,
+          PRIMARY KEY (field, term)
+        );
+
+        CREATE TABLE IF NOT EXISTS vector_index_builds (
+          id SERIAL PRIMARY KEY,
+          index_name TEXT NOT NULL,
+          method TEXT NOT NULL,
+          build_params JSONB NOT NULL,
+          search_params JSONB NOT NULL,
+          row_count BIGINT NOT NULL,
+          build_ms BIGINT NOT NULL,
+          size_bytes BIGINT NOT NULL,
+          created_at TIMESTAMPTZ DEFAULT now()
+        );
+
+        -- Embedding model versions (see app.services.embedding_versions). candidates.vector and
+        -- its provenance columns hold the active version. A new version is backfilled into the
+        -- same columns suffixed _next and swapped in by renaming, the previous one is kept as _prev.
+        CREATE TABLE IF NOT EXISTS embedding_versions (
+          version TEXT PRIMARY KEY,
+          model TEXT NOT NULL,
+          dim INT NOT NULL,
+          status TEXT NOT NULL DEFAULT 'backfilling',
+          job_id BIGINT,
+          created_at TIMESTAMPTZ DEFAULT now(),
+          activated_at TIMESTAMPTZ
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_embedding_versions_active ON embedding_versions ((true)) WHERE status = 'active';
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_embedding_versions_backfilling ON embedding_versions ((true)) WHERE status = 'backfilling';
+
+        -- Background jobs (see app.services.jobs). A worker holds an advisory lock on the id
+        -- while running a job, and persists progress, checkpoint and heartbeat_at as it goes
+        CREATE TABLE IF NOT EXISTS jobs (
+          id BIGSERIAL PRIMARY KEY,
+          kind TEXT NOT NULL,
+          status TEXT NOT NULL DEFAULT 'queued',
+          params JSONB NOT NULL DEFAULT '{}',
+          progress JSONB NOT NULL DEFAULT '{}',
+          checkpoint JSONB NOT NULL DEFAULT '{}',
+          total BIGINT,
+          error TEXT,
+          attempts INT NOT NULL DEFAULT 0,
+          worker TEXT,
+          created_at TIMESTAMPTZ DEFAULT now(),
+          started_at TIMESTAMPTZ,
+          heartbeat_at TIMESTAMPTZ,
+          finished_at TIMESTAMPTZ
+        );
+        -- At most one queued job per kind, which may wait behind a running one whose
+        -- scan is already past the rows that queued it (see app.services.jobs)
+        DROP INDEX IF EXISTS idx_jobs_active_kind;
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_queued_kind ON jobs (kind) WHERE status = 'queued';
 
         CREATE TABLE IF NOT EXISTS search_audit (
           id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -61,9 +294,20 @@ async def initialize_db():
         # Split by semicolon and filter out empty strings
         statements = [s.strip() for s in ddl_statements.split(';') if s.strip()]
 
-        for statement in statements:
-            logging.info(f"Executing DDL: {statement[:70]}...") # Log first 70 chars
-            await execute_query(statement)
+        # A standalone connection: on an existing table, adding the generated search_terms column
+        # rewrites it and the GIN index / term_stats backfill scan it, beyond the pool's timeouts
+        connection = await open_connection()
+        try:
+            for statement in statements:
+                logging.info(f"Executing DDL: {statement[:70]}...") # Log first 70 chars
+                await connection.execute(statement)
+
+            # Function bodies contain semicolons, so these are executed as whole statements
+            for statement in TRIGGER_STATEMENTS:
+                logging.info(f"Executing DDL: {statement.strip()[:70]}...")
+                await connection.execute(statement)
+        finally:
+            await connection.close()
         
         logging.info("Database initialization completed successfully.")
 
@@ -1,10 +1,19 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from app.api import routes_search, routes_candidates, routes_auth
-from app.adapters.pg import connect_db, close_db
+# Imported first: the startup profile is measured from here
+from app.core.startup import profile
+import asyncio
 import logging
 import sys
 
+with profile.step("import fastapi", kind="import"):
+    from fastapi import FastAPI, Response
+    from fastapi.middleware.cors import CORSMiddleware
+with profile.step("import app", kind="import"):
+    from app.api import routes_search, routes_candidates, routes_auth, routes_jobs
+    from app.adapters.pg import connect_db, close_db
+    from app.adapters import changes, gemini, pg, supabase, vector_backend, vector_memory, term_index
+    from app.core.config import settings
+    from app.services import embedding_versions, jobs, snapshot, term_graph
+
 app = FastAPI(
     title="AI Talent Search API",
     description="""
@@ -58,9 +67,14 @@ app.add_middleware(
 app.include_router(routes_search.router, prefix="/v1")
 app.include_router(routes_candidates.router, prefix="/v1")
 app.include_router(routes_auth.router, prefix="/v1")
+app.include_router(routes_jobs.router, prefix="/v1")
+
+# Background load of the in-process indexes, started once the server can take requests
+_warm_up_task: asyncio.Task | None = None
 
 @app.on_event("startup")
 async def startup_event():
+    global _warm_up_task
     # 로깅 설정 (uvicorn이 이미 설정했을 수 있으므로 force=True 사용)
     logging.basicConfig(
         level=logging.INFO,
@@ -82,12 +96,66 @@ async def startup_event():
     # 로깅 설정 확인
     logging.info("Logging configured successfully")
     
-    await connect_db()
+    # SDK imports (in threads) overlap with the DB initialization chain below
+    sdks = asyncio.ensure_future(profile.gather(gemini=gemini.warm_up(), supabase=supabase.warm_up()))
+    await profile.gather(connect_db=connect_db(), term_graph=asyncio.to_thread(term_graph.get_graph))
+    # Before the in-process indexes load: settings must hold the active embedding
+    # version, and subscribing first means no change is missed
+    await profile.gather(embedding_versions=embedding_versions.start(), changes=changes.start())
+    with profile.step("snapshot"):
+        snapshot.restore()
+    jobs.start()
+    # The server accepts requests meanwhile: searches fall back to SQL until the indexes
+    # are warm, and /ready reports 503 with the state of each component
+    _warm_up_task = asyncio.create_task(_warm_up(sdks))
+
+async def _warm_up(sdks: asyncio.Future) -> None:
+    """Loads the in-process indexes in the background and marks the instance ready."""
+    try:
+        await profile.gather(vector_backend=vector_backend.start(), term_index=term_index.start())
+        await sdks
+    except Exception as e:
+        logging.error(f"Warm-up failed, searches stay on SQL: {e}")
+        return
+    profile.mark_ready()
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    if _warm_up_task is not None and not _warm_up_task.done():
+        _warm_up_task.cancel()
+        try:
+            await _warm_up_task
+        except asyncio.CancelledError:
+            pass
+    await jobs.stop()
+    await vector_backend.stop()
+    await term_index.stop()
+    embedding_versions.stop()
+    await changes.stop()
     await close_db()
 
 @app.get("/")
 async def read_root():
     return {"message": "Welcome to the AI Talent Search API"}
+
+@app.get("/ready", tags=["Health"])
+async def ready(response: Response):
+    """
+    Readiness: 200 once the in-process indexes finished loading in the background and the
+    searchable state is warm, 503 while warming (or degraded). Reports each component and
+    the startup profile.
+    """
+    components = {
+        "db": pg._pool is not None and not pg._pool.is_closing(),
+        "change_feed": changes.is_listening(),
+        "gemini": gemini.is_loaded(),
+        "supabase": supabase.is_loaded(),
+    }
+    if settings.TERM_INDEX_ENABLED:
+        components["term_index"] = term_index.is_warm()
+    if settings.VECTOR_BACKEND == "memory":
+        components["vector_index"] = vector_memory.is_loaded()
+    warm = profile.is_ready and all(components.values())
+    if not warm:
+        response.status_code = 503
+    return {"ready": warm, "components": components, "startup": profile.snapshot()}
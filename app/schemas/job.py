@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+
+class JobResponse(BaseModel):
+    """Background job state (app.services.jobs) with derived throughput"""
+    id: int
+    kind: str
+    status: str  # queued | running | succeeded | failed
+    params: Dict[str, Any] = {}
+    progress: Dict[str, Any] = {}  # handler counters; "processed" drives rows_per_second
+    checkpoint: Dict[str, Any] = {}  # resume point after a crash or restart
+    total: Optional[int] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    worker: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    elapsed_s: Optional[float] = None
+    rows_per_second: Optional[float] = None
+    eta_s: Optional[float] = None
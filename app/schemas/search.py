@@ -1,9 +1,11 @@
 from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Literal
 
 class SearchRequest(BaseModel):
     query_text: str
     org_context: Optional[Dict[str, Any]] = None
+    # PRD 3.2 latency modes; also selects the MMR diversity weight (settings.MMR_LAMBDA)
+    mode: Literal["speed", "balanced", "quality"] = "balanced"
 
 class CandidateSearchResult(BaseModel):
     """Search result candidate matching DB schema"""
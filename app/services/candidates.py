@@ -1,63 +1,227 @@
 
+import asyncio
+import hashlib
 import logging
+
+import numpy as np
+
 from app.adapters import pg, gemini
+from app.core.config import settings
 
 # 로거 생성 (명시적으로 로거 이름 지정)
 logger = logging.getLogger(__name__)
 
-async def generate_vectors_for_candidates():
+# Rows read per round trip from the server-side cursor, and rows per embed/write batch
+# (progress is reported and checkpointed after each batch)
+FETCH_SIZE = 500
+WRITE_BATCH_SIZE = 100
+
+COUNT_KEYS = ("scanned", "re_embedded", "skipped", "failed")
+
+# Embedding columns of the active version. A version being backfilled writes the same
+# columns with the SHADOW_SUFFIX (see app.services.embedding_versions).
+EMBEDDING_COLUMNS = ("vector", "content_hash", "embedding_model", "embedded_at")
+SHADOW_SUFFIX = "_next"
+
+
+def _stale_condition(suffix: str = "") -> str:
     """
-    Fetches candidates with NULL vectors, generates embeddings, and updates them in the DB.
+    Rows that may need a (re-)embedding into the `suffix` columns: no vector, never hashed,
+    edited since the last embedding (updated_at is bumped by trigger on content changes,
+    embedded_at is set with the vector), or embedded by another model. Whether the
+    document really changed is decided by its hash.
     """
-    try:
-        # 1. Fetch candidates with NULL vectors
-        rows = await pg.execute_query("SELECT id, name, introduce, keywords, skills, cards FROM candidates WHERE vector IS NULL")
-        
-        # Convert asyncpg Record objects to dictionaries
-        candidates_to_update = [dict(row) for row in rows] if rows else []
+    return f"""
+(vector{suffix} IS NULL OR embedded_at{suffix} IS NULL OR updated_at > embedded_at{suffix}
+ OR embedding_model{suffix} IS DISTINCT FROM $1)
+AND id > $2
+"""
 
-        if not candidates_to_update:
-            logger.info("No candidates found with NULL vectors. All vectors are up to date.")
-            return {"message": "No candidates to update.", "count": 0}
 
-        logger.info(f"Found {len(candidates_to_update)} candidates to process for vector generation.")
+def _stale_rows_query(suffix: str = "") -> str:
+    return f"""
+SELECT id, name, introduce, keywords, skills, cards, content_hash{suffix} AS content_hash,
+       embedding_model{suffix} AS embedding_model, vector{suffix} IS NOT NULL AS has_vector, updated_at
+FROM candidates
+WHERE {_stale_condition(suffix)}
+ORDER BY id
+"""
 
-        for candidate in candidates_to_update:
-            try:
-                # 2. Combine text fields into a single document for embedding
-                # We use COALESCE in the DB query, but as a fallback here, handle None safely.
-                name = candidate.get('name', '') or ''
-                introduce = candidate.get('introduce', '') or ''
-                
-                # Safely handle JSONB fields which might be None
-                keywords = candidate.get('keywords', []) or []
-                skills = candidate.get('skills', []) or []
-                cards = candidate.get('cards', []) or []
-
-                # Convert JSONB to a string representation for embedding
-                keywords_text = ' '.join(map(str, keywords))
-                skills_text = ' '.join(map(str, skills))
-                cards_text = ' '.join(map(str, cards))
-
-                document = f"Name: {name}\nIntroduction: {introduce}\nKeywords: {keywords_text}\nSkills: {skills_text}\nCards: {cards_text}"
-
-                # 3. Generate vector embedding
-                vector = await gemini.embed_query(document)
-
-                # 4. Update the candidate's vector in the database
-                await pg.execute_query(
-                    "UPDATE candidates SET vector = $1 WHERE id = $2",
-                    str(vector),
-                    candidate['id']
-                )
-                logger.info(f"Successfully generated and updated vector for candidate ID: {candidate['id']}")
 
+EMBEDDING_WRITE_COLUMNS = ("id", "updated_at", "content_hash", "vector", "embedding_model")
+
+_CREATE_EMBEDDING_WRITES = """
+CREATE TEMP TABLE embedding_writes (
+  id INT NOT NULL,
+  updated_at TIMESTAMPTZ NOT NULL,
+  content_hash TEXT NOT NULL,
+  vector VECTOR,
+  embedding_model TEXT
+) ON COMMIT DROP
+"""
+
+
+def _apply_embedding_writes(suffix: str = "") -> str:
+    """
+    Rows without a vector only record that the stored vector is current. `updated_at`
+    skips rows edited while the job ran; the next run picks them up. Vectors whose model
+    or dimension is not the one of the version owning the columns are dropped, so a job
+    started before a version switch cannot write into the new version's columns.
+    """
+    status = "backfilling" if suffix else "active"
+    return f"""
+UPDATE candidates c
+SET vector{suffix} = COALESCE(w.vector, c.vector{suffix}),
+    embedding_model{suffix} = COALESCE(w.embedding_model, c.embedding_model{suffix}),
+    content_hash{suffix} = w.content_hash,
+    embedded_at{suffix} = now()
+FROM embedding_writes w
+WHERE c.id = w.id AND c.updated_at = w.updated_at
+  AND (w.vector IS NULL OR NOT EXISTS (
+    SELECT 1 FROM embedding_versions v
+    WHERE v.status = '{status}' AND (v.model <> w.embedding_model OR v.dim <> vector_dims(w.vector))
+  ))
+"""
+
+
+def embedding_document(candidate: dict) -> str:
+    """The exact text a candidate is embedded from (see app.services.persona for the query side)."""
+    # Handle None safely: JSONB fields may be NULL
+    name = candidate.get('name', '') or ''
+    introduce = candidate.get('introduce', '') or ''
+    keywords = candidate.get('keywords', []) or []
+    skills = candidate.get('skills', []) or []
+    cards = candidate.get('cards', []) or []
+
+    # Convert JSONB to a string representation for embedding
+    keywords_text = ' '.join(map(str, keywords))
+    skills_text = ' '.join(map(str, skills))
+    cards_text = ' '.join(map(str, cards))
+
+    return f"Name: {name}\nIntroduction: {introduce}\nKeywords: {keywords_text}\nSkills: {skills_text}\nCards: {cards_text}"
+
+
+def content_hash(document: str) -> str:
+    return hashlib.sha256(document.encode('utf-8')).hexdigest()
+
+
+async def write_embeddings(rows: list[tuple], suffix: str = "") -> int:
+    """
+    Applies (id, updated_at, content_hash, vector or None, embedding_model or None) rows
+    to the `suffix` embedding columns with one binary COPY into a temp table and one
+    UPDATE ... FROM, instead of an UPDATE round trip per row. Returns the number of
+    candidates updated.
+    """
+    async with pg._pool.acquire() as connection:
+        async with connection.transaction():
+            await connection.execute(_CREATE_EMBEDDING_WRITES)
+            await connection.copy_records_to_table(
+                "embedding_writes", records=rows, columns=EMBEDDING_WRITE_COLUMNS
+            )
+            status = await connection.execute(_apply_embedding_writes(suffix))
+    return int(status.split()[-1])
+
+
+async def count_stale_candidates(after_id: int = 0, suffix: str = "", model: str | None = None) -> int:
+    return await pg.fetch_val(
+        f"SELECT count(*) FROM candidates WHERE {_stale_condition(suffix)}",
+        model or settings.EMBEDDING_MODEL, after_id,
+    )
+
+
+async def generate_vectors_for_candidates(
+    after_id: int = 0, on_batch=None, suffix: str = "", model: str | None = None, dim: int | None = None
+):
+    """
+    Embeds candidates whose embedding document or embedding model changed since their
+    vector was written, streaming candidate rows (id > after_id, in id order) through a
+    server-side cursor. Up to EMBEDDING_CONCURRENCY embedding calls run at once.
+
+    A row with a vector is skipped (and marked current) when the hash of its document
+    and its embedding_model still match; that covers edits to non-embedded columns and
+    vectors written before content_hash existed.
+
+    `on_batch(counts, last_id)` is awaited after each batch is written; every row up to
+    last_id is then done, so it is a safe resume point (see run_vectorize_job).
+
+    The active version's columns and model are used by default; a shadow version passes
+    its `suffix`, `model` and `dim` (see app.services.embedding_versions).
+    """
+    model = model or settings.EMBEDDING_MODEL
+    counts = dict.fromkeys(COUNT_KEYS, 0)
+    semaphore = asyncio.Semaphore(settings.EMBEDDING_CONCURRENCY)
+    writes = []
+
+    async def flush():
+        if writes:
+            await write_embeddings(writes, suffix)
+            writes.clear()
+
+    async def embed(candidate: dict, document: str, digest: str):
+        async with semaphore:
+            try:
+                vector = await gemini.embed_query(document, model, dim)
             except Exception as e:
+                counts["failed"] += 1
                 logger.error(f"Failed to process candidate ID {candidate.get('id', 'N/A')}: {e}")
-        
+                return
+        writes.append((candidate['id'], candidate['updated_at'], digest, np.asarray(vector, dtype=np.float32), model))
+        counts["re_embedded"] += 1
+
+    async def process(batch: list[dict]):
+        embeds = []
+        for candidate in batch:
+            document = embedding_document(candidate)
+            digest = content_hash(document)
+            up_to_date = (
+                candidate['has_vector']
+                and candidate['embedding_model'] == model
+                and candidate['content_hash'] in (digest, None)
+            )
+            if up_to_date:
+                counts["skipped"] += 1
+                writes.append((candidate['id'], candidate['updated_at'], digest, None, None))
+            else:
+                embeds.append(embed(candidate, document, digest))
+        await asyncio.gather(*embeds)
+        await flush()
+        counts["scanned"] += len(batch)
+        logger.info(
+            f"   → {counts['scanned']:,} scanned: {counts['re_embedded']:,} re-embedded, "
+            f"{counts['skipped']:,} skipped, {counts['failed']:,} failed"
+        )
+        if on_batch is not None:
+            await on_batch(dict(counts), batch[-1]['id'])
+
+    try:
+        # The cursor needs its own connection and transaction for the whole scan;
+        # writes go through the pool so they commit as they are made
+        connection = await pg.open_connection()
+        try:
+            async with connection.transaction(readonly=True):
+                batch = []
+                async for row in connection.cursor(_stale_rows_query(suffix), model, after_id, prefetch=FETCH_SIZE):
+                    batch.append(dict(row))
+                    if len(batch) >= WRITE_BATCH_SIZE:
+                        await process(batch)
+                        batch = []
+                if batch:
+                    await process(batch)
+        finally:
+            await connection.close()
+            # Embeddings already computed are written even if the scan failed
+            await flush()
+
+        logger.info(
+            f"Vector generation done: {counts['re_embedded']} re-embedded, {counts['skipped']} skipped "
+            f"(unchanged), {counts['failed']} failed of {counts['scanned']} scanned"
+        )
+        if not counts["scanned"]:
+            return {"message": "No candidates to update.", "count": 0, **counts}
         return {
-            "message": f"Successfully generated vectors for {len(candidates_to_update)} candidates.",
-            "count": len(candidates_to_update)
+            "message": f"Re-embedded {counts['re_embedded']} candidates, skipped {counts['skipped']} unchanged.",
+            "count": counts["re_embedded"],
+            **counts,
         }
 
     except Exception as e:
@@ -65,3 +229,20 @@ async def generate_vectors_for_candidates():
         # In a real app, you might want to raise an HTTPException here
         # to be handled by the API layer.
         raise
+
+
+async def run_vectorize_job(job) -> None:
+    """
+    "vectorize" job handler (app.services.jobs): generate_vectors_for_candidates resumed
+    after the job's checkpointed candidate id, with counters carried over from earlier runs.
+    """
+    after_id = job.checkpoint.get("after_id", 0)
+    base = {key: job.progress.get(key, 0) for key in COUNT_KEYS}
+    if job.total is None:
+        await job.set_total(await count_stale_candidates(after_id))
+
+    async def on_batch(counts: dict, last_id: int):
+        merged = {key: base[key] + counts[key] for key in COUNT_KEYS}
+        await job.report(merged["scanned"], merged, {"after_id": last_id})
+
+    await generate_vectors_for_candidates(after_id, on_batch)
@@ -0,0 +1,191 @@
+"""
+Maps LLM-written keyword/skill filter terms onto the stored vocabulary.
+
+`keywords ?| $1` / `skills ?| $1` only match exact strings, so "Deep Learning" misses
+candidates tagged "딥러닝" and "자연어 처리" misses "자연어처리". Terms are resolved,
+in order, by:
+1. folding (NFKC, case, whitespace and -_/ separators)
+2. the Korean <-> English alias groups in app/data/term_aliases.json
+3. trigram similarity over the folded vocabulary (pg_trgm-style), for near spellings
+
+The vocabulary is the set of terms with df > 0 in term_stats (see app.db_init),
+reloaded after TERM_VOCABULARY_TTL_S. Hard-constraint must_have terms go through the
+same resolution (canonicalize_must_have) before they are pushed down as search_terms @> ...
+"""
+import asyncio
+import json
+import logging
+import re
+import time
+import unicodedata
+from collections import Counter
+from pathlib import Path
+
+from app.adapters import pg
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ALIASES_PATH = Path(__file__).parent.parent / "data" / "term_aliases.json"
+TERM_FIELDS = ("keywords", "skills")
+# Folded terms shorter than this ("ai", "5g") are too short for trigram matching
+_MIN_FUZZY_LENGTH = 3
+
+_SEPARATORS = re.compile(r"[\s\-_/·]+")
+
+
+def fold(term: str) -> str:
+    """Comparison key: NFKC, case-folded, without whitespace and -_/ separators."""
+    return _SEPARATORS.sub("", unicodedata.normalize("NFKC", term).casefold())
+
+
+def trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def load_aliases(path: Path = ALIASES_PATH) -> list[list[str]]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class Vocabulary:
+    """Stored terms per field, indexed by folded key, alias group and trigram."""
+
+    def __init__(self, frequencies: dict[str, dict[str, int]], aliases: list[list[str]]):
+        # field -> folded key -> stored terms, most frequent first
+        self._terms: dict[str, dict[str, list[str]]] = {}
+        # field -> trigram -> folded keys containing it
+        self._trigrams: dict[str, dict[str, list[str]]] = {}
+        self._trigram_counts: dict[str, dict[str, int]] = {}
+        for field in TERM_FIELDS:
+            by_key: dict[str, list[str]] = {}
+            field_frequencies = frequencies.get(field) or {}
+            for term in sorted(field_frequencies, key=field_frequencies.get, reverse=True):
+                by_key.setdefault(fold(term), []).append(term)
+            postings: dict[str, list[str]] = {}
+            counts = {}
+            for key in by_key:
+                grams = trigrams(key)
+                counts[key] = len(grams)
+                for gram in grams:
+                    postings.setdefault(gram, []).append(key)
+            self._terms[field] = by_key
+            self._trigrams[field] = postings
+            self._trigram_counts[field] = counts
+        # folded alias -> folded keys of its whole group
+        self._aliases: dict[str, tuple[str, ...]] = {}
+        for group in aliases:
+            keys = tuple(dict.fromkeys(fold(alias) for alias in group))
+            for key in keys:
+                self._aliases[key] = tuple(dict.fromkeys(self._aliases.get(key, ()) + keys))
+
+    def __len__(self) -> int:
+        return sum(len(by_key) for by_key in self._terms.values())
+
+    def equivalents(self, field: str, term: str) -> list[str]:
+        """Stored terms equal to `term` after folding or through an alias group."""
+        key = fold(term)
+        by_key = self._terms[field]
+        matches = []
+        for equivalent in self._aliases.get(key, (key,)):
+            matches.extend(by_key.get(equivalent, ()))
+        return matches
+
+    def similar(self, field: str, term: str) -> list[str]:
+        """Stored terms of the most trigram-similar folded key, if at or above TERM_FUZZY_THRESHOLD."""
+        key = fold(term)
+        if len(key) < _MIN_FUZZY_LENGTH:
+            return []
+        grams = trigrams(key)
+        shared = Counter()
+        postings = self._trigrams[field]
+        for gram in grams:
+            shared.update(postings.get(gram, ()))
+        counts = self._trigram_counts[field]
+        best_key, best_similarity = None, settings.TERM_FUZZY_THRESHOLD
+        for candidate, common in shared.items():
+            similarity = common / (len(grams) + counts[candidate] - common)
+            if similarity > best_similarity or best_key is None and similarity == best_similarity:
+                best_key, best_similarity = candidate, similarity
+        return list(self._terms[field][best_key]) if best_key is not None else []
+
+    def resolve(self, field: str, term: str) -> list[str]:
+        """Stored forms of `term` (best first), or [] when nothing in the vocabulary matches."""
+        return self.equivalents(field, term) or self.similar(field, term)
+
+
+_vocabulary: Vocabulary | None = None
+_loaded_at = 0.0
+_load_lock = asyncio.Lock()
+
+
+async def get_vocabulary() -> Vocabulary:
+    """The current vocabulary, (re)loaded from term_stats when missing or older than the TTL."""
+    global _vocabulary, _loaded_at
+    if _vocabulary is not None and time.monotonic() - _loaded_at < settings.TERM_VOCABULARY_TTL_S:
+        return _vocabulary
+    async with _load_lock:
+        if _vocabulary is None or time.monotonic() - _loaded_at >= settings.TERM_VOCABULARY_TTL_S:
+            rows = await pg.execute_query("SELECT field, term, df FROM term_stats WHERE df > 0 AND field <> ''")
+            frequencies: dict[str, dict[str, int]] = {}
+            for row in rows:
+                frequencies.setdefault(row['field'], {})[row['term']] = row['df']
+            _vocabulary = Vocabulary(frequencies, load_aliases())
+            _loaded_at = time.monotonic()
+            logger.info(f"Term vocabulary loaded: {len(_vocabulary)} folded terms")
+    return _vocabulary
+
+
+async def canonicalize_filters(search_filters: dict) -> dict:
+    """
+    Rewrites keyword/skill terms of `search_filters` to stored vocabulary.
+    `_any` terms expand to every stored equivalent (more ways to match);
+    `_all` terms take their single best stored form, since each must match.
+    Terms without any stored form are kept as written.
+    """
+    vocabulary = await get_vocabulary()
+    canonical = dict(search_filters)
+    rewritten = {}
+    for field in TERM_FIELDS:
+        for suffix in ("_any", "_all"):
+            key = f"{field}{suffix}"
+            if not search_filters.get(key):
+                continue
+            terms = []
+            for term in search_filters[key]:
+                stored = vocabulary.resolve(field, term)
+                if suffix == "_all":
+                    stored = stored[:1]
+                if stored and stored != [term]:
+                    rewritten[term] = stored
+                terms.extend(stored or [term])
+            canonical[key] = list(dict.fromkeys(terms))
+    if rewritten:
+        logger.info(f"   → Term canonicalization: {rewritten}")
+    return canonical
+
+
+async def canonicalize_must_have(terms: list[str]) -> list[str]:
+    """
+    Rewrites Persona.constraints_hard.must_have terms to stored vocabulary. They are
+    matched against keywords and skills together (candidates.search_terms) and each must
+    match, so a term takes its single best stored form from either field: the same folded
+    spelling, then an alias, then the nearest trigram match. Terms without any stored form are kept as written.
+    """
+    vocabulary = await get_vocabulary()
+    canonical = []
+    rewritten = {}
+    for term in terms:
+        stored = (
+            vocabulary.equivalents("keywords", term) or vocabulary.equivalents("skills", term)
+            or vocabulary.similar("keywords", term) or vocabulary.similar("skills", term)
+        )
+        # The term's own spelling before the rest of its alias group
+        stored.sort(key=lambda form: fold(form) != fold(term))
+        if stored and stored[0] != term:
+            rewritten[term] = stored[0]
+        canonical.append(stored[0] if stored else term)
+    if rewritten:
+        logger.info(f"   → Must-have canonicalization: {rewritten}")
+    return list(dict.fromkeys(canonical))
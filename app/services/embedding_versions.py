@@ -0,0 +1,315 @@
+"""
+Embedding model versions and zero-downtime migration between them.
+
+candidates.vector and its provenance columns (candidates.EMBEDDING_COLUMNS) always hold
+the active version, so every search path keeps reading `vector`. Moving to another model
+or dimension:
+
+    1. start_migration() adds the shadow columns (vector_next, content_hash_next, ...) for
+       the new version and queues an "embedding_backfill" job
+    2. the job embeds every candidate into the shadow columns (resumable, like
+       "vectorize"), builds the ANN index on vector_next concurrently, then catches up on
+       rows edited meanwhile
+    3. activate() renames the shadow columns and index over the active ones in one short
+       transaction; the replaced version stays in the *_prev columns for rollback()
+
+Searches keep using the active version throughout. The switch is announced on the change
+feed (app.adapters.changes): every instance then loads the new model and dimension into
+settings.EMBEDDING_MODEL / VECTOR_DIM (so gemini.embed_query matches the stored
+vectors), replaces its pooled connections (their cached statements return the old vector
+type) and reloads the in-memory vector index.
+
+Version status: backfilling -> active -> previous (in *_prev) -> retired, or abandoned.
+"""
+import logging
+
+from app.adapters import changes, pg, vector_index
+from app.core.config import settings
+from app.services import candidates
+
+logger = logging.getLogger(__name__)
+
+SHADOW_SUFFIX = candidates.SHADOW_SUFFIX
+PREVIOUS_SUFFIX = "_prev"
+# Used while rolling back, when the active and previous columns trade places
+_SWAP_SUFFIX = "_swap"
+
+# Renaming candidates' columns waits for running searches; give up rather than queue them
+SWITCH_LOCK_TIMEOUT = "5s"
+
+_active: dict | None = None
+
+
+def default_version(model: str, dim: int) -> str:
+    return f"{model.removeprefix('models/')}@{dim}"
+
+
+def active_version() -> dict | None:
+    return _active
+
+
+def _apply(version: dict) -> None:
+    global _active
+    _active = version
+    settings.EMBEDDING_MODEL = version['model']
+    settings.VECTOR_DIM = version['dim']
+
+
+async def load_active() -> dict:
+    """
+    Applies the active version to settings. Databases without one record the configured
+    EMBEDDING_MODEL / VECTOR_DIM as active, which is what their vectors were written with.
+    """
+    await pg.execute_query(
+        """
+        INSERT INTO embedding_versions (version, model, dim, status, activated_at)
+        SELECT $1, $2, $3, 'active', now()
+        WHERE NOT EXISTS (SELECT 1 FROM embedding_versions WHERE status = 'active')
+        ON CONFLICT DO NOTHING
+        """,
+        default_version(settings.EMBEDDING_MODEL, settings.VECTOR_DIM), settings.EMBEDDING_MODEL, settings.VECTOR_DIM,
+    )
+    rows = await pg.execute_query("SELECT * FROM embedding_versions WHERE status = 'active'")
+    _apply(dict(rows[0]))
+    logger.info(f"Active embedding version: {_active['version']} ({_active['model']}, {_active['dim']} dimensions)")
+    return _active
+
+
+async def list_versions() -> list[dict]:
+    rows = await pg.execute_query("SELECT * FROM embedding_versions ORDER BY created_at DESC")
+    return [dict(row) for row in rows]
+
+
+async def get_version(version: str) -> dict | None:
+    rows = await pg.execute_query("SELECT * FROM embedding_versions WHERE version = $1", version)
+    return dict(rows[0]) if rows else None
+
+
+async def _get_backfilling() -> dict | None:
+    rows = await pg.execute_query("SELECT * FROM embedding_versions WHERE status = 'backfilling'")
+    return dict(rows[0]) if rows else None
+
+
+async def coverage(suffix: str = SHADOW_SUFFIX) -> dict:
+    """Candidates, and how many of them have a vector in the `suffix` columns."""
+    row = (await pg.execute_query(
+        f"SELECT count(*) AS candidates, count(vector{suffix}) AS embedded FROM candidates"
+    ))[0]
+    return dict(row)
+
+
+async def _drop_columns(connection, suffix: str) -> None:
+    # Dropping a column drops its index; both are catalog-only changes
+    for column in candidates.EMBEDDING_COLUMNS:
+        await connection.execute(f"ALTER TABLE candidates DROP COLUMN IF EXISTS {column}{suffix}")
+
+
+async def start_migration(model: str, dim: int, version: str | None = None, activate: bool = True) -> dict:
+    """
+    Adds the shadow columns for a new version and queues the job that backfills them
+    (and, with `activate`, switches to the version once complete). Returns the version.
+    """
+    from app.services import jobs
+
+    version = version or default_version(model, dim)
+    backfilling = await _get_backfilling()
+    if backfilling is not None:
+        raise ValueError(f"Embedding version {backfilling['version']} is already being backfilled")
+    if await get_version(version) is not None:
+        raise ValueError(f"Embedding version {version} already exists")
+
+    async with pg._pool.acquire() as connection:
+        async with connection.transaction():
+            # The previous version is given up for good, along with leftovers of an abandoned one
+            await _drop_columns(connection, PREVIOUS_SUFFIX)
+            await _drop_columns(connection, SHADOW_SUFFIX)
+            await connection.execute("UPDATE embedding_versions SET status = 'retired' WHERE status = 'previous'")
+            await connection.execute(f"""
+                ALTER TABLE candidates
+                  ADD COLUMN vector{SHADOW_SUFFIX} VECTOR({int(dim)}),
+                  ADD COLUMN content_hash{SHADOW_SUFFIX} TEXT,
+                  ADD COLUMN embedding_model{SHADOW_SUFFIX} TEXT,
+                  ADD COLUMN embedded_at{SHADOW_SUFFIX} TIMESTAMPTZ
+            """)
+            await connection.execute(
+                "INSERT INTO embedding_versions (version, model, dim) VALUES ($1, $2, $3)", version, model, dim
+            )
+    job = await jobs.enqueue("embedding_backfill", {"version": version, "activate": activate})
+    await pg.execute_query("UPDATE embedding_versions SET job_id = $2 WHERE version = $1", version, job['id'])
+    logger.info(f"Embedding version {version} ({model}, {dim} dimensions) is being backfilled by job {job['id']}")
+    return await get_version(version)
+
+
+async def run_backfill_job(job) -> None:
+    """
+    "embedding_backfill" job handler (app.services.jobs). Phases, each checkpointed:
+    backfill (resumes after the last embedded id), index, catch_up, then the switch.
+    """
+    version = await get_version(job.params.get("version", ""))
+    if version is None or version['status'] != 'backfilling':
+        raise ValueError(f"Embedding version {job.params.get('version')} is not being backfilled")
+    model, dim = version['model'], version['dim']
+    checkpoint = dict(job.checkpoint)
+    phase = checkpoint.get("phase", "backfill")
+    base = {key: job.progress.get(key, 0) for key in candidates.COUNT_KEYS}
+
+    async def save(phase: str, counts: dict | None = None, **extra) -> None:
+        checkpoint.clear()
+        checkpoint.update(phase=phase, **extra)
+        merged = {key: base[key] + (counts or {}).get(key, 0) for key in candidates.COUNT_KEYS}
+        await job.report(merged["scanned"], {**merged, "phase": phase}, dict(checkpoint))
+
+    if phase == "backfill":
+        after_id = checkpoint.get("after_id", 0)
+        if job.total is None:
+            await job.set_total(await candidates.count_stale_candidates(after_id, SHADOW_SUFFIX, model))
+
+        async def on_batch(counts: dict, last_id: int):
+            await save("backfill", counts, after_id=last_id)
+
+        result = await candidates.generate_vectors_for_candidates(after_id, on_batch, SHADOW_SUFFIX, model, dim)
+        base = {key: base[key] + result[key] for key in candidates.COUNT_KEYS}
+        phase = "index"
+        await save(phase)
+
+    if phase == "index":
+        await vector_index.rebuild_vector_index(column=f"vector{SHADOW_SUFFIX}")
+        phase = "catch_up"
+        await save(phase)
+
+    if phase == "catch_up":
+        # Rows edited while the backfill and the index build ran; rows edited after this
+        # pass are re-embedded by the "vectorize" job queued at the switch
+        result = await candidates.generate_vectors_for_candidates(0, None, SHADOW_SUFFIX, model, dim)
+        base = {key: base[key] + result[key] for key in candidates.COUNT_KEYS}
+        phase = "switch"
+        await save(phase)
+
+    if job.params.get("activate", True):
+        await activate(version['version'])
+
+
+async def _rename(connection, renames: list[tuple[str, str]]) -> None:
+    """Renames the embedding columns, the ANN index and its build history, suffix to suffix, in order."""
+    index = vector_index.INDEX_NAME
+    for source, target in renames:
+        for column in candidates.EMBEDDING_COLUMNS:
+            await connection.execute(f"ALTER TABLE candidates RENAME COLUMN {column}{source} TO {column}{target}")
+        await connection.execute(f"ALTER INDEX IF EXISTS {index}{source} RENAME TO {index}{target}")
+        await connection.execute(
+            "UPDATE vector_index_builds SET index_name = $2 WHERE index_name = $1", index + source, index + target
+        )
+
+
+async def _switch(connection, renames: list[tuple[str, str]], version: str, replaced_status: str) -> None:
+    await connection.execute(f"SET LOCAL lock_timeout = '{SWITCH_LOCK_TIMEOUT}'")
+    await _rename(connection, renames)
+    await connection.execute(
+        "UPDATE embedding_versions SET status = $1 WHERE status = 'active'", replaced_status
+    )
+    await connection.execute(
+        "UPDATE embedding_versions SET status = 'active', activated_at = now() WHERE version = $1", version
+    )
+    # Delivered on commit, to every instance including this one
+    await connection.execute(
+        "SELECT pg_notify($1, json_build_object('op', 'VERSION', 'version', $2::text)::text)",
+        changes.CHANGE_CHANNEL, version,
+    )
+
+
+async def activate(version: str, force: bool = False) -> dict:
+    """
+    Swaps the backfilled `version` in as the active one. Refuses while candidates still
+    lack a vector of the new version (they would drop out of vector search), unless `force`.
+    """
+    from app.services import jobs
+
+    row = await get_version(version)
+    if row is None or row['status'] != 'backfilling':
+        raise ValueError(f"Embedding version {version} is not being backfilled")
+    counts = await coverage(SHADOW_SUFFIX)
+    missing = counts['candidates'] - counts['embedded']
+    if missing and not force:
+        raise RuntimeError(f"{missing} of {counts['candidates']} candidates have no {version} vector yet")
+
+    async with pg._pool.acquire() as connection:
+        async with connection.transaction():
+            await _drop_columns(connection, PREVIOUS_SUFFIX)
+            await connection.execute("UPDATE embedding_versions SET status = 'retired' WHERE status = 'previous'")
+            await connection.execute(
+                "DELETE FROM vector_index_builds WHERE index_name = $1", vector_index.INDEX_NAME + PREVIOUS_SUFFIX
+            )
+            await _switch(connection, [("", PREVIOUS_SUFFIX), (SHADOW_SUFFIX, "")], version, "previous")
+    logger.info(f"Embedding version {version} is active ({missing} candidates without a vector)")
+    # Rows edited after the catch-up pass were embedded with the replaced model only
+    await jobs.enqueue("vectorize")
+    return await get_version(version)
+
+
+async def rollback() -> dict:
+    """Swaps the previous version (kept in the *_prev columns) back in."""
+    from app.services import jobs
+
+    rows = await pg.execute_query("SELECT * FROM embedding_versions WHERE status = 'previous'")
+    if not rows:
+        raise ValueError("There is no previous embedding version to roll back to")
+    if await _get_backfilling() is not None:
+        raise ValueError("Abandon the version being backfilled before rolling back")
+    version = rows[0]['version']
+    async with pg._pool.acquire() as connection:
+        async with connection.transaction():
+            await _switch(
+                connection,
+                [("", _SWAP_SUFFIX), (PREVIOUS_SUFFIX, ""), (_SWAP_SUFFIX, PREVIOUS_SUFFIX)],
+                version, "previous",
+            )
+    logger.info(f"Rolled back to embedding version {version}")
+    # Candidates added or edited since the switch have no current vector of this version
+    await jobs.enqueue("vectorize")
+    return await get_version(version)
+
+
+async def abandon() -> dict:
+    """Drops the version being backfilled and its shadow columns."""
+    row = await _get_backfilling()
+    if row is None:
+        raise ValueError("No embedding version is being backfilled")
+    async with pg._pool.acquire() as connection:
+        async with connection.transaction():
+            await _drop_columns(connection, SHADOW_SUFFIX)
+            await connection.execute(
+                "UPDATE embedding_versions SET status = 'abandoned' WHERE version = $1", row['version']
+            )
+            await connection.execute(
+                "UPDATE jobs SET status = 'failed', error = 'Embedding version abandoned', finished_at = now() "
+                "WHERE id = $1 AND status = 'queued'",
+                row['job_id'],
+            )
+    logger.info(f"Abandoned embedding version {row['version']}")
+    return await get_version(row['version'])
+
+
+async def _on_changes(batch: changes.ChangeBatch) -> None:
+    """Change feed subscriber: follows version switches made by any instance."""
+    if batch.version is None:
+        return
+    await load_active()
+    await pg.reset_statement_caches()
+    await vector_index.load_search_params()
+
+
+async def start() -> None:
+    """
+    Applies the active version, then follows switches. Runs before the snapshot restore
+    and the in-memory indexes, so they load (and later reload) vectors of the version
+    settings describe.
+    """
+    try:
+        await load_active()
+    except Exception as e:
+        logger.warning(f"Could not load the active embedding version, using EMBEDDING_MODEL / VECTOR_DIM: {e}")
+    changes.subscribe(_on_changes)
+
+
+def stop() -> None:
+    changes.unsubscribe(_on_changes)
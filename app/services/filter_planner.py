@@ -0,0 +1,161 @@
+"""
+Selectivity-aware rewrite of SearchFilters before they are sent to the database.
+
+The LLM tends to add generic terms ("AI", "연구", "개발") to the OR'd filter groups,
+which makes structured_search match most of the table. Using document frequencies,
+the planner:
+- drops terms that match more than FILTER_MAX_TERM_SELECTIVITY of the candidates,
+  as long as more selective terms remain (otherwise they are only down-weighted)
+- drops keyword/skill terms no candidate has, and `_all` groups that cannot match
+- orders each term list by frequency
+- weights match_count by IDF, so rare matches outrank generic ones; terms added by
+  co-occurrence expansion (app.services.term_graph) count TERM_EXPANSION_WEIGHT as much
+
+Keyword/skill frequencies come from the warm term index, or else from the term_stats
+table (kept current by triggers, see app.db_init). Substring filters have no exact
+statistics and are estimated on a page sample, cached for FILTER_TEXT_STATS_TTL_S.
+"""
+import logging
+import math
+import time
+
+from app.adapters import repository, term_index
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TERM_FILTERS = {
+    'keywords_any': 'keywords',
+    'keywords_all': 'keywords',
+    'skills_any': 'skills',
+    'skills_all': 'skills',
+}
+TEXT_FILTERS = {
+    'name_contains': 'name',
+    'introduce_contains': 'introduce',
+    'cards_contains': 'cards',
+}
+
+_MAX_CACHED_TEXT_TERMS = 4096
+# (column, term) -> (selectivity, expires_at)
+_text_selectivity: dict[tuple[str, str], tuple[float, float]] = {}
+
+
+class FilterPlan:
+    """Rewritten filters, IDF weights for build_match_count_expr, and what was dropped."""
+
+    def __init__(self, search_filters: dict, term_weights: dict | None = None, dropped: list | None = None):
+        self.search_filters = search_filters
+        self.term_weights = term_weights or {}
+        self.dropped = dropped or []
+
+
+def idf(df: int, total: int) -> float:
+    """BM25-style inverse document frequency (always positive)."""
+    return math.log(1 + (total - df + 0.5) / (df + 0.5))
+
+
+async def _term_frequencies(pairs: list[tuple[str, str]]) -> tuple[dict[tuple[str, str], int], int]:
+    index = term_index.get_index()
+    if term_index.is_warm():
+        return {pair: index.document_frequency(*pair) for pair in pairs}, len(index)
+    frequencies, total = await repository.term_stats(pairs)
+    return {pair: frequencies.get(pair, 0) for pair in pairs}, total
+
+
+async def _text_selectivities(pairs: list[tuple[str, str]], total: int) -> dict[tuple[str, str], float]:
+    now = time.monotonic()
+    selectivities = {}
+    missing = []
+    for pair in pairs:
+        cached = _text_selectivity.get(pair)
+        if cached is not None and cached[1] > now:
+            selectivities[pair] = cached[0]
+        else:
+            missing.append(pair)
+    if missing and total > 0:
+        percent = min(100.0, 100.0 * settings.FILTER_SAMPLE_ROWS / total)
+        sampled = await repository.sample_text_terms(missing, percent)
+        if len(_text_selectivity) + len(missing) > _MAX_CACHED_TEXT_TERMS:
+            _text_selectivity.clear()
+        expires_at = now + settings.FILTER_TEXT_STATS_TTL_S
+        for pair in missing:
+            hits, rows = sampled.get(pair, (0, 0))
+            if rows == 0:
+                continue
+            selectivities[pair] = hits / rows
+            _text_selectivity[pair] = (selectivities[pair], expires_at)
+    return selectivities
+
+
+async def plan_filters(search_filters: dict, expanded: dict[str, list[str]] | None = None) -> FilterPlan:
+    """
+    Rewrites `search_filters` (a SearchFilters dict without None values) by term selectivity.
+    `expanded` lists, per field, the terms added by term_graph.expand_filters.
+    """
+    term_pairs = list(dict.fromkeys(
+        (field, term) for key, field in TERM_FILTERS.items() for term in search_filters.get(key) or []
+    ))
+    frequencies, total = await _term_frequencies(term_pairs)
+    if total == 0:
+        return FilterPlan(search_filters)
+
+    text_pairs = list(dict.fromkeys(
+        (column, term) for key, column in TEXT_FILTERS.items() for term in search_filters.get(key) or []
+    ))
+    text_selectivities = await _text_selectivities(text_pairs, total)
+
+    def selectivity(key: str, term: str) -> float | None:
+        if key in TERM_FILTERS:
+            return frequencies[(TERM_FILTERS[key], term)] / total
+        return text_selectivities.get((TEXT_FILTERS[key], term))
+
+    dropped = []
+    planned = {}
+    for key, terms in search_filters.items():
+        if key not in TERM_FILTERS and key not in TEXT_FILTERS:
+            planned[key] = terms
+            continue
+        terms = list(dict.fromkeys(terms))
+        if key.endswith('_all'):
+            # One unknown term and the group can never match
+            if any(selectivity(key, term) == 0 for term in terms):
+                dropped.extend((key, term) for term in terms)
+                continue
+        elif key in TERM_FILTERS:
+            dropped.extend((key, term) for term in terms if selectivity(key, term) == 0)
+            terms = [term for term in terms if selectivity(key, term) > 0]
+        if terms:
+            planned[key] = terms
+
+    # Generic OR'd terms only go when something more selective is left to match on
+    threshold = settings.FILTER_MAX_TERM_SELECTIVITY
+    or_terms = [(key, term) for key, terms in planned.items() if not key.endswith('_all') for term in terms]
+    generic = {(key, term) for key, term in or_terms if (selectivity(key, term) or 0.0) > threshold}
+    if generic and (len(generic) < len(or_terms) or any(key.endswith('_all') for key in planned)):
+        for key in {key for key, _ in generic}:
+            planned[key] = [term for term in planned[key] if (key, term) not in generic]
+            if not planned[key]:
+                del planned[key]
+        dropped.extend(sorted(generic))
+
+    # _all: rarest first (smallest intersection first), OR'd lists: most frequent first
+    # (ILIKE ANY stops at the first hit)
+    for key, terms in planned.items():
+        if key in TERM_FILTERS or key in TEXT_FILTERS:
+            rarest_first = key.endswith('_all')
+            planned[key] = sorted(terms, key=lambda term: selectivity(key, term) or 0.0, reverse=not rarest_first)
+
+    term_weights = {}
+    for key in ('keywords_any', 'skills_any'):
+        field = TERM_FILTERS[key]
+        expansions = set((expanded or {}).get(field) or ())
+        for term in planned.get(key) or []:
+            weight = idf(frequencies[(field, term)], total)
+            if term in expansions:
+                weight *= settings.TERM_EXPANSION_WEIGHT
+            term_weights.setdefault(field, {})[term] = weight
+
+    if dropped:
+        logger.info(f"   → Filter planner: {len(dropped)}개 term 제외 {dropped}")
+    return FilterPlan(planned, term_weights, dropped)
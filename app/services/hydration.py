@@ -0,0 +1,64 @@
+"""
+Request-scoped hydration of candidate rows.
+
+Retrieval stages return only ids and scores. The search route then loads each
+candidate it needs exactly once into a CandidateMap, and the judge and the
+response builder both read the same dicts from it.
+"""
+import logging
+from typing import Any, Dict, Iterable, List
+
+from app.adapters import repository
+
+logger = logging.getLogger(__name__)
+
+
+def _jsonb_list(value) -> list:
+    # JSONB is decoded by the pool's codec (see pg._init_connection)
+    return value if isinstance(value, list) else []
+
+
+def _candidate_from_row(row) -> Dict[str, Any]:
+    return {
+        "id": row['id'],
+        "name": row.get('name', ''),
+        "description": row.get('introduce'),
+        "keywords": _jsonb_list(row.get('keywords')),
+        "skills": _jsonb_list(row.get('skills')),
+        "cards": _jsonb_list(row.get('cards')),
+        "email": row.get('email'),
+        "created_at": row.get('created_at').isoformat() if row.get('created_at') else None,
+    }
+
+
+class CandidateMap:
+    """Identity map of candidate id -> candidate dict for one request."""
+
+    def __init__(self):
+        self._candidates: Dict[int, Dict[str, Any]] = {}
+        self.queries = 0
+
+    def __contains__(self, candidate_id: int) -> bool:
+        return candidate_id in self._candidates
+
+    def __len__(self) -> int:
+        return len(self._candidates)
+
+    def get(self, candidate_id: int, default=None):
+        return self._candidates.get(candidate_id, default)
+
+    async def load(self, candidate_ids: Iterable[int]) -> List[Dict[str, Any]]:
+        """
+        Fetches the ids not loaded yet in one query and returns the candidates in
+        the given order (ids that no longer exist are skipped).
+        """
+        candidate_ids = [int(candidate_id) for candidate_id in candidate_ids]
+        missing = [candidate_id for candidate_id in dict.fromkeys(candidate_ids) if candidate_id not in self._candidates]
+        if missing:
+            rows = await repository.candidates_by_ids(missing)
+            self.queries += 1
+            for row in rows:
+                self._candidates[row['id']] = _candidate_from_row(row)
+            if len(rows) < len(missing):
+                logger.warning(f"{len(missing) - len(rows)} candidates disappeared before hydration")
+        return [self._candidates[candidate_id] for candidate_id in candidate_ids if candidate_id in self._candidates]
@@ -0,0 +1,210 @@
+"""
+Bulk ingestion of candidate profiles in the app/data/professor_record/*.md.json format.
+
+Files are parsed into COPY text rows by a process pool (the next batch is parsed while
+the current one is copied), streamed with COPY into a temporary staging table, and merged into
+candidates by one INSERT ... ON CONFLICT (email) statement:
+- new emails are inserted
+- existing rows are updated only when a profile field changed; they keep their vector
+  until the embedding job (candidates.generate_vectors_for_candidates) sees the new
+  content hash and re-embeds them
+- unchanged rows are left alone (no dead tuples, no change notifications)
+- the optional "location" (used by the location_any_of hard constraint) is only
+  overwritten by profiles that have one
+When several files share an email, the last one in path order wins. The whole load is
+one transaction: a failing merge leaves candidates untouched.
+
+A file holds one profile object or a list of them. A file that cannot be read or has
+an invalid profile is skipped and reported; it does not abort the load.
+"""
+import asyncio
+import io
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import orjson
+
+from app.adapters import pg
+
+logger = logging.getLogger(__name__)
+
+STAGING_COLUMNS = ("file_seq", "pos", "name", "email", "introduce", "keywords", "skills", "cards", "location")
+
+_CREATE_STAGING = """
+CREATE TEMP TABLE candidates_staging (
+  file_seq BIGINT NOT NULL,
+  pos INT NOT NULL,
+  name TEXT NOT NULL,
+  email TEXT NOT NULL,
+  introduce TEXT,
+  keywords JSONB,
+  skills JSONB,
+  cards JSONB,
+  location TEXT
+) ON COMMIT DROP
+"""
+
+_UPSERT = """
+WITH upserted AS (
+  INSERT INTO candidates (name, email, introduce, keywords, skills, cards, location)
+  SELECT DISTINCT ON (email) name, email, introduce, keywords, skills, cards, location
+  FROM candidates_staging
+  ORDER BY email, file_seq DESC, pos DESC
+  ON CONFLICT (email) DO UPDATE SET
+    name = EXCLUDED.name,
+    introduce = EXCLUDED.introduce,
+    keywords = EXCLUDED.keywords,
+    skills = EXCLUDED.skills,
+    cards = EXCLUDED.cards,
+    location = COALESCE(EXCLUDED.location, candidates.location)
+  WHERE (candidates.name, candidates.introduce, candidates.keywords, candidates.skills, candidates.cards, candidates.location)
+    IS DISTINCT FROM (EXCLUDED.name, EXCLUDED.introduce, EXCLUDED.keywords, EXCLUDED.skills, EXCLUDED.cards,
+                      COALESCE(EXCLUDED.location, candidates.location))
+  RETURNING (xmax = 0) AS inserted
+)
+SELECT count(*) FILTER (WHERE inserted) AS inserted, count(*) FILTER (WHERE NOT inserted) AS updated
+FROM upserted
+"""
+
+
+def _terms(record: dict, field: str) -> list[str]:
+    terms = record.get(field) or []
+    if not isinstance(terms, list) or not all(isinstance(term, str) for term in terms):
+        raise ValueError(f"{field} must be a list of strings")
+    return list(dict.fromkeys(term.strip() for term in terms if term.strip()))
+
+
+def _profile_row(record) -> tuple:
+    """(name, email, introduce, keywords, skills, cards, location) of one validated profile."""
+    if not isinstance(record, dict):
+        raise ValueError("profile must be a JSON object")
+    name, email, introduce = record.get("name"), record.get("email"), record.get("introduce")
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("name is missing")
+    if not isinstance(email, str) or "@" not in email:
+        raise ValueError(f"invalid email: {email!r}")
+    if introduce is not None and not isinstance(introduce, str):
+        raise ValueError("introduce must be a string")
+    cards = record.get("cards") or []
+    if not isinstance(cards, list):
+        raise ValueError("cards must be a list")
+    location = record.get("location")
+    if location is not None and not isinstance(location, str):
+        raise ValueError("location must be a string")
+    return (
+        name.strip(), email.strip(), introduce, _terms(record, "keywords"), _terms(record, "skills"), cards,
+        (location or "").strip() or None,
+    )
+
+
+def _copy_text(value) -> str:
+    """One field in COPY text format: strings as is, lists/objects as JSON, None as \\N."""
+    if value is None:
+        return "\\N"
+    text = value if isinstance(value, str) else orjson.dumps(value).decode()
+    if "\x00" in text or "\\u0000" in text:
+        # Neither text nor jsonb can store NUL, and one bad row would fail the whole COPY
+        raise ValueError("profile contains a NUL character")
+    # str.replace is far faster than str.translate on long card texts
+    return text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def parse_profile_file(file_seq: int, path: str) -> tuple[bytes, int, str | None]:
+    """
+    COPY text rows (STAGING_COLUMNS) for the profiles of one file and their count,
+    or (b"", 0, error) when the file is unreadable or invalid. Rows are formatted in
+    the worker process so that only bytes travel back to the loader.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = orjson.loads(f.read())
+        profiles = data if isinstance(data, list) else [data]
+        lines = []
+        for pos, profile in enumerate(profiles):
+            fields = (str(file_seq), str(pos), *_profile_row(profile))
+            lines.append("\t".join(map(_copy_text, fields)))
+        return ("\n".join(lines) + "\n").encode("utf-8") if lines else b"", len(lines), None
+    except Exception as e:
+        return b"", 0, f"{type(e).__name__}: {e}"
+
+
+def profile_files(paths: list[str | Path]) -> list[Path]:
+    """Expands directories to their *.json files; files are kept as given."""
+    files = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.glob("*.json")) if path.is_dir() else [path])
+    return files
+
+
+async def ingest_profiles(files: list[Path], batch_size: int = 5000, workers: int | None = None) -> dict:
+    """Loads `files` into candidates and returns counts, throughput and per-file errors."""
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    batches = [files[i:i + batch_size] for i in range(0, len(files), batch_size)]
+    loop = asyncio.get_running_loop()
+    errors = []
+    staged = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        def parse(first: int, batch: list[Path]) -> list[tuple[bytes, int, str | None]]:
+            chunksize = max(1, len(batch) // (workers * 4))
+            return list(executor.map(
+                parse_profile_file, range(first, first + len(batch)), map(str, batch), chunksize=chunksize
+            ))
+
+        # A standalone connection: a large load outlives the timeouts of pooled connections
+        connection = await pg.open_connection()
+        try:
+            async with connection.transaction():
+                await connection.execute(_CREATE_STAGING)
+                pending = loop.run_in_executor(None, parse, 0, batches[0]) if batches else None
+                for i, batch in enumerate(batches):
+                    parsed = await pending
+                    # Parse the next batch while this one is copied
+                    if i + 1 < len(batches):
+                        pending = loop.run_in_executor(None, parse, (i + 1) * batch_size, batches[i + 1])
+                    chunks = []
+                    for path, (rows, count, error) in zip(batch, parsed):
+                        if error:
+                            errors.append({"file": str(path), "error": error})
+                            continue
+                        chunks.append(rows)
+                        staged += count
+                    if chunks:
+                        await connection.copy_to_table(
+                            "candidates_staging", source=io.BytesIO(b"".join(chunks)),
+                            columns=STAGING_COLUMNS, format="text",
+                        )
+                    elapsed = time.perf_counter() - started
+                    logger.info(f"   → staged {staged:,} profiles ({staged / elapsed:,.0f} rows/s), {len(errors)} file errors")
+
+                distinct = await connection.fetchval("SELECT count(DISTINCT email) FROM candidates_staging")
+                merged = await connection.fetchrow(_UPSERT)
+
+            if merged['inserted'] or merged['updated']:
+                await connection.execute("ANALYZE candidates")
+        finally:
+            await connection.close()
+
+    elapsed = time.perf_counter() - started
+    report = {
+        "files": len(files),
+        "failed_files": len(errors),
+        "profiles": staged,
+        "duplicate_emails": staged - distinct,
+        "inserted": merged['inserted'],
+        "updated": merged['updated'],
+        "unchanged": distinct - merged['inserted'] - merged['updated'],
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(staged / elapsed) if elapsed > 0 else None,
+        "errors": errors,
+    }
+    logger.info(
+        f"Ingested {staged:,} profiles from {len(files):,} files in {elapsed:.2f}s: "
+        f"{report['inserted']} inserted, {report['updated']} updated, {report['unchanged']} unchanged, "
+        f"{len(errors)} failed files"
+    )
+    return report
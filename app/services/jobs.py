@@ -0,0 +1,264 @@
+"""
+Persistent background jobs (the jobs table, see app.db_init).
+
+A job is enqueued as a row and run by the worker loop of whichever instance claims it
+first. Claiming takes a session-level advisory lock on the job id over a dedicated
+connection, held until the job ends: two machines never run the same job, and when an
+instance dies its connection, and with it the lock, goes away, so a worker on another
+(or the restarted) instance resumes the still-'running' job from its checkpoint.
+
+Handlers get a JobContext and report progress counters plus a checkpoint after each
+unit of work; both are persisted with a heartbeat. Only one job per kind can be queued,
+so enqueueing again returns the queued job; one more may queue behind a running job of
+the same kind and is claimed once that job ends.
+
+With EMBED_ON_INSERT, candidate inserts seen on the change feed (app.adapters.changes)
+queue a "vectorize" job, so new profiles become searchable without a manual trigger.
+"""
+import asyncio
+import logging
+import os
+import socket
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+
+from app.adapters import changes, pg
+from app.core.config import settings
+from app.services import candidates, embedding_versions
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+# First key of the two-key advisory locks taken on job ids
+_LOCK_CLASS = 0x6A6F62
+
+WORKER_ID = f"{os.getenv('FLY_MACHINE_ID') or socket.gethostname()}:{os.getpid()}"
+
+
+class JobContext:
+    """What a handler sees of its job: params, the last checkpoint and progress, and reporting."""
+
+    def __init__(self, job: dict, lock_connection):
+        self.id = job['id']
+        self.params = job['params'] or {}
+        self.checkpoint = job['checkpoint'] or {}
+        self.progress = job['progress'] or {}
+        self.total = job['total']
+        self._lock_connection = lock_connection
+
+    async def set_total(self, total: int) -> None:
+        self.total = total
+        await pg.execute_query("UPDATE jobs SET total = $2 WHERE id = $1", self.id, total)
+
+    async def report(self, processed: int, counters: dict | None = None, checkpoint: dict | None = None) -> None:
+        """Persists progress (and the resume point) with a heartbeat."""
+        if self._lock_connection.is_closed():
+            # Another worker may already have claimed the job
+            raise RuntimeError(f"Lost the advisory lock of job {self.id}")
+        self.progress = {**(counters or {}), "processed": processed}
+        if checkpoint is not None:
+            self.checkpoint = checkpoint
+        await pg.execute_query(
+            "UPDATE jobs SET progress = $2, checkpoint = $3, heartbeat_at = now() WHERE id = $1",
+            self.id, self.progress, self.checkpoint,
+        )
+
+
+HANDLERS: dict[str, Callable[[JobContext], Awaitable[None]]] = {
+    "vectorize": candidates.run_vectorize_job,
+    "embedding_backfill": embedding_versions.run_backfill_job,
+}
+
+
+def describe(job: dict) -> dict:
+    """Job row plus elapsed time, throughput (processed / s) and ETA."""
+    job = dict(job)
+    processed = (job.get('progress') or {}).get("processed", 0)
+    elapsed = None
+    if job.get('started_at'):
+        end = job.get('finished_at') or datetime.now(timezone.utc)
+        elapsed = (end - job['started_at']).total_seconds()
+    rate = processed / elapsed if elapsed and processed else None
+    eta = None
+    if rate and job['status'] == "running" and job.get('total') is not None:
+        eta = max(job['total'] - processed, 0) / rate
+    job.update(
+        elapsed_s=round(elapsed, 3) if elapsed is not None else None,
+        rows_per_second=round(rate, 2) if rate else None,
+        eta_s=round(eta, 1) if eta is not None else None,
+    )
+    return job
+
+
+async def enqueue(kind: str, params: dict | None = None) -> dict:
+    """Queues a job of `kind`, or returns the one already queued."""
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind} (expected one of {list(HANDLERS)})")
+    rows = await pg.execute_query(
+        """
+        INSERT INTO jobs (kind, params) VALUES ($1, $2)
+        ON CONFLICT (kind) WHERE status = 'queued' DO NOTHING
+        RETURNING *
+        """,
+        kind, params or {},
+    )
+    if not rows:
+        # The queued job, or the running job it became after the INSERT conflicted
+        rows = await pg.execute_query(
+            """
+            SELECT * FROM jobs WHERE kind = $1 AND status = ANY($2::text[])
+            ORDER BY status = 'queued' DESC, id DESC LIMIT 1
+            """,
+            kind, list(ACTIVE_STATUSES),
+        )
+    else:
+        logger.info(f"Job {rows[0]['id']} ({kind}) queued")
+        _wakeup.set()
+    return describe(rows[0])
+
+
+async def get_job(job_id: int) -> dict | None:
+    rows = await pg.execute_query("SELECT * FROM jobs WHERE id = $1", job_id)
+    return describe(rows[0]) if rows else None
+
+
+async def list_jobs(limit: int = 20, kind: str | None = None) -> list[dict]:
+    rows = await pg.execute_query(
+        "SELECT * FROM jobs WHERE $1::text IS NULL OR kind = $1 ORDER BY id DESC LIMIT $2", kind, limit
+    )
+    return [describe(row) for row in rows]
+
+
+async def _claim(connection) -> dict | None:
+    """Locks and marks running the oldest active job no live worker holds, one per kind."""
+    active = await pg.execute_query(
+        "SELECT id, kind, status FROM jobs WHERE status = ANY($1::text[]) ORDER BY id", list(ACTIVE_STATUSES)
+    )
+    # Kinds with a job some live worker is running: the job queued behind it waits
+    busy = set()
+    for row in active:
+        if row['kind'] in busy:
+            continue
+        if not await connection.fetchval("SELECT pg_try_advisory_lock($1::int, $2::int)", _LOCK_CLASS, row['id']):
+            busy.add(row['kind'])
+            continue
+        # Re-checked under the lock: the previous holder may have finished it meanwhile
+        job = await connection.fetchrow(
+            """
+            UPDATE jobs
+            SET status = 'running', worker = $2, attempts = attempts + 1,
+                started_at = COALESCE(started_at, now()), heartbeat_at = now()
+            WHERE id = $1 AND status = ANY($3::text[])
+            RETURNING *
+            """,
+            row['id'], WORKER_ID, list(ACTIVE_STATUSES),
+        )
+        if job is not None and job['attempts'] > settings.JOBS_MAX_ATTEMPTS:
+            # Runs that ended without a clean shutdown: most likely the job itself kills
+            # the worker process; stop resuming it
+            await pg.execute_query(
+                "UPDATE jobs SET status = 'failed', error = $2, finished_at = now() WHERE id = $1",
+                job['id'], f"Gave up after {settings.JOBS_MAX_ATTEMPTS} attempts",
+            )
+            job = None
+        if job is not None:
+            return dict(job)
+        await connection.execute("SELECT pg_advisory_unlock($1::int, $2::int)", _LOCK_CLASS, row['id'])
+    return None
+
+
+async def _run(job: dict, lock_connection) -> None:
+    resumed = f" (resuming at {job['checkpoint']})" if job['checkpoint'] else ""
+    logger.info(f"Job {job['id']} ({job['kind']}) started on {WORKER_ID}{resumed}")
+    context = JobContext(job, lock_connection)
+    try:
+        await HANDLERS[job['kind']](context)
+    except asyncio.CancelledError:
+        # Shutdown: the job stays 'running' and is resumed once the lock is released.
+        # attempts counts crashes, so a clean stop (e.g. an idle machine auto-stopped) does not use one up
+        if not lock_connection.is_closed():
+            try:
+                await lock_connection.execute("UPDATE jobs SET attempts = attempts - 1 WHERE id = $1", job['id'])
+            except Exception as e:
+                logger.warning(f"Could not give back the attempt of interrupted job {job['id']}: {e}")
+        logger.info(f"Job {job['id']} interrupted, it resumes from its last checkpoint")
+        raise
+    except Exception as e:
+        logger.error(f"Job {job['id']} ({job['kind']}) failed: {e}")
+        await pg.execute_query(
+            "UPDATE jobs SET status = 'failed', error = $2, finished_at = now(), heartbeat_at = now() WHERE id = $1",
+            job['id'], f"{type(e).__name__}: {e}",
+        )
+        return
+    await pg.execute_query(
+        "UPDATE jobs SET status = 'succeeded', error = NULL, finished_at = now(), heartbeat_at = now() WHERE id = $1",
+        job['id'],
+    )
+    logger.info(f"Job {job['id']} ({job['kind']}) succeeded: {context.progress}")
+
+
+async def run_next() -> bool:
+    """Claims and runs one job; False when there was none to claim."""
+    # Cheap check through the pool before opening a lock connection
+    if not await pg.fetch_val("SELECT EXISTS (SELECT 1 FROM jobs WHERE status = ANY($1::text[]))", list(ACTIVE_STATUSES)):
+        return False
+    connection = await pg.open_connection()
+    try:
+        job = await _claim(connection)
+        if job is None:
+            return False
+        await _run(job, connection)
+        return True
+    finally:
+        # Closing the session releases the advisory lock
+        await connection.close()
+
+
+_worker_task: asyncio.Task | None = None
+_wakeup = asyncio.Event()
+
+
+async def _worker_loop() -> None:
+    while True:
+        try:
+            ran = await run_next()
+        except Exception as e:
+            logger.error(f"Job worker error: {e}")
+            ran = False
+        if not ran:
+            try:
+                await asyncio.wait_for(_wakeup.wait(), settings.JOBS_POLL_INTERVAL_S)
+            except asyncio.TimeoutError:
+                pass
+            _wakeup.clear()
+
+
+async def _enqueue_embeddings(batch: changes.ChangeBatch) -> None:
+    """Change feed subscriber: inserted candidates queue a "vectorize" job."""
+    # Inserts only: the vectorize job's own writes are updates
+    if batch.inserted:
+        await enqueue("vectorize")
+
+
+def start() -> None:
+    """Starts this instance's job worker (one job at a time)."""
+    global _worker_task
+    if settings.EMBED_ON_INSERT:
+        changes.subscribe(_enqueue_embeddings)
+    if not settings.JOBS_WORKER_ENABLED:
+        return
+    if _worker_task is None or _worker_task.done():
+        _worker_task = asyncio.create_task(_worker_loop())
+        logger.info(f"Job worker {WORKER_ID} started")
+
+
+async def stop() -> None:
+    global _worker_task
+    changes.unsubscribe(_enqueue_embeddings)
+    if _worker_task is not None:
+        _worker_task.cancel()
+        try:
+            await _worker_task
+        except asyncio.CancelledError:
+            pass
+        _worker_task = None
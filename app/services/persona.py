@@ -3,6 +3,7 @@ import logging
 from app.adapters.gemini import gemini_flash_json
 from app.schemas.search import SearchRequest
 from app.schemas.persona import PersonaResponse, Persona
+from app.services import term_graph
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +18,28 @@ async def build_persona(req: SearchRequest) -> PersonaResponse:
     if req.org_context:
         logger.info(f"🏢 조직 컨텍스트: {req.org_context}")
     
+    # With the co-occurrence graph, related terms are added at retrieval time
+    # (term_graph.expand_filters) and translations by canonicalize, so the prompt
+    # only asks for the core terms and the response is much shorter
+    if term_graph.is_available():
+        term_guidance = """- List only the CORE terms of the request: at most 3 per list, in one language
+- Do NOT add synonyms, translations or related terms (they are added automatically)
+- Keep terms specific and searchable (avoid generic terms)"""
+        example_filters = """{
+    "keywords_any": ["Machine Learning", "Computer Vision"],
+    "skills_any": ["Deep Learning"],
+    "introduce_contains": ["AI"]
+  }"""
+    else:
+        term_guidance = """- Extract Korean AND English terms (candidates have both)
+- Keep terms specific and searchable (avoid generic terms)
+- **search_filters is the PRIMARY method** - generate comprehensive filters"""
+        example_filters = """{
+    "keywords_any": ["AI", "인공지능", "Artificial Intelligence", "Machine Learning", "머신러닝", "Deep Learning", "딥러닝", "Computer Vision"],
+    "skills_any": ["Python", "TensorFlow", "Deep Learning", "딥러닝"],
+    "introduce_contains": ["AI", "인공지능", "연구", "research", "머신러닝"]
+  }"""
+    
     # Prompt: Generate persona with structured SQL filters for precise matching
     prompt = f"""You are a talent search assistant. Transform the user's natural language query into a structured "persona" that will generate precise SQL WHERE conditions for database search.
 
@@ -85,10 +108,12 @@ cards: JSONB array of objects
 5. **query_text**: Simplified version for vector embedding (optional)
 
 **Important Guidelines:**
-- Extract Korean AND English terms (candidates have both)
-- Keep terms specific and searchable (avoid generic terms)
-- **search_filters is the PRIMARY method** - generate comprehensive filters
+{term_guidance}
 - **query_text** is optional (for legacy vector search, can be simplified)
+- **constraints_hard** is enforced as a strict filter (candidates failing it are never returned):
+  - must_have: only terms the user explicitly requires; each must be an exact candidates.keywords/skills term
+  - location_any_of: only when the user states a location; otherwise leave it null
+  - Everything else belongs in search_filters / constraints_soft, not here
 - If org_context provided, incorporate into org_context fields
 
 **JSON Schema to follow:**
@@ -107,11 +132,7 @@ cards: JSONB array of objects
   "seniority": ["senior", "expert"],
   "outcomes": ["AI research", "model development", "publications"],
   "query_text": "AI Expert AI 전문가 Machine Learning Deep Learning Python TensorFlow",
-  "search_filters": {{
-    "keywords_any": ["AI", "인공지능", "Artificial Intelligence", "Machine Learning", "머신러닝", "Deep Learning", "딥러닝", "Computer Vision"],
-    "skills_any": ["Python", "TensorFlow", "Deep Learning", "딥러닝"],
-    "introduce_contains": ["AI", "인공지능", "연구", "research", "머신러닝"]
-  }}
+  "search_filters": {example_filters}
 }}
 
 **Note:** The query_text format must EXACTLY match how candidate vectors are structured for optimal vector similarity search.
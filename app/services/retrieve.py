@@ -1,11 +1,16 @@
 
-from app.adapters import gemini, pgvector, pg
-from app.utils import scoring, mmr
+from app.adapters import gemini, pg, pgvector
+from app.adapters.vector_backend import get_vector_backend
+from app.core.config import settings
+from app.services import canonicalize, filter_planner, term_graph
+from app.utils import mmr, rrf
 import logging
 
 logger = logging.getLogger(__name__)
 
-async def hybrid_retrieve(persona: dict, use_vector_search: bool = False) -> list[dict]:
+RESULT_K = 12
+
+async def hybrid_retrieve(persona: dict, use_vector_search: bool = False, mode: str = "balanced") -> list[dict]:
     """
     NEW APPROACH: Structured SQL search using LLM-generated WHERE conditions.
     
@@ -15,6 +20,10 @@ async def hybrid_retrieve(persona: dict, use_vector_search: bool = False) -> lis
     Args:
         persona: Persona dictionary containing search_filters
         use_vector_search: If True, also perform vector search and blend (legacy mode)
+        mode: SearchRequest.mode, selects the MMR diversity weight (settings.MMR_LAMBDA)
+    
+    Returns ids and scores only; candidate rows are hydrated by the caller
+    (see app.services.hydration.CandidateMap).
     """
     logger.info("=" * 60)
     logger.info("2️⃣ Structured Search 시작 (LLM 생성 SQL 조건)")
@@ -39,12 +48,54 @@ async def hybrid_retrieve(persona: dict, use_vector_search: bool = False) -> lis
         logger.warning("⚠️  search_filters is empty, returning empty results")
         return []
     
+    if settings.TERM_CANONICALIZATION_ENABLED:
+        try:
+            search_filters = await canonicalize.canonicalize_filters(search_filters)
+        except Exception as e:
+            logger.warning(f"   ⚠️  Term canonicalization 실패, 원본 terms 사용: {e}")
+    
+    expanded_terms = {}
+    if term_graph.is_available():
+        search_filters, expanded_terms = term_graph.expand_filters(search_filters)
+    
+    term_weights = None
+    if settings.FILTER_PLANNER_ENABLED:
+        try:
+            plan = await filter_planner.plan_filters(search_filters, expanded_terms)
+            search_filters, term_weights = plan.search_filters, plan.term_weights
+        except Exception as e:
+            logger.warning(f"   ⚠️  Filter planner 실패, 원본 filters 사용: {e}")
+    
+    # Hard constraints are enforced in every retrieval stage, not re-ranked afterwards
+    hard_constraints = persona_data.get("constraints_hard") or {}
+    if hasattr(hard_constraints, 'model_dump'):
+        hard_constraints = hard_constraints.model_dump()
+    hard_constraints = {k: v for k, v in hard_constraints.items() if v}
+    if hard_constraints.get("must_have") and settings.TERM_CANONICALIZATION_ENABLED:
+        # A spelling variant of a must-have term would otherwise filter out every candidate
+        try:
+            hard_constraints["must_have"] = await canonicalize.canonicalize_must_have(hard_constraints["must_have"])
+        except Exception as e:
+            logger.warning(f"   ⚠️  Must-have canonicalization 실패, 원본 terms 사용: {e}")
+    if hard_constraints:
+        logger.info(f"   → Hard constraints: {hard_constraints}")
+    
+    if settings.RETRIEVAL_MODE == "sql":
+        # MMR needs a candidate pool; without diversification only the final page is fetched
+        pool_k = settings.MMR_POOL_SIZE if _mmr_lambda(mode) < 1.0 else RESULT_K
+        results = await _sql_hybrid_retrieve(
+            search_filters, persona_data, use_vector_search, hard_constraints, term_weights, pool_k
+        )
+        return await _diversify(results, mode)
+    
     logger.info("🔍 [Step 1] Structured SQL Search 실행 중...")
     logger.info(f"   → Filters: {list(search_filters.keys())}")
     
     try:
         # Use structured_search with LLM-generated filters
-        results = await pg.structured_search(search_filters, k=30)
+        results = await pg.structured_search(
+            search_filters, k=30, ids_only=True, hard_constraints=hard_constraints, term_weights=term_weights
+        )
         logger.info(f"   ✅ Structured search 완료: {len(results)}개 결과")
         
         if results:
@@ -58,25 +109,101 @@ async def hybrid_retrieve(persona: dict, use_vector_search: bool = False) -> lis
             if query_text:
                 try:
                     query_vector = await gemini.embed_query(query_text)
-                    vec_results = await pgvector.vector_topk(query_vector, k=20)
+                    vec_results = await get_vector_backend().filtered_vector_topk(
+                        query_vector, 20, search_filters, hard_constraints=hard_constraints
+                    )
                     
                     if vec_results:
                         logger.info(f"   ✅ Vector search 보조 결과: {len(vec_results)}개")
-                        # Blend with structured results using RRF
-                        blended = scoring.rrf_fusion(results, vec_results, k=60)
-                        results = blended
+                        # Blend with structured results using RRF (ids and fused scores only)
+                        fused = rrf.rrf({"structured": results, "vector": vec_results}, k=60)
+                        results = [{"id": doc_id, "score": score} for doc_id, score in fused]
                         logger.info(f"   ✅ RRF Blended 완료: {len(results)}개")
                 except Exception as e:
                     logger.warning(f"   ⚠️  Vector search 실패, structured results만 사용: {e}")
         
+        results = await _diversify(results, mode)
         logger.info("=" * 60)
-        return results[:12]  # Return top 12
+        return results
         
     except Exception as e:
         logger.error(f"   ❌ Structured search 실패: {e}", exc_info=True)
         return []
 
 
+async def _sql_hybrid_retrieve(
+    search_filters: dict,
+    persona_data: dict,
+    use_vector_search: bool,
+    hard_constraints: dict | None = None,
+    term_weights: dict | None = None,
+    k: int = RESULT_K,
+) -> list[dict]:
+    """
+    Structured, vector and full-text ranking fused with RRF in one SQL statement.
+    Returns ids and fused scores only; callers load candidate details by id.
+    """
+    logger.info("🔍 Single-statement Hybrid Search 실행 중 (in-database RRF)...")
+    logger.info(f"   → Filters: {list(search_filters.keys())}")
+    
+    query_text = persona_data.get("query_text", "")
+    query_vector = None
+    if use_vector_search and query_text:
+        try:
+            query_vector = await gemini.embed_query(query_text)
+        except Exception as e:
+            logger.warning(f"   ⚠️  Query embedding 실패, structured ranking만 사용: {e}")
+    
+    try:
+        results = await pgvector.hybrid_topk(
+            search_filters,
+            vector=query_vector,
+            fulltext_query=query_text if settings.RETRIEVAL_FULLTEXT and query_text else None,
+            k=k,
+            hard_constraints=hard_constraints,
+            term_weights=term_weights,
+        )
+    except Exception as e:
+        logger.error(f"   ❌ Hybrid SQL search 실패: {e}", exc_info=True)
+        return []
+    
+    logger.info(f"   ✅ Hybrid SQL search 완료: {len(results)}개 결과")
+    if results:
+        top_scores = [f"{r['score']:.4f}" for r in results[:3]]
+        logger.info(f"   📊 상위 3개 RRF 점수: {top_scores}")
+    logger.info("=" * 60)
+    return results
+
+
+def _mmr_lambda(mode: str) -> float:
+    """MMR relevance weight of `mode`; 1.0 means no diversification."""
+    return settings.MMR_LAMBDA.get(mode, 1.0)
+
+
+async def _diversify(results: list[dict], mode: str, k: int = RESULT_K) -> list[dict]:
+    """
+    MMR over the top fused results, using the stored candidate vectors.
+    Candidates without a vector fill any remaining slots in relevance order.
+    """
+    lambda_val = _mmr_lambda(mode)
+    if lambda_val >= 1.0 or len(results) <= k:
+        return results[:k]
+    
+    pool = results[:settings.MMR_POOL_SIZE]
+    try:
+        vectors = await get_vector_backend().retrieve_vectors([r['id'] for r in pool])
+    except Exception as e:
+        logger.warning(f"   ⚠️  MMR용 vector 조회 실패, relevance 순서 사용: {e}")
+        return results[:k]
+    
+    diverse = mmr.mmr(pool, vectors, lambda_val, k)
+    if len(diverse) < k:
+        chosen = {r['id'] for r in diverse}
+        diverse += [r for r in pool if r['id'] not in chosen][:k - len(diverse)]
+    logger.info(f"   ✅ MMR 다양화 완료 (mode={mode}, λ={lambda_val}): {len(pool)}개 중 {len(diverse)}개 선택")
+    return diverse
+
+
 async def _legacy_hybrid_retrieve(persona: dict, use_vector_search: bool = True) -> list[dict]:
     """
     Legacy hybrid retrieval method (kept for backward compatibility).
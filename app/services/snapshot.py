@@ -0,0 +1,232 @@
+"""
+On-disk snapshot of the searchable corpus for fast cold starts.
+
+A snapshot directory contains:
+    manifest.json           format version, WAL LSN and updated_at watermark, row counts
+    vectors.npy             float32 (n, dim) row-normalized vectors (loaded with mmap)
+    vector_ids.npy          int64 candidate id per vector row
+    postings.bin            serialized Roaring bitmaps, one per (field, term)
+    terms.json              term dictionaries: field -> term -> [offset, length] into postings.bin
+    candidate_ids.npy       int64 candidate ids (sorted)
+    candidate_created.npy   float64 created_at epoch seconds per candidate
+    candidate_offsets.npy   int64 (n + 1) offsets into candidates.bin
+    candidates.bin          UTF-8 JSON {"keywords": [...], "skills": [...]} per candidate
+
+A new instance maps the files instead of re-reading every row from PostgreSQL, then
+catches up on rows whose updated_at is past the snapshot watermark (see
+vector_memory.refresh_index and term_index.start).
+"""
+import json
+import logging
+import mmap
+import os
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from pyroaring import BitMap
+
+from app.adapters import pg, term_index, vector_memory
+from app.adapters.term_index import TERM_FIELDS, TermIndex
+from app.adapters.vector_memory import VectorMatrix, to_float32
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+
+def _write_json(path: Path, data) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def _write_snapshot(out_dir: Path, vectors: VectorMatrix, terms: TermIndex, lsn: str | None, watermark: datetime | None) -> dict:
+    """Writes the snapshot files for in-memory indexes and swaps them in place of out_dir."""
+    tmp_dir = out_dir.with_name(out_dir.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    np.save(tmp_dir / "vectors.npy", np.ascontiguousarray(vectors.matrix))
+    np.save(tmp_dir / "vector_ids.npy", vectors.id_array())
+
+    dictionary = {}
+    with open(tmp_dir / "postings.bin", "wb") as f:
+        offset = 0
+        for field in TERM_FIELDS:
+            dictionary[field] = {}
+            for term, bitmap in terms.postings()[field].items():
+                data = bitmap.serialize()
+                f.write(data)
+                dictionary[field][term] = [offset, len(data)]
+                offset += len(data)
+    _write_json(tmp_dir / "terms.json", dictionary)
+
+    candidate_ids = np.array(sorted(terms.created_at()), dtype=np.int64)
+    created = np.array([terms.created_at()[candidate_id] for candidate_id in candidate_ids.tolist()], dtype=np.float64)
+    offsets = np.zeros(len(candidate_ids) + 1, dtype=np.int64)
+    with open(tmp_dir / "candidates.bin", "wb") as f:
+        for i, candidate_id in enumerate(candidate_ids.tolist()):
+            doc = terms.doc_terms(candidate_id)
+            data = json.dumps({field: sorted(doc[field]) for field in TERM_FIELDS}, ensure_ascii=False).encode("utf-8")
+            f.write(data)
+            offsets[i + 1] = offsets[i] + len(data)
+    np.save(tmp_dir / "candidate_ids.npy", candidate_ids)
+    np.save(tmp_dir / "candidate_created.npy", created)
+    np.save(tmp_dir / "candidate_offsets.npy", offsets)
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "built_at": datetime.now().astimezone().isoformat(),
+        "lsn": lsn,
+        "watermark": watermark.isoformat() if watermark else None,
+        "dim": settings.VECTOR_DIM,
+        "embedding_model": settings.EMBEDDING_MODEL,
+        "candidates": len(candidate_ids),
+        "vectors": vectors.size,
+    }
+    _write_json(tmp_dir / "manifest.json", manifest)
+
+    if out_dir.exists():
+        old_dir = out_dir.with_name(out_dir.name + ".old")
+        shutil.rmtree(old_dir, ignore_errors=True)
+        os.replace(out_dir, old_dir)
+        os.replace(tmp_dir, out_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+    else:
+        os.replace(tmp_dir, out_dir)
+
+    return manifest
+
+
+async def build_snapshot(out_dir: str | Path) -> dict:
+    """
+    Reads the corpus in one REPEATABLE READ transaction and writes a snapshot.
+    The directory is replaced atomically, so a running instance never sees a partial snapshot.
+    """
+    out_dir = Path(out_dir)
+    started = time.perf_counter()
+
+    # A standalone connection: reading the whole corpus outlives the timeouts of pooled connections
+    connection = await pg.open_connection()
+    try:
+        async with connection.transaction(isolation="repeatable_read", readonly=True):
+            try:
+                lsn = await connection.fetchval("SELECT pg_current_wal_lsn()::text")
+            except Exception:
+                # Read replicas / restricted roles cannot call pg_current_wal_lsn()
+                lsn = None
+            watermark = await connection.fetchval("SELECT max(updated_at) FROM candidates")
+            rows = await connection.fetch(
+                "SELECT id, keywords, skills, created_at, vector FROM candidates ORDER BY id"
+            )
+    finally:
+        await connection.close()
+
+    vectors = VectorMatrix(settings.VECTOR_DIM)
+    terms = TermIndex()
+    with_vector = [row for row in rows if row['vector'] is not None]
+    if with_vector:
+        vectors.upsert([row['id'] for row in with_vector], np.stack([to_float32(row['vector']) for row in with_vector]))
+    for row in rows:
+        terms.add(row['id'], row['keywords'], row['skills'], row['created_at'])
+
+    manifest = _write_snapshot(out_dir, vectors, terms, lsn, watermark)
+    logger.info(
+        f"Snapshot written to {out_dir}: {len(rows)} candidates, {vectors.size} vectors "
+        f"in {time.perf_counter() - started:.2f}s (lsn={lsn})"
+    )
+    return manifest
+
+
+class _CandidateStore:
+    """Random access to per-candidate term lists in the memory-mapped candidates.bin."""
+
+    def __init__(self, snapshot_dir: Path):
+        self._ids = np.load(snapshot_dir / "candidate_ids.npy", mmap_mode="r")
+        self._offsets = np.load(snapshot_dir / "candidate_offsets.npy", mmap_mode="r")
+        with open(snapshot_dir / "candidates.bin", "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+
+    def __call__(self, candidate_id: int) -> dict[str, frozenset[str]] | None:
+        pos = int(np.searchsorted(self._ids, candidate_id))
+        if pos >= len(self._ids) or self._ids[pos] != candidate_id:
+            return None
+        raw = json.loads(bytes(self._data[self._offsets[pos]:self._offsets[pos + 1]]))
+        return {field: frozenset(raw.get(field, [])) for field in TERM_FIELDS}
+
+
+def load_snapshot(snapshot_dir: str | Path) -> tuple[dict, VectorMatrix, TermIndex] | None:
+    """
+    Maps a snapshot into memory. Returns (manifest, vectors, terms) or None if the
+    directory is missing, from another format version or built for another embedding
+    version (dimension or model).
+    """
+    snapshot_dir = Path(snapshot_dir)
+    manifest_path = snapshot_dir / "manifest.json"
+    if not manifest_path.exists():
+        return None
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if (
+        manifest.get("format_version") != FORMAT_VERSION
+        or manifest.get("dim") != settings.VECTOR_DIM
+        or manifest.get("embedding_model", settings.EMBEDDING_MODEL) != settings.EMBEDDING_MODEL
+    ):
+        logger.warning(f"Ignoring incompatible snapshot at {snapshot_dir}: {manifest}")
+        return None
+
+    # Copy-on-write mapping: pages are shared with the page cache until a catch-up update touches them
+    matrix = np.load(snapshot_dir / "vectors.npy", mmap_mode="c")
+    vectors = VectorMatrix.from_arrays(np.load(snapshot_dir / "vector_ids.npy"), matrix)
+
+    with open(snapshot_dir / "terms.json", encoding="utf-8") as f:
+        dictionary = json.load(f)
+    postings = {}
+    with open(snapshot_dir / "postings.bin", "rb") as f:
+        data = f.read()
+    for field in TERM_FIELDS:
+        postings[field] = {
+            term: BitMap.deserialize(data[offset:offset + length])
+            for term, (offset, length) in dictionary.get(field, {}).items()
+        }
+    candidate_ids = np.load(snapshot_dir / "candidate_ids.npy")
+    created = np.load(snapshot_dir / "candidate_created.npy")
+    terms = TermIndex.from_postings(
+        postings,
+        dict(zip(candidate_ids.tolist(), created.tolist())),
+        _CandidateStore(snapshot_dir),
+    )
+    return manifest, vectors, terms
+
+
+def restore(snapshot_dir: str | Path | None = None) -> bool:
+    """
+    Seeds the in-memory vector backend and term index from a snapshot.
+    Both catch up on later changes when they start.
+    """
+    snapshot_dir = snapshot_dir or settings.SNAPSHOT_DIR
+    if not snapshot_dir:
+        return False
+    started = time.perf_counter()
+    try:
+        loaded = load_snapshot(snapshot_dir)
+    except Exception as e:
+        logger.error(f"Failed to load snapshot from {snapshot_dir}: {e}")
+        return False
+    if loaded is None:
+        return False
+
+    manifest, vectors, terms = loaded
+    watermark = datetime.fromisoformat(manifest["watermark"]) if manifest.get("watermark") else None
+    if settings.VECTOR_BACKEND == "memory":
+        vector_memory.restore(vectors, watermark)
+    if settings.TERM_INDEX_ENABLED:
+        term_index.restore(terms, watermark)
+    logger.info(
+        f"Snapshot restored from {snapshot_dir} in {(time.perf_counter() - started) * 1000:.0f}ms "
+        f"({manifest['candidates']} candidates, lsn={manifest.get('lsn')})"
+    )
+    return True
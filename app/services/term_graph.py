@@ -0,0 +1,330 @@
+"""
+Keyword/skill co-occurrence graph for query expansion without LLM tokens.
+
+Built offline from the candidate corpus (scripts/build_term_graph.py): two terms are
+linked when at least `min_count` candidates carry both, weighted by
+count / sqrt(df_a * df_b) (the cosine of their candidate sets), and every term keeps
+only its `neighbours` strongest links. The graph is one .npz file of CSR arrays:
+    terms       uint8 UTF-8 bytes of all terms, concatenated
+    offsets     int64 (n + 1) offsets into terms
+    fields      uint8 per term: 1 = seen in keywords, 2 = seen in skills (bit mask)
+    df          int32 candidates carrying the term
+    indptr      int64 (n + 1) offsets into indices / weights
+    indices     int32 neighbour term ids, strongest first
+    weights     float32 link weights
+    manifest    JSON string (build time, sizes, parameters)
+
+Retrieval expands the persona's core keyword/skill terms with their neighbours
+(see expand_filters), so the persona prompt does not have to list related terms.
+"""
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from app.adapters import pg
+from app.core.config import settings
+from app.services.canonicalize import fold
+
+logger = logging.getLogger(__name__)
+
+FIELD_BITS = {"keywords": 1, "skills": 2}
+FORMAT_VERSION = 1
+
+_FETCH_ROWS = 5000
+# Pair codes buffered before they are merged into the running counts
+_MAX_PENDING_PAIRS = 4_000_000
+
+
+@lru_cache(maxsize=256)
+def _upper_pairs(n: int) -> tuple[np.ndarray, np.ndarray]:
+    return np.triu_indices(n, 1)
+
+
+class _PairCounter:
+    """Co-occurrence counts of term id pairs (a < b), encoded as a << 32 | b."""
+
+    def __init__(self):
+        self.codes = np.empty(0, dtype=np.int64)
+        self.counts = np.empty(0, dtype=np.int64)
+        self._pending: list[np.ndarray] = []
+        self._pending_size = 0
+
+    def add(self, term_ids: np.ndarray) -> None:
+        """Counts every pair of one candidate's (sorted, distinct) term ids."""
+        if len(term_ids) < 2:
+            return
+        first, second = _upper_pairs(len(term_ids))
+        self._pending.append((term_ids[first] << 32) | term_ids[second])
+        self._pending_size += len(first)
+        if self._pending_size >= _MAX_PENDING_PAIRS:
+            self._merge()
+
+    def _merge(self) -> None:
+        if not self._pending:
+            return
+        codes = np.concatenate([self.codes, *self._pending])
+        counts = np.concatenate([self.counts, np.ones(self._pending_size, dtype=np.int64)])
+        self.codes, inverse = np.unique(codes, return_inverse=True)
+        self.counts = np.bincount(inverse, weights=counts).astype(np.int64)
+        self._pending, self._pending_size = [], 0
+
+    def result(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(a, b, count) arrays of all counted pairs."""
+        self._merge()
+        return self.codes >> 32, self.codes & 0xFFFFFFFF, self.counts
+
+
+def _neighbour_lists(
+    n: int, a: np.ndarray, b: np.ndarray, weights: np.ndarray, neighbours: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """CSR (indptr, indices, weights) keeping each term's `neighbours` strongest links."""
+    source = np.concatenate([a, b])
+    target = np.concatenate([b, a])
+    weight = np.concatenate([weights, weights])
+    # By source, then strongest first (ties by target id, for reproducible builds)
+    order = np.lexsort((target, -weight, source))
+    source, target, weight = source[order], target[order], weight[order]
+
+    degree = np.bincount(source, minlength=n)
+    starts = np.concatenate([[0], np.cumsum(degree)[:-1]])
+    keep = np.arange(len(source)) - starts[source] < neighbours
+    source, target, weight = source[keep], target[keep], weight[keep]
+
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(np.bincount(source, minlength=n))
+    return indptr, target.astype(np.int32), weight.astype(np.float32)
+
+
+def _write_graph(
+    out_path: Path,
+    terms: list[str],
+    fields: list[int],
+    df: np.ndarray,
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    weights: np.ndarray,
+    manifest: dict,
+) -> None:
+    """Writes the CSR arrays as one .npz file (format in the module docstring), replaced atomically."""
+    encoded = [term.encode("utf-8") for term in terms]
+    offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(data) for data in encoded])
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez_compressed(
+            f,
+            terms=np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            offsets=offsets,
+            fields=np.array(fields, dtype=np.uint8),
+            df=df.astype(np.int32),
+            indptr=indptr,
+            indices=indices,
+            weights=weights,
+            manifest=np.array(json.dumps(manifest, ensure_ascii=False)),
+        )
+    os.replace(tmp_path, out_path)
+
+
+async def build_term_graph(out_path: str | Path, min_count: int = 3, neighbours: int = 32) -> dict:
+    """
+    Streams keywords/skills of every candidate and writes the co-occurrence graph.
+    The file is replaced atomically, so a running instance never loads a partial graph.
+    """
+    out_path = Path(out_path)
+    started = time.perf_counter()
+    term_ids: dict[str, int] = {}
+    fields: list[int] = []
+    df: list[int] = []
+    pairs = _PairCounter()
+    candidates = 0
+
+    # A standalone connection: reading the whole corpus outlives the timeouts of pooled connections
+    connection = await pg.open_connection()
+    try:
+        async with connection.transaction(isolation="repeatable_read", readonly=True):
+            async for row in connection.cursor("SELECT keywords, skills FROM candidates", prefetch=_FETCH_ROWS):
+                doc = set()
+                for field, bit in FIELD_BITS.items():
+                    for term in row[field] or []:
+                        if not isinstance(term, str) or not term.strip():
+                            continue
+                        term_id = term_ids.get(term)
+                        if term_id is None:
+                            term_id = term_ids[term] = len(fields)
+                            fields.append(0)
+                            df.append(0)
+                        fields[term_id] |= bit
+                        doc.add(term_id)
+                for term_id in doc:
+                    df[term_id] += 1
+                pairs.add(np.array(sorted(doc), dtype=np.int64))
+                candidates += 1
+    finally:
+        await connection.close()
+
+    n = len(fields)
+    a, b, counts = pairs.result()
+    frequent = counts >= min_count
+    a, b, counts = a[frequent], b[frequent], counts[frequent]
+    df_array = np.array(df, dtype=np.int64)
+    weights = counts / np.sqrt(df_array[a] * df_array[b])
+    indptr, indices, link_weights = _neighbour_lists(n, a, b, weights, neighbours)
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "built_at": datetime.now().astimezone().isoformat(),
+        "candidates": candidates,
+        "terms": n,
+        "links": int(len(indices)),
+        "min_count": min_count,
+        "neighbours": neighbours,
+    }
+    _write_graph(out_path, list(term_ids), fields, df_array, indptr, indices, link_weights, manifest)
+
+    logger.info(
+        f"Term graph written to {out_path}: {n} terms, {len(indices)} links from {candidates} candidates "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+    return manifest
+
+
+class TermGraph:
+    """Read-only co-occurrence graph; terms are looked up as stored, then by folded key."""
+
+    def __init__(
+        self,
+        terms: list[str],
+        fields: np.ndarray,
+        df: np.ndarray,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        weights: np.ndarray,
+        manifest: dict | None = None,
+    ):
+        self.terms = terms
+        self.fields = fields
+        self.df = df
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.manifest = manifest or {}
+        self._ids = {term: term_id for term_id, term in enumerate(terms)}
+        self._folded: dict[str, list[int]] = {}
+        for term_id, term in enumerate(terms):
+            self._folded.setdefault(fold(term), []).append(term_id)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "TermGraph":
+        with np.load(path) as data:
+            blob = data["terms"].tobytes()
+            offsets = data["offsets"].tolist()
+            terms = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+            return cls(
+                terms,
+                data["fields"],
+                data["df"],
+                data["indptr"],
+                data["indices"],
+                data["weights"],
+                json.loads(str(data["manifest"])),
+            )
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def _lookup(self, term: str) -> list[int]:
+        term_id = self._ids.get(term)
+        if term_id is not None:
+            return [term_id]
+        return self._folded.get(fold(term), [])
+
+    def neighbours(self, term: str) -> list[tuple[str, float]]:
+        """Linked terms with their weights, strongest first."""
+        linked = []
+        for term_id in self._lookup(term):
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            linked.extend(zip(
+                (self.terms[i] for i in self.indices[start:end].tolist()),
+                self.weights[start:end].tolist(),
+            ))
+        return sorted(linked, key=lambda link: link[1], reverse=True)
+
+    def expand(self, terms: list[str], limit: int, min_weight: float = 0.0) -> list[tuple[str, float]]:
+        """
+        Up to `limit` terms related to `terms` as a whole: link weights are summed over
+        the seed terms, so neighbours shared by several seeds rank first. Seeds are excluded.
+        """
+        seeds = {term_id for term in terms for term_id in self._lookup(term)}
+        scores: dict[int, float] = {}
+        for seed in seeds:
+            start, end = self.indptr[seed], self.indptr[seed + 1]
+            for neighbour, weight in zip(self.indices[start:end].tolist(), self.weights[start:end].tolist()):
+                if neighbour not in seeds:
+                    scores[neighbour] = scores.get(neighbour, 0.0) + weight
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return [(self.terms[term_id], score) for term_id, score in ranked[:limit] if score >= min_weight]
+
+    def term_fields(self, term: str) -> list[str]:
+        """Fields (keywords / skills) the term was seen in."""
+        mask = 0
+        for term_id in self._lookup(term):
+            mask |= int(self.fields[term_id])
+        return [field for field, bit in FIELD_BITS.items() if mask & bit]
+
+
+_graph: TermGraph | None = None
+_load_failed = False
+
+
+def get_graph() -> TermGraph | None:
+    """The graph at TERM_GRAPH_PATH, loaded on first use; None when unset or unreadable."""
+    global _graph, _load_failed
+    if _graph is None and settings.TERM_GRAPH_PATH and not _load_failed:
+        try:
+            _graph = TermGraph.load(settings.TERM_GRAPH_PATH)
+            logger.info(
+                f"Term graph loaded from {settings.TERM_GRAPH_PATH}: {len(_graph)} terms "
+                f"(built {_graph.manifest.get('built_at')})"
+            )
+        except Exception as e:
+            _load_failed = True
+            logger.warning(f"Term graph {settings.TERM_GRAPH_PATH} could not be loaded, expansion disabled: {e}")
+    return _graph
+
+
+def is_available() -> bool:
+    return get_graph() is not None
+
+
+def expand_filters(search_filters: dict) -> tuple[dict, dict[str, list[str]]]:
+    """
+    Adds graph neighbours of the keyword/skill filter terms to keywords_any / skills_any
+    (by the fields each neighbour was seen in). Returns the expanded filters and the
+    added terms per field, which the filter planner down-weights.
+    """
+    graph = get_graph()
+    seeds = [
+        term for field in FIELD_BITS for suffix in ("_any", "_all") for term in search_filters.get(f"{field}{suffix}") or []
+    ]
+    if graph is None or not seeds:
+        return search_filters, {}
+
+    expanded = dict(search_filters)
+    added: dict[str, list[str]] = {}
+    for term, _ in graph.expand(seeds, settings.TERM_EXPANSION_LIMIT, settings.TERM_EXPANSION_MIN_WEIGHT):
+        for field in graph.term_fields(term):
+            present = set(expanded.get(f"{field}_any") or []) | set(expanded.get(f"{field}_all") or [])
+            if term in present:
+                continue
+            expanded[f"{field}_any"] = list(expanded.get(f"{field}_any") or []) + [term]
+            added.setdefault(field, []).append(term)
+    if added:
+        logger.info(f"   → Term expansion: {added}")
+    return expanded, added
@@ -1,77 +1,69 @@
+import numpy as np
 
-import math
-
-def cosine_similarity(vec1: list[float], vec2: list[float]) -> float:
+def cosine_similarity(vec1, vec2) -> float:
     """Calculates cosine similarity between two vectors."""
-    dot_product = sum(p*q for p,q in zip(vec1, vec2))
-    magnitude = math.sqrt(sum([val**2 for val in vec1])) * math.sqrt(sum([val**2 for val in vec2]))
+    vec1 = np.asarray(vec1, dtype=np.float32)
+    vec2 = np.asarray(vec2, dtype=np.float32)
+    magnitude = float(np.linalg.norm(vec1) * np.linalg.norm(vec2))
     if not magnitude:
         return 0
-    return dot_product / magnitude
+    return float(vec1 @ vec2) / magnitude
+
+def similarity_matrix(vectors: np.ndarray) -> np.ndarray:
+    """Pairwise cosine similarities of the rows of `vectors` (zero rows are similar to nothing)."""
+    vectors = np.asarray(vectors, dtype=np.float64)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    normalized = vectors / norms
+    return normalized @ normalized.T
 
-def mmr(documents: list[dict], vectors: dict[str, list[float]], lambda_val: float, k: int) -> list[dict]:
+def mmr(documents: list[dict], vectors: dict, lambda_val: float, k: int) -> list[dict]:
     """
     Performs Maximal Marginal Relevance (MMR) to diversify the result set.
     `documents` is the list of candidate documents, sorted by relevance.
     `vectors` is a dictionary mapping document ID (as string) to its vector.
     `lambda_val` controls the trade-off between relevance and diversity.
     `k` is the number of results to return.
-    
+
+    Similarities are computed once as a matrix; each document's maximum similarity
+    to the selected set is kept up to date with one vector max per pick, so the
+    selection is O(n·k) after the O(n²·d) matmul.
+    Documents without a vector are dropped. Returns documents in selection order.
+
     Note: All IDs are normalized to strings for consistent comparison.
     """
-    if not documents or not vectors:
+    if not documents or not vectors or k <= 0:
         return []
 
     # Normalize all IDs to strings for consistent comparison
     # vectors dict keys are strings, document IDs may be int or str
-    vectors_str = {str(k): v for k, v in vectors.items()}
-    
+    vectors_str = {str(doc_id): v for doc_id, v in vectors.items()}
+
     # Ensure we have vectors for all documents
-    doc_ids_with_vectors = [str(doc['id']) for doc in documents if str(doc['id']) in vectors_str]
-    if not doc_ids_with_vectors:
+    candidates = [doc for doc in documents if str(doc['id']) in vectors_str]
+    if not candidates:
         return documents[:k] # Return top k if no vectors are available
 
     # Normalize relevance scores (original scores from blended search)
-    scores = {str(doc['id']): doc['score'] for doc in documents}
-    max_score = max(scores.values()) if scores else 0
+    relevance = np.array([doc['score'] for doc in candidates], dtype=np.float64)
+    max_score = max(doc['score'] for doc in documents)
     if max_score > 0:
-        for doc_id in scores:
-            scores[doc_id] /= max_score
+        relevance /= max_score
 
-    selected_ids = []
-    remaining_ids = doc_ids_with_vectors.copy()
+    sims = similarity_matrix(np.stack([np.asarray(vectors_str[str(doc['id'])]) for doc in candidates]))
 
     # Greedily select the first document (most relevant)
-    if remaining_ids:
-        first_id = remaining_ids.pop(0)
-        selected_ids.append(first_id)
-
-    while len(selected_ids) < k and remaining_ids:
-        mmr_scores = {}
-        for doc_id in remaining_ids:
-            relevance = scores.get(doc_id, 0)
-            
-            # Calculate similarity with already selected documents
-            max_sim = 0
-            if selected_ids:
-                sims = [cosine_similarity(vectors_str[doc_id], vectors_str[sel_id]) for sel_id in selected_ids]
-                if sims:
-                    max_sim = max(sims)
-            
-            mmr_score = lambda_val * relevance - (1 - lambda_val) * max_sim
-            mmr_scores[doc_id] = mmr_score
-        
-        if not mmr_scores:
-            break
+    selected = [0]
+    available = np.ones(len(candidates), dtype=bool)
+    available[0] = False
+    max_sim = sims[0].copy()
 
-        # Select the document with the highest MMR score
-        best_id = max(mmr_scores, key=mmr_scores.get)
-        selected_ids.append(best_id)
-        remaining_ids.remove(best_id)
+    while len(selected) < k and available.any():
+        mmr_scores = lambda_val * relevance - (1 - lambda_val) * max_sim
+        mmr_scores[~available] = -np.inf
+        best = int(np.argmax(mmr_scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(max_sim, sims[best], out=max_sim)
 
-    # Return the selected documents in the order they were selected
-    # Compare with normalized string IDs
-    final_documents = [doc for doc in documents if str(doc['id']) in selected_ids]
-    final_documents.sort(key=lambda doc: selected_ids.index(str(doc['id'])))
-    
-    return final_documents
+    return [candidates[i] for i in selected]
@@ -0,0 +1,113 @@
+"""
+Rank fusion over any number of ranked lists.
+
+Sources are named ranked lists of {"id", "score"} dicts, best first
+(structured, vector, full-text, cached results ...), each with an optional weight.
+Only (id, fused score) pairs are returned: callers that need payloads look them
+up by id, so no document dict is copied or searched for.
+
+Ids are compared as strings. Ties keep the order in which ids were first seen.
+"""
+import heapq
+from collections.abc import Mapping, Sequence
+from operator import itemgetter
+
+RankedList = Sequence[Mapping]
+Fused = list[tuple[str, float]]
+
+METHODS = ("rrf", "blend", "combmnz")
+
+
+def _top(scores: dict[str, float], top_k: int | None) -> Fused:
+    # nlargest is O(n log k) and stable, like sorted(..., reverse=True)[:k]
+    if top_k is None:
+        return sorted(scores.items(), key=itemgetter(1), reverse=True)
+    return heapq.nlargest(top_k, scores.items(), key=itemgetter(1))
+
+
+def _weight(weights: Mapping[str, float] | None, source: str) -> float:
+    return 1.0 if weights is None else weights.get(source, 1.0)
+
+
+def rrf(
+    sources: Mapping[str, RankedList],
+    weights: Mapping[str, float] | None = None,
+    k: int = 60,
+    top_k: int | None = None,
+) -> Fused:
+    """
+    Reciprocal Rank Fusion: score = sum over sources of weight / (k + rank).
+    Only ranks are used, so sources with incomparable scores fuse without normalization.
+    """
+    scores: dict[str, float] = {}
+    for source, results in sources.items():
+        weight = _weight(weights, source)
+        for rank, result in enumerate(results, 1):
+            doc_id = str(result['id'])
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight / (k + rank)
+    return _top(scores, top_k)
+
+
+def blend(
+    sources: Mapping[str, RankedList],
+    weights: Mapping[str, float] | None = None,
+    top_k: int | None = None,
+) -> Fused:
+    """
+    Weighted sum of scores normalized by each source's maximum score.
+    A document missing from a source contributes 0 for it.
+    """
+    scores: dict[str, float] = {}
+    for source, results in sources.items():
+        if not results:
+            continue
+        weight = _weight(weights, source)
+        max_score = max(result.get('score') or 0.0 for result in results)
+        scale = weight / max_score if max_score > 0 else weight
+        for result in results:
+            doc_id = str(result['id'])
+            scores[doc_id] = scores.get(doc_id, 0.0) + scale * (result.get('score') or 0.0)
+    return _top(scores, top_k)
+
+
+def combmnz(
+    sources: Mapping[str, RankedList],
+    weights: Mapping[str, float] | None = None,
+    top_k: int | None = None,
+) -> Fused:
+    """
+    CombMNZ: the weighted sum of min-max normalized scores, multiplied by the
+    number of sources that returned the document.
+    """
+    scores: dict[str, float] = {}
+    hits: dict[str, int] = {}
+    for source, results in sources.items():
+        if not results:
+            continue
+        weight = _weight(weights, source)
+        values = [result.get('score') or 0.0 for result in results]
+        low, high = min(values), max(values)
+        spread = high - low
+        for result, value in zip(results, values):
+            doc_id = str(result['id'])
+            normalized = (value - low) / spread if spread > 0 else 1.0
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight * normalized
+            hits[doc_id] = hits.get(doc_id, 0) + 1
+    return _top({doc_id: score * hits[doc_id] for doc_id, score in scores.items()}, top_k)
+
+
+def fuse(
+    sources: Mapping[str, RankedList],
+    method: str = "rrf",
+    weights: Mapping[str, float] | None = None,
+    top_k: int | None = None,
+    k: int = 60,
+) -> Fused:
+    """Dispatches to rrf / blend / combmnz (`k` is the RRF constant)."""
+    if method == "rrf":
+        return rrf(sources, weights, k=k, top_k=top_k)
+    if method == "blend":
+        return blend(sources, weights, top_k=top_k)
+    if method == "combmnz":
+        return combmnz(sources, weights, top_k=top_k)
+    raise ValueError(f"Unsupported fusion method: {method} (expected one of {METHODS})")
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Vector Search recall / latency 벤치마크
+
+로컬 PostgreSQL + pgvector(및 인메모리 NumPy 백엔드)를 대상으로 코퍼스 크기와
+인덱스 설정별로 다음을 측정합니다:
+    - recall@k: brute-force 정확 top-k(ground truth) 대비 재현율
+    - p50 / p95 / p99 latency (ms)
+    - throughput (QPS, --concurrency 동시 요청 기준)
+
+각 코퍼스 크기마다 bench_vectors_<N> 임시 테이블을 만들고(같은 쿼리 형태의
+`ORDER BY vector <=> $1::vector`), 결과를 JSON으로 저장해 실행 간 비교가 가능합니다.
+
+사용법:
+    python scripts/bench_vector_search.py --sizes 1000,10000,50000 --queries 200
+    python scripts/bench_vector_search.py --methods ivfflat --probes 1,4,10 --dim 768
+    python scripts/bench_vector_search.py --compare bench_results/vector_20250101T000000.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.adapters import pg
+from app.adapters.pg import connect_db, close_db
+from app.adapters.vector_index import plan_index, rebuild_vector_index
+from app.adapters.vector_memory import VectorMatrix
+
+logger = logging.getLogger(__name__)
+
+INSERT_BATCH = 1000
+
+
+def make_corpus(n: int, dim: int, seed: int, clusters: int = 64) -> np.ndarray:
+    """Clustered unit vectors; uniform random vectors would make every ANN index look perfect or useless."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    points = centers[rng.integers(0, clusters, n)] + 0.35 * rng.standard_normal((n, dim)).astype(np.float32)
+    return points / np.linalg.norm(points, axis=1, keepdims=True)
+
+
+def make_queries(corpus: np.ndarray, count: int, seed: int) -> np.ndarray:
+    """Perturbed corpus points, so every query has a meaningful neighbourhood."""
+    rng = np.random.default_rng(seed + 1)
+    base = corpus[rng.integers(0, len(corpus), count)]
+    queries = base + 0.2 * rng.standard_normal(base.shape).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def exact_topk(corpus: np.ndarray, queries: np.ndarray, k: int) -> list[set[int]]:
+    """Brute-force ground truth: ids are 1-based row numbers, as loaded into the bench table."""
+    scores = queries @ corpus.T
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return [set((row + 1).tolist()) for row in top]
+
+
+def recall_at_k(found: list[list[int]], truth: list[set[int]], k: int) -> float:
+    return float(np.mean([len(set(ids[:k]) & expected) / k for ids, expected in zip(found, truth)]))
+
+
+def latency_summary(latencies_s: list[float], wall_s: float) -> dict:
+    ms = np.asarray(latencies_s) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "mean_ms": round(float(ms.mean()), 3),
+        "qps": round(len(latencies_s) / wall_s, 1) if wall_s > 0 else None,
+    }
+
+
+async def load_table(table: str, corpus: np.ndarray) -> None:
+    dim = corpus.shape[1]
+    await pg.execute_query(f"DROP TABLE IF EXISTS {table}")
+    await pg.execute_query(f"CREATE TABLE {table} (id INT PRIMARY KEY, vector VECTOR({dim}))")
+    async with pg._pool.acquire() as connection:
+        for start in range(0, len(corpus), INSERT_BATCH):
+            chunk = corpus[start:start + INSERT_BATCH]
+            await connection.copy_records_to_table(
+                table, records=zip(range(start + 1, start + len(chunk) + 1), chunk), columns=["id", "vector"]
+            )
+    await pg.execute_query(f"ANALYZE {table}")
+
+
+async def run_pg_queries(table: str, queries: np.ndarray, k: int, gucs: dict[str, str], concurrency: int):
+    sql = f"SELECT id FROM {table} ORDER BY vector <=> $1::vector LIMIT $2"
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = [0.0] * len(queries)
+    found = [None] * len(queries)
+
+    async def one(i: int):
+        async with semaphore:
+            async with pg._pool.acquire() as connection:
+                started = time.perf_counter()
+                async with connection.transaction():
+                    for name, value in gucs.items():
+                        await connection.execute("SELECT set_config($1, $2, true)", name, value)
+                    rows = await connection.fetch(sql, queries[i], k)
+                latencies[i] = time.perf_counter() - started
+                found[i] = [row['id'] for row in rows]
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(len(queries))))
+    return found, latencies, time.perf_counter() - started
+
+
+def run_memory_queries(corpus: np.ndarray, queries: np.ndarray, k: int):
+    index = VectorMatrix.from_arrays(np.arange(1, len(corpus) + 1), corpus.copy())
+    latencies, found = [], []
+    started = time.perf_counter()
+    for query in queries:
+        t0 = time.perf_counter()
+        found.append([candidate_id for candidate_id, _ in index.topk(query, k)])
+        latencies.append(time.perf_counter() - t0)
+    return found, latencies, time.perf_counter() - started
+
+
+def search_configs(method: str, n: int, probes: list[int], ef_search: list[int]) -> list[dict[str, str]]:
+    if method == "exact":
+        # Sequential scan over every row: recall is 1.0 by construction, latency is the ceiling
+        return [{"enable_indexscan": "off"}]
+    recommended = plan_index(n, method)["search"]
+    if method == "ivfflat":
+        values = sorted(set(probes) | {recommended["probes"]})
+        return [{"ivfflat.probes": str(v)} for v in values]
+    values = sorted(set(ef_search) | {recommended["ef_search"]})
+    return [{"hnsw.ef_search": str(v)} for v in values]
+
+
+async def bench(args) -> dict:
+    results = []
+    for n in args.sizes:
+        table = f"bench_vectors_{n}"
+        corpus = make_corpus(n, args.dim, args.seed)
+        queries = make_queries(corpus, args.queries, args.seed)
+        truth = exact_topk(corpus, queries, args.k)
+        logger.info(f"[{n}] loading {table} ({args.dim} dims)")
+        await load_table(table, corpus)
+
+        if "memory" in args.backends:
+            found, latencies, wall = run_memory_queries(corpus, queries, args.k)
+            results.append({
+                "backend": "memory", "corpus_size": n, "method": "exact", "search": {},
+                "recall_at_k": recall_at_k(found, truth, args.k),
+                **latency_summary(latencies, wall),
+            })
+            logger.info(f"[{n}] memory: {results[-1]}")
+
+        if "pgvector" not in args.backends:
+            await pg.execute_query(f"DROP TABLE IF EXISTS {table}")
+            continue
+        for method in args.methods:
+            build = None
+            if method != "exact":
+                # Scratch-table builds stay out of vector_index_builds, the production build history
+                build = await rebuild_vector_index(method, table=table, column="vector", record=False)
+            for gucs in search_configs(method, n, args.probes, args.ef_search):
+                # Warm-up so the first configuration is not charged for cold buffers
+                await run_pg_queries(table, queries[:10], args.k, gucs, 1)
+                found, latencies, wall = await run_pg_queries(table, queries, args.k, gucs, args.concurrency)
+                results.append({
+                    "backend": "pgvector", "corpus_size": n, "method": method, "search": gucs,
+                    "build": {key: build[key] for key in ("build_params", "build_ms", "size_bytes")} if build else None,
+                    "recall_at_k": recall_at_k(found, truth, args.k),
+                    **latency_summary(latencies, wall),
+                })
+                logger.info(f"[{n}] pgvector {method} {gucs}: {results[-1]['recall_at_k']:.3f} recall, p95 {results[-1]['p95_ms']}ms")
+        if not args.keep_tables:
+            await pg.execute_query(f"DROP TABLE IF EXISTS {table}")
+    return results
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=project_root, text=True).strip()
+    except Exception:
+        return None
+
+
+def compare(current: list[dict], previous_path: str) -> None:
+    with open(previous_path, encoding="utf-8") as f:
+        previous = {
+            (r["backend"], r["corpus_size"], r["method"], json.dumps(r["search"], sort_keys=True)): r
+            for r in json.load(f)["results"]
+        }
+    print(f"\n비교 대상: {previous_path}")
+    for r in current:
+        key = (r["backend"], r["corpus_size"], r["method"], json.dumps(r["search"], sort_keys=True))
+        old = previous.get(key)
+        if old is None:
+            continue
+        print(
+            f"  {r['backend']:8} n={r['corpus_size']:<7} {r['method']:7} {key[3]:28} "
+            f"recall {old['recall_at_k']:.3f}→{r['recall_at_k']:.3f}  "
+            f"p95 {old['p95_ms']:.2f}→{r['p95_ms']:.2f}ms  qps {old['qps']}→{r['qps']}"
+        )
+
+
+async def main(args):
+    await connect_db()
+    try:
+        results = await bench(args)
+    finally:
+        await close_db()
+
+    report = {
+        "run_at": datetime.now().astimezone().isoformat(),
+        "git_commit": git_commit(),
+        "params": {
+            "sizes": args.sizes, "dim": args.dim, "k": args.k, "queries": args.queries,
+            "concurrency": args.concurrency, "seed": args.seed,
+        },
+        "results": results,
+    }
+    out = Path(args.out) if args.out else project_root / "bench_results" / f"vector_{datetime.now():%Y%m%dT%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"✅ 결과 저장: {out}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Vector search recall/latency benchmark")
+    parser.add_argument("--sizes", type=_int_list, default=[1000, 10000, 50000])
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--backends", type=lambda v: v.split(","), default=["pgvector", "memory"])
+    parser.add_argument("--methods", type=lambda v: v.split(","), default=["exact", "ivfflat", "hnsw"])
+    parser.add_argument("--probes", type=_int_list, default=[1, 4, 10])
+    parser.add_argument("--ef-search", type=_int_list, default=[40, 100, 200])
+    parser.add_argument("--keep-tables", action="store_true", help="keep bench_vectors_<N> tables after the run")
+    parser.add_argument("--out", help="output JSON path (default: bench_results/vector_<timestamp>.json)")
+    parser.add_argument("--compare", help="previous result JSON to diff against")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+검색 코퍼스 스냅샷을 DB에서 생성하는 스크립트
+
+사용법:
+    python scripts/build_snapshot.py --out /data/snapshot
+
+생성된 디렉토리를 SNAPSHOT_DIR로 지정하면 서버가 cold start 시
+DB 전체를 다시 읽지 않고 스냅샷을 mmap한 뒤 변경분만 따라잡습니다.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.adapters.pg import connect_db, close_db
+from app.core.config import settings
+from app.services.snapshot import build_snapshot
+
+
+async def main(out_dir: str):
+    await connect_db()
+    try:
+        manifest = await build_snapshot(out_dir)
+        print(json.dumps(manifest, indent=2, ensure_ascii=False))
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Build a corpus snapshot for fast cold starts")
+    parser.add_argument("--out", default=settings.SNAPSHOT_DIR, help="snapshot directory (default: SNAPSHOT_DIR)")
+    args = parser.parse_args()
+    if not args.out:
+        parser.error("--out is required when SNAPSHOT_DIR is not set")
+    asyncio.run(main(args.out))
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+keywords/skills 동시 출현(co-occurrence) 그래프를 DB에서 생성하는 스크립트
+
+사용법:
+    python scripts/build_term_graph.py --out /data/term_graph.npz
+    python scripts/build_term_graph.py --min-count 5 --neighbours 16
+
+생성된 파일을 TERM_GRAPH_PATH로 지정하면 검색 시 persona의 핵심 term을
+LLM 호출 없이 관련 term으로 확장하고, persona 프롬프트는 핵심 term만 요청합니다.
+코퍼스가 크게 바뀌면 다시 생성하세요.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.adapters.pg import connect_db, close_db
+from app.core.config import settings
+from app.services.term_graph import build_term_graph
+
+
+async def main(out_path: str, min_count: int, neighbours: int):
+    await connect_db()
+    try:
+        manifest = await build_term_graph(out_path, min_count=min_count, neighbours=neighbours)
+        print(json.dumps(manifest, indent=2, ensure_ascii=False))
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Build the keyword/skill co-occurrence graph for query expansion")
+    parser.add_argument("--out", default=settings.TERM_GRAPH_PATH, help="output .npz file (default: TERM_GRAPH_PATH)")
+    parser.add_argument("--min-count", type=int, default=3, help="candidates two terms must share to be linked")
+    parser.add_argument("--neighbours", type=int, default=32, help="links kept per term")
+    args = parser.parse_args()
+    if not args.out:
+        parser.error("--out is required when TERM_GRAPH_PATH is not set")
+    asyncio.run(main(args.out, args.min_count, args.neighbours))
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+candidates.vector ANN 인덱스를 (재)생성하는 스크립트
+
+대량 적재 후 실행하면 행 수에 맞춰 lists / m / ef_construction을 정하고
+CREATE INDEX CONCURRENTLY로 검색 중단 없이 인덱스를 교체합니다.
+
+사용법:
+    python scripts/build_vector_index.py              # VECTOR_INDEX_METHOD 사용
+    python scripts/build_vector_index.py --method hnsw
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.adapters.pg import connect_db, close_db
+from app.adapters.vector_index import SUPPORTED_METHODS, rebuild_vector_index
+
+
+async def main(method: str | None):
+    await connect_db()
+    try:
+        build = await rebuild_vector_index(method)
+        print(json.dumps(build, indent=2))
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Rebuild the ANN index on candidates.vector")
+    parser.add_argument("--method", choices=SUPPORTED_METHODS, default=None)
+    args = parser.parse_args()
+    asyncio.run(main(args.method))
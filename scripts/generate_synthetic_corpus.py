@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+professor_record 템플릿 기반 합성 후보자 코퍼스 생성 스크립트
+
+app/data/professor_record 의 실제 레코드에서 keywords / skills / cards(text, table,
+badgeList, links ...) 구조를 재조합해 10k~1M 규모의 현실적인 후보자를 만들고,
+로컬 PostgreSQL candidates 테이블에 COPY로 적재합니다.
+
+임베딩은 결정적(pseudo) 임베딩입니다: 각 term마다 term 해시로 시드한 고정 단위 벡터를
+두고, 후보자 벡터 = 자신의 keywords/skills term 벡터 합 + 작은 노이즈 (정규화).
+같은 term을 공유하는 후보자끼리 가까워지므로 vector_topk / 필터 성능 측정에 쓸 수 있습니다.
+
+사용법:
+    python scripts/generate_synthetic_corpus.py --count 100000
+    python scripts/generate_synthetic_corpus.py --count 1000000 --replace --index-method hnsw
+
+적재 중에는 ANN 인덱스(idx_candidates_vector)를 내려 두고, 적재 후 행 수에 맞춰 다시 빌드합니다.
+(HNSW 인덱스가 걸린 상태의 COPY는 행마다 그래프 삽입이 일어나 수십 배 느립니다.)
+"""
+import argparse
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.adapters import pg
+from app.adapters.pg import connect_db, close_db
+from app.adapters.vector_index import INDEX_NAME, rebuild_vector_index
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFESSOR_DATA_DIR = project_root / "app" / "data" / "professor_record"
+EMAIL_DOMAIN = "synthetic.example.com"
+COLUMNS = ["name", "email", "introduce", "keywords", "skills", "cards", "vector"]
+
+SURNAMES = list("김이박최정강조윤장임한오서신권황안송류전홍고문양손배백허유남심노하곽성차주우구민진지엄채원천방공현함변염여추도소석선설마길연위표명기반왕금옥육인맹제모탁국어은편용")
+GIVEN_SYLLABLES = list("민서지현준우도윤하은수진영호성재연주희예원태승혜경상동석정규나라아솔빈찬훈혁범")
+
+
+def load_templates(data_dir: Path = PROFESSOR_DATA_DIR) -> list[dict]:
+    templates = []
+    for file_path in sorted(data_dir.glob("professor_*.json")):
+        with open(file_path, encoding="utf-8") as f:
+            record = json.load(f)
+        if record.get("keywords") or record.get("skills"):
+            templates.append(record)
+    if not templates:
+        raise RuntimeError(f"No professor_record templates found in {data_dir}")
+    return templates
+
+
+class TermVectors:
+    """Deterministic unit vector per term, seeded by a stable hash of the term."""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self._cache: dict[str, np.ndarray] = {}
+
+    def __getitem__(self, term: str) -> np.ndarray:
+        vector = self._cache.get(term)
+        if vector is None:
+            seed = int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+            vector = np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+            vector /= np.linalg.norm(vector)
+            self._cache[term] = vector
+        return vector
+
+    def embed(self, terms: list[str], rng: np.random.Generator, noise: float = 0.1) -> np.ndarray:
+        vector = noise * rng.standard_normal(self.dim).astype(np.float32)
+        for term in terms:
+            vector += self[term]
+        return vector / np.linalg.norm(vector)
+
+
+class CandidateGenerator:
+    """Recombines real records: a base template plus terms and cards borrowed from a neighbour."""
+
+    def __init__(self, templates: list[dict], dim: int, seed: int):
+        self.templates = templates
+        self.rng = np.random.default_rng(seed)
+        self.term_vectors = TermVectors(dim)
+        self.keyword_pool = sorted({kw for t in templates for kw in t.get("keywords", [])})
+        self.skill_pool = sorted({sk for t in templates for sk in t.get("skills", [])})
+        self.intros = sorted({t["introduce"] for t in templates if t.get("introduce")})
+
+    def _sample(self, items: list, low: int, high: int) -> list:
+        if not items:
+            return []
+        size = min(len(items), int(self.rng.integers(low, high + 1)))
+        return [items[i] for i in self.rng.choice(len(items), size=size, replace=False)]
+
+    def _name(self) -> str:
+        given = "".join(self.rng.choice(GIVEN_SYLLABLES, size=2))
+        return f"{self.rng.choice(SURNAMES)}{given}"
+
+    def _card(self, card: dict) -> dict:
+        card = copy.deepcopy(card)
+        data = card.get("data")
+        if card.get("type") == "text" and isinstance(data, str):
+            sentences = [s for s in data.split(". ") if s]
+            keep = self._sample(sentences, max(1, len(sentences) // 2), len(sentences))
+            card["data"] = ". ".join(keep)
+        elif isinstance(data, list) and len(data) > 1:
+            card["data"] = self._sample(data, 1, len(data))
+        return card
+
+    def generate(self, index: int) -> tuple:
+        base = self.templates[int(self.rng.integers(len(self.templates)))]
+        other = self.templates[int(self.rng.integers(len(self.templates)))]
+
+        keywords = self._sample(base.get("keywords", []), 3, 10) + self._sample(other.get("keywords", []), 0, 3)
+        keywords += self._sample(self.keyword_pool, 0, 2)
+        skills = self._sample(base.get("skills", []), 3, 10) + self._sample(other.get("skills", []), 0, 2)
+        skills += self._sample(self.skill_pool, 0, 1)
+        keywords = list(dict.fromkeys(keywords))
+        skills = list(dict.fromkeys(skills))
+
+        cards = [self._card(card) for card in self._sample(base.get("cards", []), 1, 5)]
+        cards += [self._card(card) for card in self._sample(other.get("cards", []), 0, 1)]
+
+        introduce = base.get("introduce") or (self.intros[int(self.rng.integers(len(self.intros)))] if self.intros else None)
+        vector = self.term_vectors.embed(keywords + skills, self.rng)
+        return (
+            self._name(),
+            f"synthetic+{index}@{EMAIL_DOMAIN}",
+            introduce,
+            keywords,
+            skills,
+            cards,
+            vector,
+        )
+
+
+async def bulk_load(count: int, batch_size: int, seed: int, start_index: int) -> None:
+    generator = CandidateGenerator(load_templates(), settings.VECTOR_DIM, seed)
+    # Binary COPY goes through the jsonb / vector codecs registered on the connection
+    connection = await pg.open_connection()
+    try:
+        started = time.perf_counter()
+        loaded = 0
+        for batch_start in range(start_index, start_index + count, batch_size):
+            batch_end = min(batch_start + batch_size, start_index + count)
+            records = [generator.generate(i) for i in range(batch_start, batch_end)]
+            await connection.copy_records_to_table("candidates", records=records, columns=COLUMNS)
+            loaded += len(records)
+            elapsed = time.perf_counter() - started
+            logger.info(f"   → {loaded:,}/{count:,} rows ({loaded / elapsed:,.0f} rows/s)")
+        await connection.execute("ANALYZE candidates")
+    finally:
+        await connection.close()
+    elapsed = time.perf_counter() - started
+    print(f"✅ {count:,}명 적재 완료: {elapsed:.1f}s ({count / elapsed:,.0f} rows/s)")
+
+
+async def main(args):
+    await connect_db()
+    try:
+        if args.replace:
+            deleted = await pg.execute_query(
+                "DELETE FROM candidates WHERE email LIKE $1 RETURNING id", f"%@{EMAIL_DOMAIN}"
+            )
+            logger.info(f"Deleted {len(deleted)} previous synthetic candidates")
+        # Index maintenance dominates COPY time; build once over the final corpus instead
+        await pg.execute_query(f"DROP INDEX IF EXISTS {INDEX_NAME}")
+        start_index = 0
+        if not args.replace:
+            # Continue numbering after existing synthetic rows so emails stay unique
+            start_index = await pg.fetch_val(
+                "SELECT count(*) FROM candidates WHERE email LIKE $1", f"%@{EMAIL_DOMAIN}"
+            )
+        await bulk_load(args.count, args.batch_size, args.seed + start_index, start_index)
+        if not args.no_index:
+            await rebuild_vector_index(args.index_method)
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Generate and bulk-load a synthetic candidate corpus")
+    parser.add_argument("--count", type=int, default=10000, help="number of synthetic candidates (10k~1M)")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--replace", action="store_true", help="delete previously generated synthetic rows first")
+    parser.add_argument("--index-method", choices=["ivfflat", "hnsw"], help="ANN index method (default: settings.VECTOR_INDEX_METHOD)")
+    parser.add_argument("--no-index", action="store_true", help="leave the ANN index dropped after loading")
+    asyncio.run(main(parser.parse_args()))
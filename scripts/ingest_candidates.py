@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+후보자 프로필 JSON(professor_record 형식)을 candidates 테이블에 일괄 적재하는 스크립트
+
+사용법:
+    python scripts/ingest_candidates.py                          # app/data/professor_record 전체
+    python scripts/ingest_candidates.py /data/profiles --workers 8
+    python scripts/ingest_candidates.py a.json b.json --errors-out errors.jsonl
+
+파일은 프로세스 풀에서 병렬 파싱되어 COPY로 임시 staging 테이블에 적재된 뒤,
+email 기준 upsert 한 번으로 candidates에 반영됩니다. 적재 후 임베딩 생성
+(/v1/candidates/generate-vectors)을 실행하면 새 행과 내용이 바뀐 행만 임베딩되며,
+필요하면 scripts/build_vector_index.py로 ANN 인덱스를 다시 빌드하세요. 실패한 파일이 있으면 종료 코드 1을 반환합니다.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.adapters.pg import connect_db, close_db
+from app.services.ingest import ingest_profiles, profile_files
+
+PROFESSOR_DATA_DIR = project_root / "app" / "data" / "professor_record"
+
+
+async def main(args) -> int:
+    files = profile_files(args.paths or [PROFESSOR_DATA_DIR])
+    if not files:
+        print("❌ 적재할 파일이 없습니다.")
+        return 1
+    await connect_db()
+    try:
+        report = await ingest_profiles(files, batch_size=args.batch_size, workers=args.workers)
+    finally:
+        await close_db()
+
+    errors = report.pop("errors")
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if errors:
+        print(f"⚠️  {len(errors)}개 파일 실패:")
+        for error in errors[:20]:
+            print(f"   - {error['file']}: {error['error']}")
+        if len(errors) > 20:
+            print(f"   ... 외 {len(errors) - 20}개")
+        if args.errors_out:
+            with open(args.errors_out, "w", encoding="utf-8") as f:
+                for error in errors:
+                    f.write(json.dumps(error, ensure_ascii=False) + "\n")
+            print(f"   전체 목록: {args.errors_out}")
+        return 1
+    print(f"✅ {report['profiles']:,}명 적재 완료: {report['seconds']}s ({report['rows_per_second']:,} rows/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Bulk-load candidate profile JSON files with COPY and upsert by email")
+    parser.add_argument("paths", nargs="*", help="profile files or directories of *.json (default: app/data/professor_record)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="files parsed and copied per batch")
+    parser.add_argument("--workers", type=int, help="parser processes (default: CPU count)")
+    parser.add_argument("--errors-out", help="write every per-file error as JSON lines to this file")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+임베딩 모델(또는 벡터 차원)을 검색 중단 없이 교체하는 스크립트
+
+사용법:
+    python scripts/migrate_embeddings.py status
+    python scripts/migrate_embeddings.py start --model models/gemini-embedding-001 --dim 768
+    python scripts/migrate_embeddings.py start --model ... --dim ... --no-activate --run
+    python scripts/migrate_embeddings.py activate gemini-embedding-001@768
+    python scripts/migrate_embeddings.py rollback
+    python scripts/migrate_embeddings.py abandon
+
+start는 새 버전의 shadow 컬럼(vector_next 등)을 추가하고 embedding_backfill 작업을
+등록합니다. 작업은 서버의 job worker(또는 --run으로 이 프로세스)에서 실행되며,
+백필 → vector_next ANN 인덱스 빌드 → 변경분 catch-up → 컬럼 이름 교체 순으로 진행됩니다.
+그동안 검색은 기존 버전을 그대로 사용합니다. 이전 버전은 *_prev 컬럼에 남아 rollback할 수 있습니다.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.adapters.pg import connect_db, close_db
+from app.services import embedding_versions, jobs
+
+
+def _print(data) -> None:
+    print(json.dumps(data, indent=2, ensure_ascii=False, default=str))
+
+
+async def _run_jobs() -> None:
+    # Runs queued jobs here, including the "vectorize" job queued by the switch
+    while await jobs.run_next():
+        pass
+
+
+async def main(args) -> int:
+    await connect_db()
+    try:
+        await embedding_versions.load_active()
+        if args.command == "status":
+            versions = await embedding_versions.list_versions()
+            backfilling = any(version['status'] == 'backfilling' for version in versions)
+            _print({
+                "versions": versions,
+                "shadow_coverage": await embedding_versions.coverage() if backfilling else None,
+            })
+            return 0
+        if args.command == "start":
+            version = await embedding_versions.start_migration(args.model, args.dim, args.version, not args.no_activate)
+            _print(version)
+            if args.run:
+                await _run_jobs()
+                _print(await embedding_versions.get_version(version['version']))
+            return 0
+        if args.command == "activate":
+            _print(await embedding_versions.activate(args.version, force=args.force))
+        elif args.command == "rollback":
+            _print(await embedding_versions.rollback())
+        elif args.command == "abandon":
+            _print(await embedding_versions.abandon())
+        if args.run:
+            await _run_jobs()
+        return 0
+    except (ValueError, RuntimeError) as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Migrate candidate embeddings to another model without search downtime")
+    run = argparse.ArgumentParser(add_help=False)
+    run.add_argument("--run", action="store_true", help="run the queued jobs in this process instead of a server worker")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="list embedding versions and the backfill coverage").set_defaults(run=False)
+    start = commands.add_parser("start", parents=[run], help="add shadow columns for a new version and queue its backfill")
+    start.add_argument("--model", required=True, help="embedding model, e.g. models/gemini-embedding-001")
+    start.add_argument("--dim", type=int, required=True, help="vector column dimension (model output is zero-padded)")
+    start.add_argument("--version", help="version label (default: <model>@<dim>)")
+    start.add_argument("--no-activate", action="store_true", help="stop after the backfill; switch with `activate`")
+    activate = commands.add_parser("activate", parents=[run], help="switch to a backfilled version")
+    activate.add_argument("version")
+    activate.add_argument("--force", action="store_true", help="switch even if some candidates have no vector yet")
+    commands.add_parser("rollback", parents=[run], help="switch back to the previous version")
+    commands.add_parser("abandon", help="drop the version being backfilled").set_defaults(run=False)
+    sys.exit(asyncio.run(main(parser.parse_args())))
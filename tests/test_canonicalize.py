@@ -0,0 +1,85 @@
+"""
+Term canonicalization (app.services.canonicalize) 테스트
+"""
+import time
+
+import pytest
+
+from app.services import canonicalize
+from app.services.canonicalize import Vocabulary, canonicalize_filters, fold
+
+FREQUENCIES = {
+    "keywords": {"딥러닝": 40, "Deep-Learning": 3, "TensorFlow": 12, "JavaScript": 9, "자연어처리": 20},
+    "skills": {"PyTorch": 30, "Kubernetes": 5},
+}
+ALIASES = [["딥러닝", "Deep Learning"], ["자연어처리", "NLP", "Natural Language Processing"]]
+
+
+@pytest.fixture(autouse=True)
+def fuzzy_threshold(monkeypatch):
+    monkeypatch.setattr(canonicalize.settings, "TERM_FUZZY_THRESHOLD", 0.5)
+
+
+@pytest.fixture
+def vocabulary() -> Vocabulary:
+    return Vocabulary(FREQUENCIES, ALIASES)
+
+
+class TestVocabulary:
+    """Vocabulary 테스트 클래스"""
+
+    def test_fold_ignores_case_width_and_separators(self):
+        assert fold("Deep-Learning") == fold("deep learning") == fold("ＤＥＥＰ_learning") == "deeplearning"
+        assert fold("자연어 처리") == "자연어처리"
+
+    def test_exact_hit_after_folding(self, vocabulary):
+        assert vocabulary.resolve("skills", "pytorch") == ["PyTorch"]
+        assert vocabulary.resolve("keywords", "자연어 처리") == ["자연어처리"]
+
+    def test_alias_group_returns_every_stored_form_most_frequent_first(self, vocabulary):
+        assert vocabulary.resolve("keywords", "Deep Learning") == ["딥러닝", "Deep-Learning"]
+        assert vocabulary.resolve("keywords", "NLP") == ["자연어처리"]
+
+    def test_fuzzy_hit_on_near_spelling(self, vocabulary):
+        assert vocabulary.resolve("keywords", "tensorflw") == ["TensorFlow"]
+        assert vocabulary.resolve("skills", "kubernets") == ["Kubernetes"]
+
+    def test_below_threshold_or_too_short_resolves_to_nothing(self, vocabulary):
+        # java / javascript share a third of their trigrams
+        assert vocabulary.resolve("keywords", "java") == []
+        assert vocabulary.similar("keywords", "tf") == []
+        # Fields are separate vocabularies
+        assert vocabulary.resolve("skills", "TensorFlow") == []
+
+    def test_empty_vocabulary(self):
+        vocabulary = Vocabulary({}, ALIASES)
+        assert len(vocabulary) == 0
+        assert vocabulary.resolve("keywords", "Deep Learning") == []
+        assert vocabulary.resolve("skills", "pytorch") == []
+
+
+class TestCanonicalizeFilters:
+    """canonicalize_filters 테스트 클래스"""
+
+    async def test_any_expands_all_takes_best_form_unknown_kept(self, vocabulary, monkeypatch):
+        monkeypatch.setattr(canonicalize, "_vocabulary", vocabulary)
+        monkeypatch.setattr(canonicalize, "_loaded_at", time.monotonic())
+        canonical = await canonicalize_filters({
+            "keywords_any": ["Deep Learning", "quantum"],
+            "keywords_all": ["deep learning", "tensorflw"],
+            "skills_any": ["pytorch"],
+            "name_contains": ["Kim"],
+        })
+        assert canonical == {
+            "keywords_any": ["딥러닝", "Deep-Learning", "quantum"],
+            "keywords_all": ["딥러닝", "TensorFlow"],
+            "skills_any": ["PyTorch"],
+            "name_contains": ["Kim"],
+        }
+
+    async def test_must_have_takes_one_form_from_either_field(self, vocabulary, monkeypatch):
+        monkeypatch.setattr(canonicalize, "_vocabulary", vocabulary)
+        monkeypatch.setattr(canonicalize, "_loaded_at", time.monotonic())
+        canonical = await canonicalize.canonicalize_must_have(["deep learning", "NLP", "pytorh", "quantum"])
+        # Same folded spelling before its alias; skills are searched too; unknown terms kept
+        assert canonical == ["Deep-Learning", "자연어처리", "PyTorch", "quantum"]
@@ -0,0 +1,62 @@
+"""
+Filter planner (app.services.filter_planner) 테스트: term 선택도 기반 필터 재작성
+"""
+import pytest
+
+from app.adapters import term_index
+from app.adapters.term_index import TermIndex
+from app.services import filter_planner
+from app.services.filter_planner import idf, plan_filters
+
+TOTAL = 10
+# keyword -> candidates having it: "ai" is generic (0.8), "llm" just above the 0.2 cut-off,
+# "nlp" exactly at it
+KEYWORDS = {"ai": range(1, 9), "llm": range(1, 4), "nlp": (1, 2), "rust": (2,)}
+
+
+@pytest.fixture(autouse=True)
+def warm_index(monkeypatch):
+    index = TermIndex()
+    for candidate_id in range(1, TOTAL + 1):
+        keywords = [term for term, ids in KEYWORDS.items() if candidate_id in ids]
+        index.add(candidate_id, keywords, ["python"] if candidate_id <= 5 else [], None)
+    monkeypatch.setattr(term_index, "get_index", lambda: index)
+    monkeypatch.setattr(term_index, "is_warm", lambda: True)
+    monkeypatch.setattr(filter_planner.settings, "FILTER_MAX_TERM_SELECTIVITY", 0.2)
+    monkeypatch.setattr(filter_planner.settings, "TERM_EXPANSION_WEIGHT", 0.5)
+
+
+class TestFilterPlanner:
+    """plan_filters 테스트 클래스"""
+
+    def test_idf_decreases_with_document_frequency(self):
+        assert idf(1, TOTAL) > idf(2, TOTAL) > idf(8, TOTAL) > idf(TOTAL, TOTAL) > 0
+
+    async def test_drops_unknown_and_generic_terms_and_orders_most_frequent_first(self):
+        plan = await plan_filters({"keywords_any": ["rust", "ai", "missing", "nlp", "llm"]})
+        # nlp sits at the cut-off and is kept; llm (0.3) and ai (0.8) are generic
+        assert plan.search_filters == {"keywords_any": ["nlp", "rust"]}
+        assert set(plan.dropped) == {
+            ("keywords_any", "missing"), ("keywords_any", "ai"), ("keywords_any", "llm"),
+        }
+
+    async def test_keeps_generic_terms_when_nothing_more_selective_is_left(self):
+        plan = await plan_filters({"keywords_any": ["ai", "llm"]})
+        assert plan.search_filters == {"keywords_any": ["ai", "llm"]}
+        assert plan.dropped == []
+        assert plan.term_weights["keywords"]["llm"] > plan.term_weights["keywords"]["ai"]
+
+    async def test_generic_or_terms_go_when_an_all_group_remains(self):
+        plan = await plan_filters({"keywords_any": ["ai"], "skills_all": ["python"]})
+        assert plan.search_filters == {"skills_all": ["python"]}
+
+    async def test_all_groups_rarest_first_and_dropped_when_a_term_is_unknown(self):
+        plan = await plan_filters({"keywords_all": ["ai", "nlp", "rust"]})
+        assert plan.search_filters == {"keywords_all": ["rust", "nlp", "ai"]}
+        plan = await plan_filters({"keywords_all": ["nlp", "missing"], "keywords_any": ["rust"]})
+        assert plan.search_filters == {"keywords_any": ["rust"]}
+        assert ("keywords_all", "nlp") in plan.dropped
+
+    async def test_idf_weights_with_expansion_discount(self):
+        plan = await plan_filters({"keywords_any": ["nlp", "rust"]}, expanded={"keywords": ["rust"]})
+        assert plan.term_weights == {"keywords": {"nlp": idf(2, TOTAL), "rust": idf(1, TOTAL) * 0.5}}
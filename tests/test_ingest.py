@@ -0,0 +1,107 @@
+"""
+Profile ingestion (app.services.ingest) 테스트: COPY text 행 생성과 프로필 검증
+"""
+import json
+import re
+
+import orjson
+import pytest
+
+from app.services.ingest import STAGING_COLUMNS, _copy_text, parse_profile_file
+
+_COPY_ESCAPES = {"\\\\": "\\", "\\t": "\t", "\\n": "\n", "\\r": "\r"}
+
+
+def copy_fields(line: str) -> list[str | None]:
+    """Decodes one COPY text row the way PostgreSQL does (for the escapes _copy_text emits)."""
+    return [
+        None if field == "\\N" else re.sub(r"\\[\\tnr]", lambda m: _COPY_ESCAPES[m.group()], field)
+        for field in line.split("\t")
+    ]
+
+
+def write(tmp_path, data, name="profile.json") -> str:
+    path = tmp_path / name
+    path.write_text(data if isinstance(data, str) else json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+PROFILE = {
+    "name": " 김\t연구 ",
+    "email": "kim@example.com",
+    "introduce": "line one\nline two\r\nC:\\path\\to \\N and a\ttab",
+    "keywords": ["딥러닝", " 딥러닝 ", "back\\slash", ""],
+    "skills": ["tab\there"],
+    "cards": [{"type": "text", "data": "multi\nline\t\\"}],
+    "location": " Seoul ",
+}
+
+
+class TestCopyText:
+    """_copy_text 테스트 클래스"""
+
+    @pytest.mark.parametrize("value, expected", [
+        (None, "\\N"),
+        ("plain", "plain"),
+        ("a\tb", "a\\tb"),
+        ("a\nb\rc", "a\\nb\\rc"),
+        ("C:\\dir", "C:\\\\dir"),
+        ("\\N", "\\\\N"),  # the literal text \N is not NULL
+        (["a\tb"], '["a\\\\tb"]'),  # JSON escapes first, then COPY escapes the backslash
+    ])
+    def test_escapes(self, value, expected):
+        assert _copy_text(value) == expected
+
+    @pytest.mark.parametrize("value", ["nul\x00byte", ["json \x00 nul"]])
+    def test_rejects_nul(self, value):
+        with pytest.raises(ValueError):
+            _copy_text(value)
+
+
+class TestParseProfileFile:
+    """parse_profile_file 테스트 클래스"""
+
+    def test_row_round_trips_through_copy_decoding(self, tmp_path):
+        data, count, error = parse_profile_file(7, write(tmp_path, PROFILE))
+        assert (count, error) == (1, None)
+        lines = data.decode("utf-8").split("\n")
+        assert lines[-1] == "" and len(lines) == 2
+        row = dict(zip(STAGING_COLUMNS, copy_fields(lines[0])))
+        assert len(row) == len(STAGING_COLUMNS)
+        assert row["file_seq"] == "7" and row["pos"] == "0"
+        assert row["name"] == "김\t연구"
+        assert row["email"] == "kim@example.com"
+        assert row["introduce"] == PROFILE["introduce"]
+        assert orjson.loads(row["keywords"]) == ["딥러닝", "back\\slash"]
+        assert orjson.loads(row["skills"]) == ["tab\there"]
+        assert orjson.loads(row["cards"]) == PROFILE["cards"]
+        assert row["location"] == "Seoul"
+
+    def test_list_file_and_missing_optional_fields(self, tmp_path):
+        profiles = [{"name": "A", "email": "a@x.org"}, {"name": "B", "email": "b@x.org", "introduce": None}]
+        data, count, error = parse_profile_file(0, write(tmp_path, profiles))
+        assert (count, error) == (2, None)
+        rows = [copy_fields(line) for line in data.decode("utf-8").splitlines()]
+        assert [row[1] for row in rows] == ["0", "1"]
+        assert rows[0][4:] == [None, "[]", "[]", "[]", None]
+
+    @pytest.mark.parametrize("profile, message", [
+        ({"email": "a@x.org"}, "name is missing"),
+        ({"name": "A", "email": "not-an-email"}, "invalid email"),
+        ({"name": "A", "email": "a@x.org", "keywords": "nlp"}, "keywords must be a list of strings"),
+        ({"name": "A", "email": "a@x.org", "skills": [1]}, "skills must be a list of strings"),
+        ({"name": "A", "email": "a@x.org", "cards": {"type": "text"}}, "cards must be a list"),
+        ({"name": "A", "email": "a@x.org", "introduce": 3}, "introduce must be a string"),
+        ({"name": "A", "email": "a@x.org", "location": ["Seoul"]}, "location must be a string"),
+        ({"name": "A\x00", "email": "a@x.org"}, "NUL"),
+        ("just a string", "profile must be a JSON object"),
+    ])
+    def test_invalid_profile_fails_the_whole_file(self, tmp_path, profile, message):
+        data, count, error = parse_profile_file(0, write(tmp_path, [{"name": "ok", "email": "ok@x.org"}, profile]))
+        assert (data, count) == (b"", 0)
+        assert message in error
+
+    def test_unreadable_files(self, tmp_path):
+        assert parse_profile_file(0, write(tmp_path, "{not json"))[2].startswith("JSONDecodeError")
+        assert parse_profile_file(0, str(tmp_path / "missing.json"))[2].startswith("FileNotFoundError")
+        assert parse_profile_file(0, write(tmp_path, [])) == (b"", 0, None)
@@ -0,0 +1,75 @@
+"""
+MMR (app.utils.mmr) 테스트: 행렬 기반 구현을 참조용 greedy 루프와 비교
+"""
+import pytest
+
+from app.utils.mmr import cosine_similarity, mmr
+
+
+# Duplicate vectors (1 / 4) and equal scores (2 / 3, 5 / 6) exercise the tie-breaking
+VECTORS = {
+    "1": [1.0, 0.0, 0.0],
+    "2": [0.9, 0.1, 0.0],
+    "3": [0.0, 1.0, 0.0],
+    "4": [1.0, 0.0, 0.0],
+    "5": [0.0, 0.0, 1.0],
+    "6": [0.0, 0.7, 0.7],
+    "7": [0.0, 0.0, 0.0],
+}
+DOCUMENTS = [
+    {"id": 1, "score": 1.0},
+    {"id": 2, "score": 0.8},
+    {"id": 3, "score": 0.8},
+    {"id": 4, "score": 0.7},
+    {"id": "5", "score": 0.5},
+    {"id": 6, "score": 0.5},
+    {"id": 7, "score": 0.4},
+    {"id": 8, "score": 0.3},  # no vector: dropped
+]
+
+
+def reference_mmr(documents: list[dict], vectors: dict, lambda_val: float, k: int) -> list[dict]:
+    """The straightforward greedy loop: recompute every similarity to the selected set on each pick."""
+    vectors = {str(doc_id): v for doc_id, v in vectors.items()}
+    max_score = max(doc['score'] for doc in documents)
+    relevance = {str(doc['id']): doc['score'] / max_score for doc in documents}
+    remaining = [doc for doc in documents if str(doc['id']) in vectors]
+    selected = [remaining.pop(0)]
+    while len(selected) < k and remaining:
+        def score(doc):
+            max_sim = max(cosine_similarity(vectors[str(doc['id'])], vectors[str(sel['id'])]) for sel in selected)
+            return lambda_val * relevance[str(doc['id'])] - (1 - lambda_val) * max_sim
+        # max() keeps the first of equal scores, i.e. the more relevant document
+        best = max(remaining, key=score)
+        selected.append(best)
+        remaining.remove(best)
+    return selected
+
+
+def ids(documents: list[dict]) -> list[str]:
+    return [str(doc['id']) for doc in documents]
+
+
+class TestMMR:
+    """MMR 테스트 클래스"""
+
+    @pytest.mark.parametrize("lambda_val", [0.0, 0.3, 0.5, 0.7, 1.0])
+    @pytest.mark.parametrize("k", [1, 3, 5, 7, 20])
+    def test_matches_reference_loop(self, lambda_val, k):
+        expected = reference_mmr(DOCUMENTS, VECTORS, lambda_val, k)
+        assert ids(mmr(DOCUMENTS, VECTORS, lambda_val, k)) == ids(expected)
+
+    def test_k_above_candidates_returns_every_document_with_a_vector(self):
+        selected = mmr(DOCUMENTS, VECTORS, 0.5, 20)
+        assert sorted(ids(selected)) == sorted(VECTORS)
+
+    def test_lambda_one_keeps_relevance_order(self):
+        assert ids(mmr(DOCUMENTS, VECTORS, 1.0, 4)) == ["1", "2", "3", "4"]
+
+    def test_duplicate_is_picked_last_when_diversifying(self):
+        assert ids(mmr(DOCUMENTS, VECTORS, 0.5, 7))[-1] == "4"
+
+    def test_empty_inputs(self):
+        assert mmr([], VECTORS, 0.5, 3) == []
+        assert mmr(DOCUMENTS, {}, 0.5, 3) == []
+        assert mmr(DOCUMENTS, VECTORS, 0.5, 0) == []
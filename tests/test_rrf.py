@@ -0,0 +1,77 @@
+"""
+Rank fusion (app.utils.rrf) 테스트
+"""
+import pytest
+
+from app.utils import rrf, scoring
+
+
+STRUCTURED = [{"id": 1, "score": 1.0}, {"id": 2, "score": 0.5}, {"id": 3, "score": 0.25}]
+VECTOR = [{"id": "2", "score": 0.9}, {"id": "4", "score": 0.8}, {"id": "1", "score": 0.1}]
+FULLTEXT = [{"id": "4", "score": 3.0}, {"id": "5", "score": 1.0}]
+
+
+class TestRRF:
+    """RRF 테스트 클래스"""
+
+    def test_sums_reciprocal_ranks_across_sources(self):
+        fused = dict(rrf.rrf({"structured": STRUCTURED, "vector": VECTOR, "fulltext": FULLTEXT}, k=60))
+        assert fused["1"] == pytest.approx(1 / 61 + 1 / 63)
+        assert fused["2"] == pytest.approx(1 / 62 + 1 / 61)
+        assert fused["4"] == pytest.approx(1 / 62 + 1 / 61)
+        assert fused["5"] == pytest.approx(1 / 62)
+
+    def test_weights_scale_each_source(self):
+        fused = dict(rrf.rrf({"structured": STRUCTURED, "vector": VECTOR}, weights={"vector": 0.0}))
+        assert fused["4"] == 0.0
+        assert fused["1"] == pytest.approx(1 / 61)
+
+    def test_top_k_matches_full_sort(self):
+        sources = {"structured": STRUCTURED, "vector": VECTOR, "fulltext": FULLTEXT}
+        assert rrf.rrf(sources, top_k=3) == rrf.rrf(sources)[:3]
+
+    def test_ties_keep_first_seen_order(self):
+        fused = rrf.rrf({"a": [{"id": "x"}], "b": [{"id": "y"}]})
+        assert [doc_id for doc_id, _ in fused] == ["x", "y"]
+
+
+class TestScoreFusion:
+    """blend / CombMNZ 테스트 클래스"""
+
+    def test_blend_normalizes_by_source_max(self):
+        fused = dict(rrf.blend({"structured": STRUCTURED, "fulltext": FULLTEXT}, weights={"structured": 0.5}))
+        assert fused["1"] == pytest.approx(0.5)
+        assert fused["4"] == pytest.approx(1.0)
+        assert fused["5"] == pytest.approx(1 / 3)
+
+    def test_combmnz_rewards_documents_found_by_several_sources(self):
+        fused = dict(rrf.combmnz({"structured": STRUCTURED, "vector": VECTOR}))
+        # 2: (1/3 + 1) * 2 sources, 4: 7/8 * 1 source
+        assert fused["2"] == pytest.approx((1 / 3 + 1.0) * 2)
+        assert fused["4"] == pytest.approx(7 / 8)
+        assert fused["3"] == 0.0
+
+    def test_fuse_rejects_unknown_method(self):
+        with pytest.raises(ValueError):
+            rrf.fuse({"structured": STRUCTURED}, method="borda")
+
+
+class TestScoringWrappers:
+    """scoring 래퍼 테스트 클래스"""
+
+    def test_rrf_fusion_keeps_payloads(self):
+        vec = [{"id": "1", "score": 0.9, "payload": {"name": "A"}}]
+        kw = [{"id": 1, "rank": 0.3}, {"id": 2, "rank": 0.1}]
+        blended = scoring.rrf_fusion(vec, kw, k=60)
+        assert [r["id"] for r in blended] == ["1", 2]
+        assert blended[0]["payload"] == {"name": "A"}
+        assert blended[0]["score"] == pytest.approx(2 / 61)
+        assert vec[0]["score"] == 0.9
+
+    def test_blend_scores_weights_vector_and_keyword_ranks(self):
+        vec = [{"id": "1", "score": 0.5}, {"id": "2", "score": 0.25}]
+        kw = [{"id": 2}, {"id": 3}]
+        blended = {str(r["id"]): r["score"] for r in scoring.blend_scores(vec, kw, alpha=0.6)}
+        assert blended["1"] == pytest.approx(0.6)
+        assert blended["2"] == pytest.approx(0.6 * 0.5 + 0.4)
+        assert blended["3"] == pytest.approx(0.4 * 0.5)
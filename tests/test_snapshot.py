@@ -0,0 +1,100 @@
+"""
+Corpus snapshot (app.services.snapshot) 테스트: 파일 기록 후 mmap 로드 왕복
+"""
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from app.adapters import term_index, vector_memory
+from app.adapters.term_index import TermIndex
+from app.adapters.vector_memory import VectorMatrix
+from app.services import snapshot
+from app.services.snapshot import _write_snapshot, load_snapshot
+
+DIM = 8
+WATERMARK = datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc)
+# id -> (keywords, skills, created_at); candidate 4 has no vector
+CANDIDATES = {
+    3: (["딥러닝", "NLP"], ["Python"], datetime(2025, 1, 1, tzinfo=timezone.utc)),
+    1: (["NLP"], ["Rust", "Python"], datetime(2024, 6, 1, tzinfo=timezone.utc)),
+    4: ([], ["Go"], None),
+}
+
+
+@pytest.fixture(autouse=True)
+def snapshot_settings(monkeypatch):
+    monkeypatch.setattr(snapshot.settings, "VECTOR_DIM", DIM)
+
+
+@pytest.fixture
+def written(tmp_path):
+    vectors = VectorMatrix(DIM)
+    raw = np.random.default_rng(0).standard_normal((2, DIM)).astype(np.float32)
+    vectors.upsert([3, 1], raw)
+    terms = TermIndex()
+    for candidate_id, (keywords, skills, created_at) in CANDIDATES.items():
+        terms.add(candidate_id, keywords, skills, created_at)
+    out_dir = tmp_path / "snapshot"
+    manifest = _write_snapshot(out_dir, vectors, terms, "0/16B3748", WATERMARK)
+    return out_dir, manifest, vectors, terms
+
+
+class TestSnapshot:
+    """_write_snapshot / load_snapshot 테스트 클래스"""
+
+    def test_manifest(self, written):
+        out_dir, manifest, _, _ = written
+        assert not out_dir.with_name("snapshot.tmp").exists()
+        assert manifest["candidates"] == 3 and manifest["vectors"] == 2
+        assert manifest["lsn"] == "0/16B3748"
+        loaded_manifest, _, _ = load_snapshot(out_dir)
+        assert loaded_manifest == manifest
+        assert datetime.fromisoformat(loaded_manifest["watermark"]) == WATERMARK
+
+    def test_vectors_round_trip_memory_mapped(self, written):
+        out_dir, _, vectors, _ = written
+        _, loaded, _ = load_snapshot(out_dir)
+        assert isinstance(loaded.matrix.base, np.memmap) or isinstance(loaded.matrix, np.memmap)
+        assert loaded.id_array().tolist() == [3, 1]
+        np.testing.assert_array_equal(loaded.matrix, vectors.matrix)
+        query = vectors.matrix[1]
+        assert loaded.topk(query, 2) == vectors.topk(query, 2)
+
+    def test_term_bitmaps_and_candidate_terms_round_trip(self, written):
+        out_dir, _, _, terms = written
+        _, _, loaded = load_snapshot(out_dir)
+        for field in term_index.TERM_FIELDS:
+            assert loaded.postings()[field] == terms.postings()[field]
+        assert set(loaded.any_of("skills", ["Python"])) == {1, 3}
+        assert loaded.created_at() == terms.created_at()
+        for candidate_id in CANDIDATES:
+            assert loaded.doc_terms(candidate_id) == terms.doc_terms(candidate_id)
+        assert loaded.doc_terms(2) is None
+
+        loaded.remove(3)
+        assert set(loaded.any_of("keywords", ["NLP"])) == {1}
+
+    def test_rewrite_replaces_previous_snapshot(self, written):
+        out_dir, _, vectors, _ = written
+        _write_snapshot(out_dir, vectors, TermIndex(), None, None)
+        manifest, _, terms = load_snapshot(out_dir)
+        assert manifest["candidates"] == 0 and manifest["watermark"] is None
+        assert len(terms) == 0
+        assert not out_dir.with_name("snapshot.old").exists()
+
+    def test_incompatible_or_missing_snapshot_is_ignored(self, written, tmp_path, monkeypatch):
+        out_dir, _, _, _ = written
+        assert load_snapshot(tmp_path / "missing") is None
+        monkeypatch.setattr(snapshot.settings, "VECTOR_DIM", DIM * 2)
+        assert load_snapshot(out_dir) is None
+
+    def test_restore_seeds_indexes_with_watermark(self, written, monkeypatch):
+        out_dir, _, _, _ = written
+        seeded = {}
+        monkeypatch.setattr(snapshot.settings, "VECTOR_BACKEND", "memory")
+        monkeypatch.setattr(snapshot.settings, "TERM_INDEX_ENABLED", True)
+        monkeypatch.setattr(vector_memory, "restore", lambda index, watermark: seeded.update(vectors=watermark))
+        monkeypatch.setattr(term_index, "restore", lambda index, watermark: seeded.update(terms=watermark))
+        assert snapshot.restore(out_dir)
+        assert seeded == {"vectors": WATERMARK, "terms": WATERMARK}
@@ -0,0 +1,94 @@
+"""
+Term co-occurrence graph (app.services.term_graph) 테스트
+"""
+from collections import Counter
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from app.services import term_graph
+from app.services.term_graph import TermGraph, _neighbour_lists, _PairCounter, _write_graph
+
+# Sorted, distinct term ids per candidate
+DOCS = [[0, 1, 2], [0, 1], [1, 2, 3], [0, 3], [2], [0, 1, 3]]
+
+
+def counted_pairs(counter: _PairCounter) -> dict[tuple[int, int], int]:
+    a, b, counts = counter.result()
+    return {(int(x), int(y)): int(c) for x, y, c in zip(a, b, counts)}
+
+
+class TestPairCounter:
+    """_PairCounter 테스트 클래스"""
+
+    def test_counts_every_pair_once_per_candidate(self):
+        counter = _PairCounter()
+        for doc in DOCS:
+            counter.add(np.array(doc, dtype=np.int64))
+        expected = Counter(pair for doc in DOCS for pair in combinations(doc, 2))
+        assert counted_pairs(counter) == dict(expected)
+
+    def test_merges_pending_batches(self, monkeypatch):
+        monkeypatch.setattr(term_graph, "_MAX_PENDING_PAIRS", 2)
+        counter = _PairCounter()
+        for doc in DOCS * 3:
+            counter.add(np.array(doc, dtype=np.int64))
+        expected = Counter(pair for doc in DOCS * 3 for pair in combinations(doc, 2))
+        assert counted_pairs(counter) == dict(expected)
+
+    def test_large_term_ids_do_not_collide(self):
+        counter = _PairCounter()
+        counter.add(np.array([1, 2**31 - 1], dtype=np.int64))
+        assert counted_pairs(counter) == {(1, 2**31 - 1): 1}
+
+
+class TestNeighbourLists:
+    """_neighbour_lists 테스트 클래스"""
+
+    def test_keeps_strongest_links_per_term_in_both_directions(self):
+        a = np.array([0, 0, 0, 1])
+        b = np.array([1, 2, 3, 2])
+        weights = np.array([0.9, 0.5, 0.5, 0.7])
+        indptr, indices, link_weights = _neighbour_lists(5, a, b, weights, neighbours=2)
+        links = {t: list(zip(indices[indptr[t]:indptr[t + 1]].tolist(), link_weights[indptr[t]:indptr[t + 1]].tolist()))
+                 for t in range(5)}
+        # term 0 has three links: the 0.5 tie is broken by target id
+        assert links[0] == [(1, pytest.approx(0.9)), (2, pytest.approx(0.5))]
+        assert links[1] == [(0, pytest.approx(0.9)), (2, pytest.approx(0.7))]
+        assert links[2] == [(1, pytest.approx(0.7)), (0, pytest.approx(0.5))]
+        assert links[3] == [(0, pytest.approx(0.5))]
+        assert links[4] == []
+        assert indptr.tolist()[-1] == len(indices) == 7
+
+
+class TestTermGraph:
+    """TermGraph 저장/로드 테스트 클래스"""
+
+    @pytest.fixture
+    def graph(self, tmp_path) -> TermGraph:
+        terms = ["딥러닝", "PyTorch", "NLP", "Rust"]
+        a, b = np.array([0, 0, 1, 2]), np.array([1, 2, 2, 3])
+        indptr, indices, weights = _neighbour_lists(len(terms), a, b, np.array([0.8, 0.6, 0.4, 0.3]), 8)
+        path = tmp_path / "graph" / "term_graph.npz"
+        _write_graph(
+            path, terms, [1, 2, 3, 2], np.array([10, 8, 6, 2]), indptr, indices, weights, {"terms": len(terms)}
+        )
+        assert not path.with_name(path.name + ".tmp").exists()
+        return TermGraph.load(path)
+
+    def test_round_trip_keeps_terms_and_links(self, graph):
+        assert graph.terms == ["딥러닝", "PyTorch", "NLP", "Rust"]
+        assert graph.df.tolist() == [10, 8, 6, 2]
+        assert graph.manifest == {"terms": 4}
+        assert [term for term, _ in graph.neighbours("NLP")] == ["딥러닝", "PyTorch", "Rust"]
+        assert graph.term_fields("nlp") == ["keywords", "skills"]
+        assert graph.term_fields("pytorch") == ["skills"]
+
+    def test_expand_sums_weights_over_seeds_and_excludes_them(self, graph):
+        expanded = graph.expand(["딥러닝", "pytorch"], limit=5)
+        assert [term for term, _ in expanded] == ["NLP"]
+        assert expanded[0][1] == pytest.approx(0.6 + 0.4)
+        assert [term for term, _ in graph.expand(["딥러닝"], limit=1)] == ["PyTorch"]
+        assert graph.expand(["NLP"], limit=5, min_weight=0.5) == [("딥러닝", pytest.approx(0.6))]
+        assert graph.expand(["unknown"], limit=5) == []
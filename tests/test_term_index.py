@@ -0,0 +1,82 @@
+"""
+In-memory term index (app.adapters.term_index) 테스트: SQL 경로와 같은 결과를 내는지 확인
+"""
+from collections import Counter
+from datetime import datetime, timezone
+
+from pyroaring import BitMap
+
+from app.adapters.term_index import TermIndex
+
+
+def ts(day: int) -> datetime:
+    return datetime(2025, 1, day, tzinfo=timezone.utc)
+
+
+# (id, keywords, skills, created_at)
+ROWS = [
+    (1, ["nlp", "llm"], ["python"], ts(1)),
+    (2, ["llm"], ["python", "rust"], ts(2)),
+    (3, '["vision"]', ["c++"], ts(3)),  # JSONB decoded as text
+    (4, ["nlp", "vision", 7], None, None),  # non-string term, no skills, NULL created_at
+    (5, [], ["rust"], ts(5)),
+]
+
+
+def build() -> TermIndex:
+    index = TermIndex()
+    for row in ROWS:
+        index.add(*row)
+    return index
+
+
+def ids(bitmap: BitMap) -> set[int]:
+    return set(bitmap)
+
+
+class TestTermIndex:
+    """TermIndex 테스트 클래스"""
+
+    def test_any_of_is_jsonb_any_key(self):
+        # keywords ?| array['nlp', 'missing']
+        assert ids(build().any_of("keywords", ["nlp", "missing"])) == {1, 4}
+        assert ids(build().any_of("skills", [])) == set()
+
+    def test_all_of_is_jsonb_all_keys(self):
+        # skills ?& array['python', 'rust']
+        assert ids(build().all_of("skills", ["python", "rust"])) == {2}
+        assert ids(build().all_of("keywords", ["nlp", "missing"])) == set()
+        # ?& with an empty array is true for every row
+        assert ids(build().all_of("keywords", [])) == {1, 2, 3, 4, 5}
+
+    def test_match_ors_groups_within_and_across_fields(self):
+        filters = {"keywords_all": ["nlp", "llm"], "keywords_any": ["vision"], "skills_any": ["rust"]}
+        assert ids(build().match(filters)) == {1, 2, 3, 4, 5}
+        assert ids(build().match({"keywords_all": ["nlp", "llm"]})) == {1}
+        # Empty groups are left out of the WHERE clause, not matched as "everything"
+        assert ids(build().match({"keywords_all": [], "skills_any": ["c++"]})) == {3}
+
+    def test_remove_and_re_add_replace_postings(self):
+        index = build()
+        index.add(1, ["vision"], [], ts(1))
+        assert ids(index.any_of("keywords", ["nlp"])) == {4}
+        index.remove(4)
+        assert ids(index.any_of("keywords", ["nlp"])) == set()
+        assert "nlp" not in index.postings()["keywords"]
+        assert len(index) == 4
+
+    def test_top_orders_by_match_count_then_created_at_nulls_last(self):
+        index = build()
+        filters = {"keywords_any": ["nlp", "vision", "llm"]}
+        matched = index.match(filters)
+        counts = index.overlap_counts(matched, filters)
+        assert counts == Counter({1: 2, 4: 2, 2: 1, 3: 1})
+        # ORDER BY match_count DESC, created_at DESC NULLS LAST
+        assert index.top(matched, counts, 4) == [(1, 2), (4, 2), (3, 1), (2, 1)]
+        assert index.top(matched, counts, 1) == [(1, 2)]
+
+    def test_overlap_counts_apply_term_weights(self):
+        index = build()
+        filters = {"keywords_any": ["nlp", "llm"]}
+        counts = index.overlap_counts(index.match(filters), filters, {"keywords": {"llm": 0.5}})
+        assert counts == Counter({1: 1.5, 4: 1, 2: 0.5})
@@ -0,0 +1,34 @@
+"""
+ANN index sizing (app.adapters.vector_index.plan_index) 테스트
+"""
+import pytest
+
+from app.adapters.vector_index import plan_index
+
+
+class TestPlanIndex:
+    """plan_index 테스트 클래스"""
+
+    @pytest.mark.parametrize("row_count, lists, probes", [
+        (0, 1, 1),
+        (999, 1, 1),
+        (12_067, 12, 3),
+        (100_000, 100, 10),
+        (1_000_000, 1000, 32),
+        (4_000_000, 2000, 45),  # sqrt(rows) above a million
+    ])
+    def test_ivfflat_lists_and_probes(self, row_count, lists, probes):
+        assert plan_index(row_count, "ivfflat") == {"build": {"lists": lists}, "search": {"probes": probes}}
+
+    @pytest.mark.parametrize("row_count, build, ef_search", [
+        (0, {"m": 16, "ef_construction": 64}, 40),
+        (100_000, {"m": 16, "ef_construction": 64}, 40),
+        (100_001, {"m": 16, "ef_construction": 64}, 100),
+        (1_000_001, {"m": 24, "ef_construction": 128}, 100),
+    ])
+    def test_hnsw_graph_and_ef_search(self, row_count, build, ef_search):
+        assert plan_index(row_count, "hnsw") == {"build": build, "search": {"ef_search": ef_search}}
+
+    def test_rejects_unknown_method(self):
+        with pytest.raises(ValueError):
+            plan_index(1000, "diskann")
@@ -0,0 +1,105 @@
+"""
+In-memory vector index (app.adapters.vector_memory) 테스트
+"""
+import numpy as np
+import pytest
+
+from app.adapters.vector_memory import VectorMatrix, to_float32
+
+DIM = 8
+
+
+def random_matrix(n: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal((n, DIM)).astype(np.float32)
+
+
+def normalized(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+def assert_consistent(index: VectorMatrix, expected: dict[int, np.ndarray]) -> None:
+    """Every id maps to its own row, and the live rows are exactly the expected vectors."""
+    assert index.ids() == set(expected)
+    assert index.size == len(expected)
+    assert sorted(index.id_array().tolist()) == sorted(expected)
+    for row, candidate_id in enumerate(index.id_array()):
+        np.testing.assert_allclose(index.matrix[row], normalized(expected[int(candidate_id)]), rtol=1e-5)
+
+
+class TestVectorMatrix:
+    """VectorMatrix 테스트 클래스"""
+
+    def test_remove_swaps_last_row_into_the_freed_slot(self):
+        vectors = random_matrix(6)
+        index = VectorMatrix(DIM)
+        index.upsert([10, 11, 12, 13, 14, 15], vectors)
+        expected = {10 + i: vectors[i] for i in range(6)}
+
+        index.remove([11])  # middle: 15 moves into row 1
+        del expected[11]
+        assert index.id_array().tolist() == [10, 15, 12, 13, 14]
+        assert_consistent(index, expected)
+
+        index.remove([14, 99, 10])  # last row, unknown id, first row
+        del expected[14], expected[10]
+        assert_consistent(index, expected)
+        assert index.get([15, 14]).keys() == {15}
+
+    def test_upsert_overwrites_in_place_and_grows(self):
+        vectors = random_matrix(3)
+        index = VectorMatrix(DIM)
+        index.upsert([1, 2, 3], vectors)
+        replacement = random_matrix(1, seed=1)
+        index.upsert([2], replacement)
+        assert index.id_array().tolist() == [1, 2, 3]
+        assert_consistent(index, {1: vectors[0], 2: replacement[0], 3: vectors[2]})
+
+        many = random_matrix(2000, seed=2)
+        index.upsert(list(range(100, 2100)), many)
+        assert index.size == 2003
+        np.testing.assert_allclose(index.get([2099])[2099], normalized(many[-1]), rtol=1e-5)
+
+    def test_zero_vector_is_kept_without_nan(self):
+        index = VectorMatrix(DIM)
+        index.upsert([1], np.zeros((1, DIM), dtype=np.float32))
+        assert not np.isnan(index.matrix).any()
+
+    @pytest.mark.parametrize("k", [1, 5, 50, 500])
+    def test_topk_matches_brute_force(self, k):
+        vectors = random_matrix(300, seed=3)
+        ids = list(range(1000, 1300))
+        index = VectorMatrix(DIM)
+        index.upsert(ids, vectors)
+        index.remove(ids[::7])
+        live = [candidate_id for candidate_id in ids if candidate_id in index]
+        query = random_matrix(1, seed=4)[0]
+
+        scores = {cid: float(normalized(vectors[cid - 1000]) @ normalized(query)) for cid in live}
+        expected = sorted(live, key=lambda cid: -scores[cid])[:k]
+        result = index.topk(query, k)
+        assert [cid for cid, _ in result] == expected
+        assert [score for _, score in result] == pytest.approx([scores[cid] for cid in expected], abs=1e-5)
+
+    def test_topk_among_restricts_candidates(self):
+        vectors = random_matrix(50, seed=5)
+        index = VectorMatrix(DIM)
+        index.upsert(list(range(50)), vectors)
+        query = random_matrix(1, seed=6)[0]
+        among = [3, 7, 11, 999]
+        scores = {cid: float(normalized(vectors[cid]) @ normalized(query)) for cid in among[:3]}
+        assert [cid for cid, _ in index.topk(query, 2, among=among)] == sorted(scores, key=lambda c: -scores[c])[:2]
+        assert index.topk(query, 2, among=[999]) == []
+        assert index.topk(np.zeros(DIM), 2) == []
+
+
+class TestToFloat32:
+    """to_float32 테스트 클래스"""
+
+    def test_converts_arrays_and_lists(self):
+        assert to_float32(None) is None
+        assert to_float32([1, 2]).dtype == np.float32
+        assert to_float32(np.array([0.5], dtype=np.float64)).tolist() == [0.5]
+
+    def test_rejects_text_literals(self):
+        with pytest.raises(TypeError):
+            to_float32("[0.1,0.2]")